@@ -3,45 +3,119 @@ Base classes for all scheduling agents.
 Each person's agent inherits from these and adds their own tools.
 """
 
+import asyncio
 import logging
 import time
-from pathlib import Path
-from openai import AuthenticationError
+from contextlib import asynccontextmanager, nullcontext
+from openai import AuthenticationError, DefaultAsyncHttpxClient
 
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_agent
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, get_buffer_string
 from langchain_core.tools import tool
 
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events.event_queue import EventQueue
-from a2a.utils import new_agent_text_message
-
-from config import OPENAI_API_KEY, OPENAI_MODEL
+from a2a.server.tasks import TaskUpdater
+from a2a.types import DataPart, Message, Part, TextPart
+from a2a.utils import new_agent_parts_message, new_task
+
+from agents.callbacks import TracingCallbackHandler, UsageCallbackHandler
+from config import (
+    CALENDAR_VIEW_MAX_DAYS, CASSETTE_MODE, MEMORY_IDLE_TTL_SECONDS, MEMORY_KEEP_RECENT_TURNS, MEMORY_MAX_CONVERSATIONS,
+    MEMORY_TOKEN_THRESHOLD, MODEL_PRICES, OPENAI_API_KEY, OPENAI_MODEL,
+)
+from shared.availability import (
+    AVAILABILITY_SKILL_ID, AvailabilityPolicy, AvailabilityRequest, SlotCommand,
+    answer_slot_command, parse_availability_request, parse_slot_command,
+)
+from shared.async_calendar_store import AsyncCalendarStore
 from shared.calendar_store import CalendarStore
+from shared.calendar_views import busy_lines, paginate
+from shared.cassette import CassetteTransport, record
+from shared.conversation_memory import (
+    Conversation, ConversationMemory, conversation_scope, current_context_id, transcript,
+)
+from shared.metrics import (
+    INFLIGHT_TASKS, MODEL_ROUTES, PROMPT_CACHE_HIT_RATIO, PROMPT_PREFIX_REBUILDS,
+)
+from shared.model_router import ModelPolicy, RouteDecision, carry_over, escalation_reason, route
+from shared.peer_health import IdempotencyCache
+from shared.profiling import profile_requested, profiled
+from shared.prompt_cache import PromptPrefix
+from shared.tracing import current_span, extract, get_tracer, start_span
+from shared.usage import (
+    BUDGET_METADATA_KEY, USAGE_METADATA_KEY,
+    TokenBudgetExceeded, UsageTracker, current_usage, usage_scope,
+)
 
 
 # Logger will be initialized per-agent instance
 # (see SchedulingAgent.__init__)
 
 
-llm_model = ChatOpenAI(
-    model=OPENAI_MODEL,
-    stream_usage=False,
-    # temperature=None,
-    # max_tokens=None,
-    # timeout=None,
-    # reasoning_effort="low",
-    # max_retries=2,
-    api_key=OPENAI_API_KEY,  # If you prefer to pass api key in directly
-    # base_url="...",
-    # organization="...",
-    # other params...
+_chat_models: dict[str, ChatOpenAI] = {}
+
+
+def chat_model(model: str) -> ChatOpenAI:
+    """Shared ChatOpenAI client for a model name."""
+    if model not in _chat_models:
+        _chat_models[model] = ChatOpenAI(
+            model=model,
+            stream_usage=True,  # keep token usage even when streaming
+            # temperature=None,
+            # max_tokens=None,
+            # timeout=None,
+            # reasoning_effort="low",
+            # max_retries=2,
+            api_key=OPENAI_API_KEY or ("replay" if CASSETTE_MODE == "replay" else None),  # If you prefer to pass api key in directly
+            # Record/replay LLM calls (see shared/cassette.py)
+            http_async_client=(
+                DefaultAsyncHttpxClient(transport=CassetteTransport("llm")) if CASSETTE_MODE != "off" else None
+            ),
+            # base_url="...",
+            # organization="...",
+            # other params...
+        )
+    return _chat_models[model]
+
+
+llm_model = chat_model(OPENAI_MODEL)
+
+
+def _with_cache_key(model, cache_key: str):
+    """Copy of the model that sends `prompt_cache_key` so same-prefix calls share a cache."""
+    if not isinstance(model, ChatOpenAI):
+        return model
+    return model.model_copy(update={
+        "model_kwargs": {**model.model_kwargs, "prompt_cache_key": cache_key},
+    })
+
+
+SUMMARY_PROMPT = (
+    "You compact a scheduling agent's conversation history for its own later use. "
+    "Merge the previous summary with the new messages. Keep every proposed time, "
+    "availability answer, calendar check result, decision and booking. "
+    "Drop pleasantries. Reply with the summary only."
 )
 
 
+async def summarize_conversation(
+    previous: str, messages: list[BaseMessage], model: ChatOpenAI = llm_model, callbacks: list | None = None,
+) -> str:
+    """Fold older conversation turns into a running summary."""
+    result = await model.ainvoke([
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(content=(
+            f"Previous summary:\n{previous or '(none)'}\n\n"
+            f"New messages:\n{get_buffer_string(messages)}"
+        )),
+    ], config={"callbacks": callbacks or []})
+    return result.content
+
+
 # TODO: Define response format
-# TODO: Add memory (MemorySaver from langgraph?)
 
 
 class SchedulingAgent:
@@ -54,39 +128,86 @@ class SchedulingAgent:
         calendar_path: str,
         extra_tools: list | None = None,
         agent_name: str = "unknown",
+        availability_policy: AvailabilityPolicy | None = None,
+        model_policy: ModelPolicy | None = None,
+        startup_tasks: list | None = None,
     ):
         self.agent_name = agent_name
         self.logger = logging.getLogger(agent_name)
-        self.soul = Path(soul_path).read_text()
-        self.person_context = Path(context_path).read_text()
-        self.calendar = CalendarStore(calendar_path)
+        # Async facade: in-memory reads, bookings group-committed off the loop
+        self.calendar = AsyncCalendarStore(CalendarStore(calendar_path))
+        # Rules for answering structured availability requests without the LLM
+        self.availability_policy = availability_policy or AvailabilityPolicy()
+        # Which model tier handles which turns
+        self.model_policy = model_policy or ModelPolicy()
 
         self.logger.info("Initializing scheduling agent")
 
         # Build calendar tools bound to this agent's CSV
         calendar_tools = self._build_calendar_tools()
-        all_tools = calendar_tools + (extra_tools or [])
-        self.logger.info(f"Loaded {len(all_tools)} tools")
-        
-        # Get system prompt (instruction + person context)
-        system_prompt = self._build_system_prompt()
-
-        self.agent = create_agent(
-            model=llm_model,
-            tools=all_tools,
-            system_prompt=system_prompt,
+        self.tools = calendar_tools + (extra_tools or [])
+        self.logger.info(f"Loaded {len(self.tools)} tools")
+
+        # Static prompt prefix (soul + person context + tool schemas), kept byte-stable for caching
+        self.prompt = PromptPrefix(soul_path, context_path, self.tools, agent_name)
+        self.agents = self._build_agents()
+
+        # Per-(sender, contextId) history so later rounds of a negotiation build on earlier ones
+        self.memory = ConversationMemory(
+            self._summarize,
+            max_conversations=MEMORY_MAX_CONVERSATIONS,
+            idle_ttl_seconds=MEMORY_IDLE_TTL_SECONDS,
+            token_threshold=MEMORY_TOKEN_THRESHOLD,
+            keep_recent_turns=MEMORY_KEEP_RECENT_TURNS,
         )
+        self._background: set[asyncio.Task] = set()
+        # Coroutine functions started in the background once the calendar is loaded
+        self.startup_tasks = startup_tasks or []
+
+    @asynccontextmanager
+    async def lifespan(self, app=None):
+        """Starlette lifespan: load the calendar on startup, flush pending bookings on shutdown."""
+        await self.calendar.open()
+        for startup_task in self.startup_tasks:
+            task = asyncio.create_task(startup_task())
+            self._background.add(task)
+            task.add_done_callback(self._on_startup_task_done)
+        try:
+            yield
+        finally:
+            await self.calendar.close()
 
     def _build_system_prompt(self) -> str:
-        system_prompt = f"{self.soul}\n\n## Person Context\n{self.person_context}"
-        return system_prompt
+        return self.prompt.text
+
+    def _build_agents(self) -> dict:
+        """One agent loop per model tier, sharing tools and prompt prefix."""
+        self.logger.info(f"Building agents with prompt prefix {self.prompt.fingerprint}")
+        return {
+            tier: create_agent(
+                model=_with_cache_key(chat_model(model), self.prompt.cache_key),
+                tools=self.tools,
+                system_prompt=self._build_system_prompt(),
+            )
+            for tier, model in self.model_policy.models.items()
+        }
+
+    def _refresh_prompt(self):
+        """Rebuild the agent once if soul.md or person_context.md changed on disk."""
+        old = self.prompt.fingerprint
+        if self.prompt.refresh():
+            self.logger.info(f"Context files changed, rebuilding prompt prefix {old} -> {self.prompt.fingerprint}")
+            PROMPT_PREFIX_REBUILDS.labels(get_tracer().service_name).inc()
+            self.agents = self._build_agents()
 
     # TODO: move calendar tools to shared/tools since not all base agents may have calendar tools!
     def _build_calendar_tools(self) -> list:
+        # Async tools over the calendar facade; the agent loop runs the tool calls
+        # of one model turn concurrently
         calendar = self.calendar
 
         @tool
-        def check_availability(date: str, start_time: str, end_time: str) -> str:
+        async def check_availability(date: str, start_time: str, end_time: str) -> str:
             """Check if my person is free at a specific time.
             Args:
                 date: Date in YYYY-MM-DD format
@@ -94,42 +215,75 @@ class SchedulingAgent:
                 end_time: End time in HH:MM format
             """
             from datetime import date as d, time as t
-            available = calendar.is_available(
+            # Holds placed for this negotiation (A2A contextId) don't count against it
+            status = await calendar.slot_status(
                 d.fromisoformat(date),
                 t.fromisoformat(start_time),
                 t.fromisoformat(end_time),
+                owner=current_context_id(),
             )
-            return "Available" if available else "Busy - conflict with existing event"
+            if status == "held":
+                return "Held - tentatively reserved for another meeting being arranged"
+            return "Available" if status == "free" else "Busy - conflict with existing event"
 
         @tool
-        def get_free_slots(date: str, duration_minutes: int) -> str:
+        async def get_free_slots(date: str, duration_minutes: int, cursor: str = "") -> str:
             """List my person's open time slots for a given date.
             Args:
                 date: Date in YYYY-MM-DD format
                 duration_minutes: How long the meeting needs to be
+                cursor: From a previous result's "More:" line, to get the next page
             """
             from datetime import date as d
-            slots = calendar.get_free_slots(d.fromisoformat(date), duration_minutes)
-            if not slots:
-                return "No available slots on this date."
-            lines = [f"  {s['start_time']}-{s['end_time']}" for s in slots]
-            return f"Available slots on {date}:\n" + "\n".join(lines)
+            slots = await calendar.get_free_slots(
+                d.fromisoformat(date), duration_minutes, owner=current_context_id(),
+            )
+            items = [(s["start_time"], f"  {s['start_time']}-{s['end_time']}") for s in slots]
+            return paginate(
+                items, cursor, header=f"Available slots on {date}:", empty="No available slots on this date.",
+            )
+
+        @tool
+        async def get_busy_blocks(start_date: str, end_date: str = "", cursor: str = "") -> str:
+            """Get when my person is busy over a date range, as merged time blocks per day
+            (no event details). Days not listed are free. Prefer this over get_schedule for
+            more than one day, and for anything shared with other agents.
+            Args:
+                start_date: First date in YYYY-MM-DD format
+                end_date: Last date in YYYY-MM-DD format (defaults to start_date)
+                cursor: From a previous result's "More:" line, to get the next page
+            """
+            from datetime import date as d, timedelta
+            first = d.fromisoformat(start_date)
+            last = d.fromisoformat(end_date) if end_date else first
+            if last < first:
+                return "end_date is before start_date."
+            last = min(last, first + timedelta(days=CALENDAR_VIEW_MAX_DAYS - 1))
+            events = await calendar.get_events_range(first, last)
+            return paginate(
+                busy_lines(events), cursor,
+                header=f"Busy {first}..{last} (blocks are prior commitments unless marked):",
+                empty=f"Free all day, every day from {first} to {last}.",
+            )
 
         @tool
-        def get_schedule(date: str) -> str:
-            """Get my person's full schedule for a date.
+        async def get_schedule(date: str, cursor: str = "") -> str:
+            """Get my person's schedule for a date, with event titles. For private use;
+            use get_busy_blocks for ranges or for what to tell other agents.
             Args:
                 date: Date in YYYY-MM-DD format
+                cursor: From a previous result's "More:" line, to get the next page
             """
             from datetime import date as d
-            events = calendar.get_events(d.fromisoformat(date))
-            if not events:
-                return f"No events on {date}."
-            lines = [f"  {e['start_time']}-{e['end_time']}: {e['title']}" for e in events]
-            return f"Schedule for {date}:\n" + "\n".join(lines)
+            events = await calendar.get_events(d.fromisoformat(date))
+            items = [
+                (f"{e.start_time:%H:%M} {e.event_id}", f"  {e.start_time:%H:%M}-{e.end_time:%H:%M}: {e.title}")
+                for e in events
+            ]
+            return paginate(items, cursor, header=f"Schedule for {date}:", empty=f"No events on {date}.")
 
         @tool
-        def book_meeting(
+        async def book_meeting(
             title: str, date: str, start_time: str, end_time: str,
             attendees: str = "", location: str = "",
         ) -> str:
@@ -143,26 +297,37 @@ class SchedulingAgent:
                 location: Meeting location
             """
             from datetime import date as d, time as t
-            result = calendar.book_event(
+            result = await calendar.book_event(
                 title=title,
                 target_date=d.fromisoformat(date),
                 start=t.fromisoformat(start_time),
                 end=t.fromisoformat(end_time),
                 location=location,
                 attendees=attendees.split(";") if attendees else [],
+                owner=current_context_id(),
             )
             if result:
                 return f"Booked: {title} on {date} {start_time}-{end_time}"
             return "Failed to book - time slot is no longer available."
 
-        return [check_availability, get_free_slots, get_schedule, book_meeting]
-
-    async def invoke(self, message: str, sender: str = "unknown") -> str:
-        """Run the agent with a message and return the response text."""
+        return [check_availability, get_free_slots, get_busy_blocks, get_schedule, book_meeting]
+
+    async def invoke(
+        self, message: str, sender: str = "unknown", usage: UsageTracker | None = None,
+        context_id: str | None = None, skill: str = "default",
+    ) -> str:
+        """Run the agent with a message and return the response text.
+        Token usage is recorded on `usage`; if its budget runs out the loop stops early.
+        With a `context_id`, earlier turns with the same sender in that context are included.
+        The model tier is picked by `self.model_policy` and reported on `usage.model_tier`.
+        """
+        usage = usage or UsageTracker(prices=MODEL_PRICES)
         request_id = f"req_{int(time.time() * 1000)}"
         self.logger.info(f"[{request_id}] Received request from '{sender}'")
         self.logger.info(f"[{request_id}] >>> {message[:150]}{'...' if len(message) > 150 else ''}")
 
+        self._refresh_prompt()
+        # Per-request details go after the cached prefix, in the user turn
         content = f"Sender: {sender}\n{message}"
 
         try:
@@ -170,18 +335,46 @@ class SchedulingAgent:
             print("SENDER: ", sender)
             self.logger.info(f"[{request_id}] Starting LLM invocation")
 
-            result = await self.agent.ainvoke({
-                "messages": [{"role": "user", "content": content}]
-            })
+            conversation = self.memory.get(sender, context_id) if context_id else None
+            async with conversation.lock if conversation else nullcontext():
+                history = conversation.history() if conversation else []
+                if history:
+                    self.logger.info(f"[{request_id}] Continuing conversation ({len(history)} earlier messages)")
+                    # Summarizing the history cost tokens after the last reply went out
+                    usage.own.add(conversation.take_unbilled())
+                messages = [*history, HumanMessage(content=content)]
+                decision = route(self.model_policy, message, skill, len(history))
+
+                with start_span("agent.invoke", agent=self.agent_name, sender=sender) as span, \
+                        usage_scope(usage), conversation_scope(context_id):
+                    result, decision = await self._run_routed(decision, messages, span, usage)
+                    span.set_attributes({"model_tier": decision.tier, "route_reason": decision.reason})
+
+                if conversation:
+                    conversation.messages.extend(transcript(result["messages"][len(history):]))
+            if conversation:
+                self._schedule_compaction(conversation, usage)
 
             llm_duration = time.time() - llm_start
-            self.logger.info(f"[{request_id}] LLM completed in {llm_duration:.2f}s")
+            usage.model_tier = decision.tier
+            MODEL_ROUTES.labels(get_tracer().service_name, decision.tier, decision.reason).inc()
+            self.logger.info(
+                f"[{request_id}] LLM completed in {llm_duration:.2f}s on the {decision.tier} model "
+                f"({'escalated: ' if decision.escalated else ''}{decision.reason})"
+            )
+            self._log_usage(request_id, usage)
+            if usage.own.prompt_tokens:
+                PROMPT_CACHE_HIT_RATIO.labels(get_tracer().service_name).set(usage.own.cache_hit_rate)
 
             response = result["messages"][-1].content
             self.logger.info(f"[{request_id}] <<< {response[:150]}{'...' if len(response) > 150 else ''}")
 
             return response
 
+        except TokenBudgetExceeded as e:
+            self.logger.warning(f"[{request_id}] Stopped: {e}")
+            self._log_usage(request_id, usage)
+            return f"I had to stop before finishing: {e}. No further action was taken."
         except AuthenticationError as e:
             self.logger.error(f"[{request_id}] Authentication failed: {e}")
             print("Invalid API key! Please check your OpenAI key.")
@@ -191,17 +384,145 @@ class SchedulingAgent:
             raise
 
 
+    async def _run_tier(self, tier: str, messages: list[BaseMessage], span, usage: UsageTracker) -> dict:
+        return await self.agents[tier].ainvoke(
+            {"messages": messages},
+            config={"callbacks": [
+                TracingCallbackHandler(span),
+                UsageCallbackHandler(usage, self.model_policy.models[tier]),
+            ]},
+        )
+
+    async def _run_routed(
+        self, decision: RouteDecision, messages: list[BaseMessage], span, usage: UsageTracker,
+    ) -> tuple[dict, RouteDecision]:
+        """Run on the routed tier; a small-model turn that went badly is finished by the large model."""
+        if decision.tier == "large":
+            return await self._run_tier("large", messages, span, usage), decision
+        try:
+            result = await self._run_tier("small", messages, span, usage)
+        except (TokenBudgetExceeded, AuthenticationError):
+            raise
+        except Exception as e:
+            self.logger.warning(f"Small model failed, escalating: {e}")
+            reason, carried = "error", []
+        else:
+            new_messages = result["messages"][len(messages):]
+            reason = escalation_reason(self.model_policy, new_messages)
+            if reason is None:
+                return result, decision
+            # Keep the tool calls already made so they aren't repeated
+            carried = carry_over(new_messages)
+        result = await self._run_tier("large", messages + carried, span, usage)
+        return result, RouteDecision(tier="large", reason=reason, escalated=True)
+
+    async def _summarize(self, previous: str, messages: list[BaseMessage]) -> str:
+        """Summarize on the small model, recording tokens and budget on the current usage scope."""
+        model = self.model_policy.models["small"]
+        usage = current_usage() or UsageTracker(prices=MODEL_PRICES)
+        return await summarize_conversation(previous, messages, chat_model(model), callbacks=[
+            TracingCallbackHandler(current_span()),
+            UsageCallbackHandler(usage, model),
+        ])
+
+    def _schedule_compaction(self, conversation: Conversation, usage: UsageTracker):
+        """Summarize long history in the background so the reply isn't delayed.
+        It may use what is left of `usage`'s budget; its tokens are charged to the next reply.
+        """
+        spent = UsageTracker(budget=usage.remaining, prices=MODEL_PRICES)
+
+        async def compact():
+            async with conversation.lock:
+                with start_span("memory.compact", agent=self.agent_name), usage_scope(spent):
+                    before = conversation.tokens
+                    try:
+                        compacted = await self.memory.compact(conversation)
+                    except TokenBudgetExceeded as e:
+                        self.logger.warning(f"Skipped compacting conversation {conversation.key}: {e}")
+                        return
+                    finally:
+                        conversation.unbilled.add(spent.own)
+                    if compacted:
+                        self.logger.info(
+                            f"Compacted conversation {conversation.key}: "
+                            f"~{before} -> ~{conversation.tokens} tokens ({spent.own.total_tokens} tokens spent)"
+                        )
+
+        task = asyncio.create_task(compact())
+        self._background.add(task)
+        task.add_done_callback(self._on_compaction_done)
+
+    def _on_compaction_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            self.logger.error(f"Conversation compaction failed: {task.exception()}")
+
+    def _on_startup_task_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            self.logger.error(f"Startup task failed: {task.exception()}")
+
+    def _log_usage(self, request_id: str, usage: UsageTracker):
+        total = usage.total
+        self.logger.info(
+            f"[{request_id}] Tokens: prompt={total.prompt_tokens} (cached={total.cached_tokens}, "
+            f"hit rate {total.cache_hit_rate:.0%}) "
+            f"completion={total.completion_tokens} calls={total.llm_calls} "
+            f"cost=${total.cost_usd:.4f}"
+            + (f" budget={usage.budget}" if usage.budget is not None else "")
+        )
+
+
+def _wants_task(context: RequestContext) -> bool:
+    """True if the caller sent a non-blocking or push-notification request, so it needs a task to follow."""
+    config = context.configuration
+    return config is not None and (config.blocking is False or config.push_notification_config is not None)
+
+
+def _record_served(context: RequestContext, parts: list[Part], started: float):
+    """Add a served request and its reply to the cassette when recording (see shared/cassette.py)."""
+    record(
+        "a2a.serve",
+        {"message": context.message.model_dump(mode="json", exclude_none=True) if context.message else None},
+        {"parts": [p.model_dump(mode="json", exclude_none=True) for p in parts]},
+        time.perf_counter() - started,
+    )
+
+
+def _availability_request(message: Message | None) -> AvailabilityRequest | None:
+    """Find a structured availability request among the message's DataParts."""
+    for part in (message.parts if message else []):
+        if isinstance(part.root, DataPart):
+            request = parse_availability_request(part.root.data)
+            if request is not None:
+                return request
+    return None
+
+
+def _slot_command(message: Message | None) -> SlotCommand | None:
+    """Find a negotiation's slot command among the message's DataParts."""
+    for part in (message.parts if message else []):
+        if isinstance(part.root, DataPart):
+            command = parse_slot_command(part.root.data)
+            if command is not None:
+                return command
+    return None
+
+
 class SchedulingAgentExecutor(AgentExecutor):
     """Bridges A2A protocol to our LangChain SchedulingAgent."""
 
     def __init__(self, scheduling_agent: SchedulingAgent):
         self.agent = scheduling_agent
         self.logger = scheduling_agent.logger
+        # Replies by (sender, messageId): a retried request is answered without running it again
+        self.replies = IdempotencyCache()
 
     async def execute(
         self, context: RequestContext, event_queue: EventQueue
     ) -> None:
         request_id = f"exec_{int(time.time() * 1000)}"
+        started = time.perf_counter()
         self.logger.info(f"[{request_id}] === {self.agent.agent_name} started processing an A2A execution ===")
 
         # A2A method to extract text from input message
@@ -211,20 +532,110 @@ class SchedulingAgentExecutor(AgentExecutor):
         sender = context.metadata.get("sender", "unknown_agent")
         self.logger.info(f"[{request_id}] Sender: {sender}")
 
+        availability = _availability_request(context.message)
+        command = _slot_command(context.message)
+        service = get_tracer().service_name
+        structured = availability is not None or command is not None
+        skill = AVAILABILITY_SKILL_ID if structured else context.metadata.get("skill", "default")
+        # Non-blocking callers get a task id right away and the reply when the task completes
+        updater = None
+        if _wants_task(context):
+            task = context.current_task or new_task(context.message)
+            await event_queue.enqueue_event(task)
+            updater = TaskUpdater(event_queue, task.id, task.context_id)
+            await updater.start_work()
+
+        dedupe_key = (sender, context.message.message_id) if context.message else None
+        first_reply = self.replies.claim(dedupe_key) if dedupe_key else None
+
+        INFLIGHT_TASKS.labels(service).inc()
         try:
-            # Langchain method to run agent
-            agent_start = time.time()
-            response = await self.agent.invoke(user_input, sender=sender)
-            agent_duration = time.time() - agent_start
-            self.logger.info(f"[{request_id}] Total execution: {agent_duration:.2f}s")
-
-            # A2A method to send response event
-            await event_queue.enqueue_event(new_agent_text_message(response))
+            if first_reply is not None:
+                self.logger.info(f"[{request_id}] Retry of message {dedupe_key[1]}, answering with its first reply")
+                parts, metadata = await asyncio.shield(first_reply)
+                await self._reply(event_queue, updater, parts, metadata)
+                return
+
+            # Continue the caller's trace if it sent a traceparent; run under cProfile if asked to
+            profile = profile_requested(context.metadata)
+            with start_span(
+                "a2a.execute", parent=extract(context.metadata),
+                agent=self.agent.agent_name, sender=sender, skill=skill,
+            ) as span, profiled(request_id, self.logger, enabled=profile):
+                if command is not None:
+                    # A negotiation accepting, booking or releasing its slot; never needs the LLM
+                    answer = await answer_slot_command(
+                        self.agent.calendar, command, sender, self.agent.availability_policy,
+                        owner=context.context_id,
+                    )
+                    parts = [Part(root=DataPart(data=answer.model_dump()))]
+                    metadata = {USAGE_METADATA_KEY: UsageTracker().to_dict()}
+                    self.replies.resolve(dedupe_key, (parts, metadata))
+                    await self._reply(event_queue, updater, parts, metadata)
+                    _record_served(context, parts, started)
+                    self.logger.info(f"[{request_id}] === Slot {command.action}: {answer.to_text()} ===")
+                    return
+                if availability is not None:
+                    # Fast path: answer straight from the calendar when policy allows
+                    # Free slots are held for the negotiation if it asked, until it confirms or the hold expires
+                    answer = await self.agent.calendar.answer_availability(
+                        availability, sender, self.agent.availability_policy, owner=context.context_id,
+                    )
+                    span.set_attribute("fast_path", answer is not None)
+                    if answer is not None:
+                        parts = [Part(root=DataPart(data=answer.model_dump()))]
+                        metadata = {USAGE_METADATA_KEY: UsageTracker().to_dict()}
+                        self.replies.resolve(dedupe_key, (parts, metadata))
+                        await self._reply(event_queue, updater, parts, metadata)
+                        _record_served(context, parts, started)
+                        self.logger.info(f"[{request_id}] === Answered availability without LLM ===")
+                        return
+                    self.logger.info(f"[{request_id}] Availability request needs judgment, using LLM")
+                    user_input = availability.to_text()
+
+                # Langchain method to run agent
+                agent_start = time.time()
+                budget = context.metadata.get(BUDGET_METADATA_KEY)
+                usage = UsageTracker(
+                    budget=int(budget) if budget is not None else None, prices=MODEL_PRICES,
+                )
+                response = await self.agent.invoke(
+                    user_input, sender=sender, usage=usage, context_id=context.context_id, skill=skill,
+                )
+                agent_duration = time.time() - agent_start
+                self.logger.info(f"[{request_id}] Total execution: {agent_duration:.2f}s")
+
+                # A2A method to send response event, with usage for the caller to sum up
+                parts = [Part(root=TextPart(text=response))]
+                metadata = {USAGE_METADATA_KEY: usage.to_dict()}
+                self.replies.resolve(dedupe_key, (parts, metadata))
+                await self._reply(event_queue, updater, parts, metadata)
+                _record_served(context, parts, started)
             self.logger.info(f"[{request_id}] === A2A execution completed ===")
 
         except Exception as e:
             self.logger.error(f"[{request_id}] Execution failed: {e}", exc_info=True)
-            raise
+            if dedupe_key and first_reply is None:
+                self.replies.discard(dedupe_key, e)
+            if updater is None:
+                raise
+            # The caller is no longer connected; tell it through the task instead
+            await updater.failed(updater.new_agent_message([Part(root=TextPart(text=f"Execution failed: {e}"))]))
+        finally:
+            if dedupe_key and first_reply is None:
+                # Cancelled before replying: let a retry run it again
+                self.replies.discard(dedupe_key, RuntimeError("the first attempt did not finish"))
+            INFLIGHT_TASKS.labels(service).dec()
+
+    @staticmethod
+    async def _reply(event_queue: EventQueue, updater: TaskUpdater | None, parts: list[Part], metadata: dict):
+        """Send the reply as a message, or complete the task with it in task mode."""
+        if updater is not None:
+            await updater.complete(updater.new_agent_message(parts, metadata=metadata))
+            return
+        reply = new_agent_parts_message(parts)
+        reply.metadata = metadata
+        await event_queue.enqueue_event(reply)
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         """Method that allows agent to cancel a particular task/event. Current not suppoerted."""
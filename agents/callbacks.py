@@ -0,0 +1,104 @@
+"""
+LangChain callback handlers shared by all scheduling agents.
+Handlers are created per request and passed to `agent.ainvoke` via config.
+"""
+
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from shared.tracing import Span, get_tracer
+from shared.usage import UsageTracker
+
+
+def usage_from_result(response: LLMResult) -> dict:
+    """Pull token usage out of an LLM result, whichever field the provider filled."""
+    for generations in response.generations:
+        for gen in generations:
+            usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if usage:
+                details = usage.get("input_token_details") or {}
+                return {
+                    "input_tokens": usage.get("input_tokens", 0),
+                    "output_tokens": usage.get("output_tokens", 0),
+                    "cached_tokens": details.get("cache_read", 0) or 0,
+                }
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+    return {
+        "input_tokens": token_usage.get("prompt_tokens", 0),
+        "output_tokens": token_usage.get("completion_tokens", 0),
+        "cached_tokens": cached or 0,
+    }
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Emits a span per LLM call and per tool call, parented to the request span."""
+
+    run_inline = True
+
+    def __init__(self, parent: Span | None):
+        self.parent = parent
+        self._spans: dict[UUID, Span] = {}
+
+    def _start(self, run_id: UUID, name: str, attributes: dict):
+        self._spans[run_id] = get_tracer().new_span(name, self.parent, attributes)
+
+    def _end(self, run_id: UUID, error: BaseException | None = None, **attributes):
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        span.set_attributes(attributes)
+        if error is not None:
+            span.record_error(error)
+        span.end()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        self._start(run_id, "llm.call", {
+            "model": params.get("model") or params.get("model_name", ""),
+            "messages": sum(len(m) for m in messages),
+        })
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        self._end(run_id, **usage_from_result(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, "tool.call", {"tool": (serialized or {}).get("name", "")})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Records token usage per LLM call and enforces the request's token budget."""
+
+    run_inline = True
+    raise_error = True  # a budget error must stop the agent loop, not be logged and ignored
+
+    def __init__(self, tracker: UsageTracker, default_model: str):
+        self.tracker = tracker
+        self.default_model = default_model
+        self._models: dict[UUID, str] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.tracker.check_budget()
+        params = kwargs.get("invocation_params") or {}
+        self._models[run_id] = params.get("model") or params.get("model_name") or self.default_model
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        usage = usage_from_result(response)
+        self.tracker.record_llm(
+            self._models.pop(run_id, self.default_model),
+            usage["input_tokens"], usage["output_tokens"], usage["cached_tokens"],
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._models.pop(run_id, None)
@@ -0,0 +1,129 @@
+"""
+Fleet worker — one process serving several people's agents.
+Each person is mounted under `/<person>` with their own AgentCard, request
+handler, calendar and conversation memory; spans and metrics from a mount are
+labelled with its person, not the worker. Run several workers on different
+ports and list them as a shard in the fleet map (see shared/agent_registry.py);
+the registry routes each person to one worker of their shard.
+
+Usage: python -m agents.fleet_worker --port 11001 --people person_b,person_c
+"""
+
+import argparse
+import importlib
+import logging
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import (
+    BasePushNotificationSender, InMemoryPushNotificationConfigStore, InMemoryTaskStore,
+)
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from agents.base_agent import SchedulingAgentExecutor
+from config import CASSETTE_DIR, CASSETTE_LATENCY, CASSETTE_MODE, OTLP_ENDPOINT, TRACE_EXPORTER, TRACE_FILE
+from shared.cassette import configure_cassette
+from shared.logging_config import setup_logging
+from shared.metrics import install_metrics, metrics_routes
+from shared.profiling import profile_routes
+from shared.push_notifications import WEBHOOK_PATH
+from shared.tracing import configure_tracing, service_scope
+
+
+DEFAULT_PORT = 11001
+
+
+class _ServiceScoped:
+    """ASGI wrapper that attributes everything a mounted app does to one person."""
+
+    def __init__(self, app, person: str):
+        self.app = app
+        self.person = person
+
+    async def __call__(self, scope, receive, send):
+        with service_scope(self.person):
+            await self.app(scope, receive, send)
+
+
+def _mount_person(person: str, base_url: str, port: int):
+    """Build one person's A2A app from agents/<person>/; returns (mount, agent)."""
+    agent_module = importlib.import_module(f"agents.{person}.scheduling_agent")
+    card_module = importlib.import_module(f"agents.{person}.agent_card")
+
+    agent = getattr(agent_module, f"create_{person}_agent")()
+    executor = SchedulingAgentExecutor(agent)
+
+    # Non-blocking callers get task updates POSTed to their webhook
+    push_store = InMemoryPushNotificationConfigStore()
+    handler = DefaultRequestHandler(
+        agent_executor=executor,
+        task_store=InMemoryTaskStore(),
+        push_config_store=push_store,
+        push_sender=BasePushNotificationSender(httpx.AsyncClient(timeout=10.0), push_store),
+    )
+
+    card = card_module.build_agent_card(port=port).model_copy(update={"url": f"{base_url}/{person}/"})
+    inbox = getattr(agent_module, "PUSH_INBOX", None)
+    if inbox:
+        # The inbox routes are mounted under /<person> too, so peers must POST there
+        inbox.webhook_url = f"{base_url}/{person}{WEBHOOK_PATH}"
+    app = A2AStarletteApplication(agent_card=card, http_handler=handler)
+    built = app.build(routes=inbox.routes() if inbox else [])
+    return Mount(f"/{person}", app=_ServiceScoped(built, person)), agent
+
+
+def create_app():
+    port = int(os.getenv("AGENT_PORT", DEFAULT_PORT))
+    people = [p for p in os.getenv("FLEET_PEOPLE", "person_b,person_c").split(",") if p]
+    base_url = os.getenv("FLEET_WORKER_URL", f"http://localhost:{port}").rstrip("/")
+    name = f"worker_{port}"
+
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        setup_logging(name, level=logging.INFO)
+    logger.info(f"Building worker for {', '.join(people)}...")
+    configure_tracing(name, TRACE_EXPORTER, TRACE_FILE, OTLP_ENDPOINT)
+    configure_cassette(name, CASSETTE_MODE, CASSETTE_DIR, CASSETTE_LATENCY)
+    install_metrics()
+
+    mounts, agents = zip(*(_mount_person(person, base_url, port) for person in people))
+
+    # Mounted apps don't get lifespan events, so run every agent's from here
+    @asynccontextmanager
+    async def lifespan(app):
+        async with AsyncExitStack() as stack:
+            for person, agent in zip(people, agents):
+                with service_scope(person):
+                    await stack.enter_async_context(agent.lifespan(app))
+            yield
+
+    return Starlette(routes=metrics_routes() + profile_routes() + list(mounts), lifespan=lifespan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve several people's agents from one process")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--people", default="person_b,person_c", help="comma-separated agent names")
+    parser.add_argument("--url", help="base URL peers reach this worker at (default http://localhost:PORT)")
+    args = parser.parse_args()
+
+    os.environ["AGENT_PORT"] = str(args.port)
+    os.environ["FLEET_PEOPLE"] = args.people
+    if args.url:
+        os.environ["FLEET_WORKER_URL"] = args.url
+    uvicorn.run(
+        "agents.fleet_worker:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=args.port,
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
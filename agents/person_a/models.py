@@ -3,7 +3,10 @@ Person A's internal models for tracking negotiation state.
 These are never shared with other agents — purely internal bookkeeping.
 """
 
-from pydantic import BaseModel
+import time
+from typing import Literal
+
+from pydantic import BaseModel, Field
 
 
 class ProposedSlot(BaseModel):
@@ -11,12 +14,37 @@ class ProposedSlot(BaseModel):
     start_time: str # HH:MM
     end_time: str   # HH:MM
 
+    @property
+    def key(self) -> str:
+        return f"{self.date} {self.start_time}-{self.end_time}"
+
+
+# propose -> collect -> confirm -> book -> done; collect/confirm loop back to propose for another round
+NegotiationStep = Literal["propose", "collect", "confirm", "book", "done", "failed"]
+
 
 class NegotiationState(BaseModel):
     meeting_id: str
     title: str
     attendees: list[str]
-    proposed_slots: list[ProposedSlot]
-    responses: dict[str, str]  # agent_name -> their natural language response
+    proposed_slots: list[ProposedSlot] = []
+    responses: dict[str, str] = {}  # agent_name -> their natural language response
     round: int = 1
     confirmed_slot: ProposedSlot | None = None
+
+    # Workflow checkpoint (see negotiation.py)
+    step: NegotiationStep = "propose"
+    duration_minutes: int = 60
+    window_start: str = ""  # YYYY-MM-DD
+    window_end: str = ""
+    slot_status: dict[str, dict[str, str]] = {}  # agent_name -> slot key -> free/held/busy/unknown
+    rejected_slots: list[str] = []  # slot keys from earlier rounds
+    confirmations: dict[str, str] = {}  # agent_name -> "accepted", or why they didn't accept
+    booked: list[str] = []  # attendees that booked the confirmed slot
+    event_id: str | None = None
+    error: str | None = None
+    updated_at: float = Field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.step in ("done", "failed")
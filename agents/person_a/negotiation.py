@@ -0,0 +1,396 @@
+"""
+Durable negotiation workflow for Person A.
+A multi-party meeting is negotiated as an explicit state machine over
+NegotiationState: propose slots from Person A's calendar, collect each
+attendee's free/busy, have everyone accept (and keep holding) the first slot
+they can all make, then book it on every calendar. Confirmations are structured
+slot commands (see shared/availability.py), so nobody books a slot until all
+attendees have accepted it, and a slot that falls through is released.
+The state is checkpointed to disk after every step and after every peer reply,
+so a restart or a timed-out peer only costs the steps not yet completed;
+`resume_pending` picks unfinished negotiations back up on startup.
+
+Peer messages carry the meeting id as their A2A contextId, so peers keep their
+holds and conversation for the negotiation across Person A restarts.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import date, time as dtime
+from pathlib import Path
+
+from agents.person_a.models import NegotiationState, ProposedSlot
+from shared.availability import AvailabilityResponse, SlotCommand, SlotCommandResponse, SlotQuery, booking_marker
+from shared.conversation_memory import conversation_scope
+from shared.freebusy import format_minutes, to_minutes
+from shared.tracing import start_span
+
+
+logger = logging.getLogger(__name__)
+
+
+class NegotiationStalled(Exception):
+    """Some peers could not be reached; the negotiation stays at its step until resumed."""
+
+    def __init__(self, agents: list[str]):
+        super().__init__(f"no reply from {', '.join(agents)}")
+        self.agents = agents
+
+
+class NegotiationStore:
+    """One JSON file per negotiation, replaced atomically on every checkpoint."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, meeting_id: str) -> Path:
+        return self.directory / f"{meeting_id}.json"
+
+    def save(self, state: NegotiationState):
+        state.updated_at = time.time()
+        path = self._path(state.meeting_id)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(state.model_dump_json(indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load(self, meeting_id: str) -> NegotiationState | None:
+        try:
+            return NegotiationState.model_validate_json(self._path(meeting_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def all(self) -> list[NegotiationState]:
+        states = []
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                states.append(NegotiationState.model_validate_json(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable negotiation {path.name}: {e}")
+        return states
+
+    def unfinished(self) -> list[NegotiationState]:
+        return [s for s in self.all() if not s.finished]
+
+
+# Status of a slot a peer only answered about in text: neither free nor busy
+UNKNOWN = "unknown"
+
+# What `confirmations` records for an attendee who accepted; anything else is why they didn't
+ACCEPTED = "accepted"
+
+
+def outcome(reply: SlotCommandResponse | str) -> str:
+    """ACCEPTED, or why a peer refused a slot command (a text reply is not an acceptance)."""
+    if isinstance(reply, SlotCommandResponse):
+        return ACCEPTED if reply.ok else reply.reason or "refused"
+    return f"no structured answer ({reply[:100]})"
+
+
+def _statuses(answer: AvailabilityResponse) -> dict[str, str]:
+    return {f"{a.date} {a.start_time}-{a.end_time}": a.status for a in answer.slots}
+
+
+def _failed_contact(reply: str) -> bool:
+    return reply.startswith("Failed to contact")
+
+
+def summarize(state: NegotiationState) -> str:
+    """One-paragraph status for the LLM or a human."""
+    head = f"Negotiation {state.meeting_id} ('{state.title}' with {', '.join(state.attendees)}), round {state.round}"
+    if state.step == "done":
+        slot = state.confirmed_slot
+        return f"{head}: booked {slot.date} {slot.start_time}-{slot.end_time}."
+    if state.step == "failed":
+        return f"{head}: failed — {state.error}."
+    detail = f" ({state.error})" if state.error else ""
+    return f"{head}: waiting at step '{state.step}'{detail}."
+
+
+class NegotiationEngine:
+    """Runs negotiations step by step, checkpointing each to a NegotiationStore."""
+
+    def __init__(
+        self, store: NegotiationStore, ask, command, calendar=None,
+        slots_per_round: int = 3, max_rounds: int = 3,
+        day_start: dtime = dtime(9, 0), day_end: dtime = dtime(17, 0),
+        working_hours: dict[str, tuple[dtime, dtime]] | None = None,
+    ):
+        """
+        Args:
+            ask: async (agent_name, slots) -> AvailabilityResponse | str  (structured free/busy)
+            command: async (agent_name, SlotCommand) -> SlotCommandResponse | str  (accept/book/release)
+            calendar: Person A's AsyncCalendarStore; may be set after construction.
+            day_start, day_end: Person A's own working hours.
+            working_hours: Attendees' (start, end) hours, as in their AvailabilityPolicy. Slots are
+                only proposed inside the hours everyone shares, so peers can answer without their LLM.
+        """
+        self.store = store
+        self.ask = ask
+        self.command = command
+        self.calendar = calendar
+        self.slots_per_round = slots_per_round
+        self.max_rounds = max_rounds
+        self.day_start = day_start
+        self.day_end = day_end
+        self.working_hours = working_hours or {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._steps = {
+            "propose": self._propose,
+            "collect": self._collect,
+            "confirm": self._confirm,
+            "book": self._book,
+        }
+
+    def new(
+        self, title: str, attendees: list[str], duration_minutes: int,
+        window_start: str, window_end: str,
+    ) -> NegotiationState:
+        state = NegotiationState(
+            meeting_id=f"mtg_{uuid.uuid4().hex[:8]}", title=title, attendees=attendees,
+            duration_minutes=duration_minutes, window_start=window_start, window_end=window_end,
+        )
+        self.store.save(state)
+        return state
+
+    async def run(self, meeting_id: str) -> NegotiationState:
+        """Advance a negotiation as far as it can go. Concurrent calls share one run."""
+        task = self._running.get(meeting_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._run(meeting_id), name=f"negotiation:{meeting_id}")
+            self._running[meeting_id] = task
+        return await asyncio.shield(task)
+
+    async def resume_pending(self):
+        """Resume every unfinished negotiation in the background (on startup)."""
+        for state in self.store.unfinished():
+            logger.info(f"Resuming negotiation {state.meeting_id} at step '{state.step}'")
+            task = asyncio.create_task(self.run(state.meeting_id))
+            task.add_done_callback(self._on_resume_done)
+
+    def _on_resume_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Negotiation resume failed: {task.exception()}")
+
+    async def _run(self, meeting_id: str) -> NegotiationState:
+        state = self.store.load(meeting_id)
+        if state is None:
+            raise ValueError(f"Unknown negotiation: {meeting_id}")
+        with conversation_scope(state.meeting_id):
+            while not state.finished:
+                step = state.step
+                try:
+                    with start_span("negotiation.step", meeting=state.meeting_id, step=step, round=state.round):
+                        await self._steps[step](state)
+                except NegotiationStalled as e:
+                    state.error = str(e)
+                    self.store.save(state)
+                    logger.warning(f"Negotiation {meeting_id} stalled at '{step}': {e}")
+                    return state
+                if state.step != "failed":
+                    state.error = None
+                self.store.save(state)
+                logger.info(f"Negotiation {meeting_id}: {step} -> {state.step}")
+        return state
+
+    # --- Steps ---
+
+    async def _propose(self, state: NegotiationState):
+        """Pick candidate slots from Person A's own calendar within everyone's working hours,
+        one per day first, mornings first.
+        """
+        hours = [(self.day_start, self.day_end)]
+        hours += [self.working_hours[a] for a in state.attendees if a in self.working_hours]
+        day_start, day_end = max(h[0] for h in hours), min(h[1] for h in hours)
+        if to_minutes(day_end) - to_minutes(day_start) < state.duration_minutes:
+            state.step = "failed"
+            state.error = f"the attendees share no {state.duration_minutes}-minute stretch of working hours"
+            return
+        grid = await self.calendar.find_free_starts(
+            date.fromisoformat(state.window_start), date.fromisoformat(state.window_end),
+            state.duration_minutes, day_start=day_start, day_end=day_end, step_minutes=30,
+        )
+        candidates = []
+        for day, start in grid.starts():
+            begin = to_minutes(dtime.fromisoformat(start))
+            slot = ProposedSlot(
+                date=day.isoformat(), start_time=start, end_time=format_minutes(begin + state.duration_minutes),
+            )
+            if slot.key not in state.rejected_slots:
+                candidates.append((day, begin, slot))
+
+        chosen: list[tuple[date, int, ProposedSlot]] = []
+        for one_per_day in (True, False):
+            for day, begin, slot in candidates:
+                if len(chosen) == self.slots_per_round:
+                    break
+                same_day = [b for d, b, _ in chosen if d == day]
+                if (one_per_day and same_day) or any(abs(b - begin) < state.duration_minutes for b in same_day):
+                    continue
+                chosen.append((day, begin, slot))
+        if not chosen:
+            state.step = "failed"
+            state.error = "no free slots left in the window"
+            return
+        state.proposed_slots = [slot for _, _, slot in sorted(chosen, key=lambda c: (c[0], c[1]))]
+        state.slot_status, state.responses = {}, {}
+        state.step = "collect"
+
+    async def _gather(self, state: NegotiationState, agents: list[str], call, apply):
+        """Call every agent at once, applying and checkpointing each reply as it arrives."""
+        async def one(agent):
+            return agent, await call(agent)
+
+        missing = []
+        for next_reply in asyncio.as_completed([one(agent) for agent in agents]):
+            agent, reply = await next_reply
+            if isinstance(reply, str) and _failed_contact(reply):
+                missing.append(agent)
+                continue
+            apply(agent, reply)
+            self.store.save(state)
+        if missing:
+            raise NegotiationStalled(missing)
+
+    async def _ask(self, state: NegotiationState, agent: str):
+        """(slot key -> status, the peer's text replies or None), or the failed-contact string.
+        A text reply means the peer's policy couldn't answer the whole request on its own (e.g. one
+        day is at its meeting limit), so the slots are re-asked one by one; slots still answered in
+        text are UNKNOWN, never taken as free.
+        """
+        answer = await self.ask(agent, state.proposed_slots)
+        if isinstance(answer, AvailabilityResponse):
+            return _statuses(answer), None
+        if _failed_contact(answer):
+            return answer
+        if len(state.proposed_slots) == 1:
+            return {state.proposed_slots[0].key: UNKNOWN}, answer
+
+        statuses, texts = {}, [answer]
+        singles = await asyncio.gather(*(self.ask(agent, [slot]) for slot in state.proposed_slots))
+        for slot, single in zip(state.proposed_slots, singles):
+            if isinstance(single, AvailabilityResponse):
+                statuses.update(_statuses(single))
+                continue
+            statuses[slot.key] = UNKNOWN
+            if not _failed_contact(single):
+                texts.append(single)
+        return statuses, "\n".join(texts)
+
+    async def _collect(self, state: NegotiationState):
+        def apply(agent, answer):
+            statuses, text = answer
+            state.slot_status[agent] = statuses
+            if text:
+                # The peer needed its LLM for some slots; its text reply is kept for the record
+                state.responses[agent] = text
+
+        pending = [a for a in state.attendees if a not in state.slot_status]
+        await self._gather(state, pending, lambda agent: self._ask(state, agent), apply)
+        state.step = "confirm"
+
+    def _choose(self, state: NegotiationState) -> ProposedSlot | None:
+        """First proposed slot every attendee reported free. An UNKNOWN slot is one a peer's
+        policy can't decide, so it would not accept it either.
+        """
+        for slot in state.proposed_slots:
+            if all(state.slot_status.get(agent, {}).get(slot.key) == "free" for agent in state.attendees):
+                return slot
+        return None
+
+    def _slot_command(self, state: NegotiationState, action: str) -> SlotCommand:
+        return SlotCommand(
+            action=action, slot=SlotQuery(**state.confirmed_slot.model_dump()),
+            title=state.title, attendees=state.attendees,
+        )
+
+    def _next_round(self, state: NegotiationState, reason: str):
+        if state.round >= self.max_rounds:
+            state.step = "failed"
+            state.error = f"{reason} after {state.round} rounds"
+            return
+        state.round += 1
+        state.step = "propose"
+
+    async def _confirm(self, state: NegotiationState):
+        """Have every attendee accept the chosen slot, which they keep holding until it is booked."""
+        if state.confirmed_slot is None:
+            slot = self._choose(state)
+            if slot is None:
+                state.rejected_slots += [s.key for s in state.proposed_slots]
+                self._next_round(state, "no common slot")
+                return
+            state.confirmed_slot = slot
+            self.store.save(state)
+
+        accept = self._slot_command(state, "accept")
+
+        def apply(agent, reply):
+            state.confirmations[agent] = outcome(reply)
+
+        pending = [a for a in state.attendees if a not in state.confirmations]
+        await self._gather(state, pending, lambda agent: self.command(agent, accept), apply)
+
+        declined = {a: r for a, r in state.confirmations.items() if r != ACCEPTED}
+        if not declined:
+            state.step = "book"
+            return
+        reasons = ", ".join(f"{a} ({r})" for a, r in declined.items())
+        logger.info(f"Negotiation {state.meeting_id}: {reasons} declined {state.confirmed_slot.key}")
+        await self._release(state, [a for a in state.attendees if a not in declined])
+        self._reject_slot(state)
+        self._next_round(state, f"{reasons} declined the last slot")
+
+    async def _book(self, state: NegotiationState):
+        """Book on Person A's calendar, then on every attendee's. If anyone can't, all of it is undone."""
+        slot = state.confirmed_slot
+        day = date.fromisoformat(slot.date)
+        marker = booking_marker(state.meeting_id)
+        # Booked before a restart, but not checkpointed
+        existing = next((e for e in await self.calendar.get_events(day) if e.notes == marker), None)
+        event = existing or await self.calendar.book_event(
+            title=state.title, target_date=day,
+            start=dtime.fromisoformat(slot.start_time), end=dtime.fromisoformat(slot.end_time),
+            attendees=state.attendees, notes=marker, owner=state.meeting_id,
+        )
+        if event is None:
+            await self._release(state, state.attendees)
+            self._reject_slot(state)
+            self._next_round(state, f"{slot.date} {slot.start_time} stopped being free on my person's calendar")
+            return
+        state.event_id = event.event_id
+        self.store.save(state)
+
+        book = self._slot_command(state, "book")
+        refused = {}
+
+        def apply(agent, reply):
+            result = outcome(reply)
+            if result == ACCEPTED:
+                state.booked.append(agent)
+            else:
+                refused[agent] = result
+
+        pending = [a for a in state.attendees if a not in state.booked]
+        await self._gather(state, pending, lambda agent: self.command(agent, book), apply)
+        if not refused:
+            state.step = "done"
+            return
+        reasons = ", ".join(f"{a} ({r})" for a, r in refused.items())
+        logger.info(f"Negotiation {state.meeting_id}: {reasons} could not book {slot.key}, undoing it")
+        await self.calendar.cancel_event(event.event_id)
+        await self._release(state, state.attendees)
+        self._reject_slot(state)
+        self._next_round(state, f"{reasons} could not book the last slot")
+
+    def _reject_slot(self, state: NegotiationState):
+        state.rejected_slots.append(state.confirmed_slot.key)
+        state.confirmed_slot, state.confirmations, state.booked, state.event_id = None, {}, [], None
+
+    async def _release(self, state: NegotiationState, agents: list[str]):
+        """Have attendees drop their hold on the slot and any booking of it (best effort)."""
+        release = self._slot_command(state, "release")
+        await asyncio.gather(*(self.command(agent, release) for agent in agents))
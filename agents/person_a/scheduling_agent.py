@@ -3,19 +3,42 @@ Person A's scheduling agent — extends the base with orchestration tools.
 Can send messages to other agents via A2A to coordinate meetings.
 """
 
+import asyncio
 import logging
 import time
+import uuid
 from pathlib import Path
 
 import httpx
 from langchain_core.tools import tool
 from a2a.client import ClientFactory
 from a2a.client.client import ClientConfig
-from a2a.types import Message, Part, TextPart, Role
+from a2a.types import DataPart, Message, Part, Role, Task, TaskIdParams, TaskQueryParams, TextPart
+from a2a.utils import new_agent_parts_message, new_agent_text_message
 from a2a.utils.parts import get_text_parts
 
 from agents.base_agent import SchedulingAgent
+from agents.policies import AVAILABILITY_POLICIES, working_hours
+from agents.person_a.models import ProposedSlot
+from agents.person_a.negotiation import NegotiationEngine, NegotiationStore, summarize
+from config import (
+    FLEET_MAP, FLEET_RELOAD_SECONDS, PEER_BREAKER_COOLDOWN_SECONDS, PEER_BREAKER_FAILURES,
+    PEER_MIN_TASK_TIMEOUT_SECONDS, PEER_MIN_TIMEOUT_SECONDS, PEER_POLL_INTERVAL_SECONDS, PEER_RETRIES,
+    PEER_RETRY_BASE_SECONDS, PEER_TASK_TIMEOUT_SECONDS, PEER_TIMEOUT_P95_MULTIPLIER, PEER_TIMEOUT_SECONDS,
+    PUSH_WEBHOOK_URL,
+)
 from shared.agent_registry import AgentRegistry
+from shared.availability import (
+    AvailabilityRequest, AvailabilityResponse, SlotCommand, SlotCommandResponse, SlotQuery,
+)
+from shared.cassette import replay_or_call
+from shared.conversation_memory import current_context_id
+from shared.grpc_transport import client_options, extra_transports
+from shared.model_router import ModelPolicy
+from shared.peer_health import GiveUp, PeerHealth, call_with_retries
+from shared.push_notifications import DONE_STATES, PushInbox, TaskTimeout
+from shared.tracing import inject, start_span
+from shared.usage import BUDGET_METADATA_KEY, USAGE_METADATA_KEY, current_usage
 
 
 # Initialize logger - will use person_a logger from server setup
@@ -30,10 +53,292 @@ KNOWN_AGENTS = {
 
 AGENT_DIR = Path(__file__).parent
 
+# Receives results of the non-blocking tasks we submit to peers (route mounted in server.py)
+PUSH_INBOX = PushInbox(PUSH_WEBHOOK_URL)
 
-def build_orchestration_tools(registry: AgentRegistry) -> list:
+# Structured availability requests Person A's agent answers without the LLM (see agents/policies.py)
+AVAILABILITY_POLICY = AVAILABILITY_POLICIES["person_a"]
+
+# Orchestration needs the large model, so no turn counts as routine
+MODEL_POLICY = ModelPolicy(routine_patterns=[])
+
+# Checkpoints of negotiations run by the start_negotiation tool (see negotiation.py)
+NEGOTIATION_DIR = AGENT_DIR / "negotiations"
+
+
+def _preview(text: str) -> str:
+    return f"{text[:150]}{'...' if len(text) > 150 else ''}"
+
+
+def _reply_text(reply: Message) -> str:
+    texts = get_text_parts(reply.parts)
+    return "\n".join(texts) if texts else str(reply)
+
+
+def _request_metadata() -> dict:
+    """Metadata for an outbound request: sender, trace context and remaining token budget."""
+    metadata = {"sender": "person_a"}
+    usage = current_usage()
+    if usage is not None and usage.remaining is not None:
+        metadata[BUDGET_METADATA_KEY] = usage.remaining
+    return inject(metadata)
+
+
+def _record_peer_usage(agent_name: str, message: Message):
+    """Add the usage a peer reported in its reply to the current request's tracker."""
+    usage = current_usage()
+    reported = (message.metadata or {}).get(USAGE_METADATA_KEY)
+    if usage is not None and reported:
+        usage.record_peer(agent_name, reported)
+
+
+async def exchange(
+    registry: AgentRegistry, agent_name: str, parts: list[Part], summary: str, push: bool = False,
+) -> Message:
+    """Send message parts to a peer agent and return its reply. Raises on transport errors,
+    or PeerUnavailable at once while the peer's circuit breaker is open.
+    With `push`, the peer runs it as a task and the reply arrives on our webhook instead of
+    over a held connection. `summary` is only used for logging.
+    """
+    request_id = f"a2a_{agent_name}_{int(time.time() * 1000)}"
+    # Retries reuse the messageId, so the peer answers them without running the request again
+    message_id = f"msg-{uuid.uuid4().hex}"
+    health = registry.peer_health(agent_name)
+    logger.info(f"[{request_id}] Sending message to '{agent_name}'")
+    logger.info(f"[{request_id}] >>> {_preview(summary)}")
+
+    def attempt(mid: str):
+        return lambda: _exchange(registry, request_id, agent_name, parts, push, mid, health)
+
+    with start_span("a2a.send", peer=agent_name, push=push):
+        # Recorded peer replies are served back in replay mode (see shared/cassette.py)
+        reply = await replay_or_call(
+            "a2a", {"peer": agent_name, "parts": [p.model_dump(mode="json", exclude_none=True) for p in parts]},
+            lambda: call_with_retries(
+                health, attempt(message_id), push=push,
+                retries=PEER_RETRIES, base_delay=PEER_RETRY_BASE_SECONDS,
+                # Blocking requests are quick calendar lookups, cheap enough to hedge
+                hedge=None if push else attempt(f"{message_id}-hedge"),
+                # Retries share the time one attempt may take at most
+                budget=PEER_TASK_TIMEOUT_SECONDS if push else PEER_TIMEOUT_SECONDS,
+            ),
+            Message,
+        )
+        logger.info(f"[{request_id}] <<< {_preview(_reply_text(reply))}")
+        return reply
+
+
+async def _exchange(
+    registry: AgentRegistry, request_id: str, agent_name: str, parts: list[Part], push: bool,
+    message_id: str, health: PeerHealth,
+) -> Message:
+    # Lookup agent URL (through the fleet map, if one is configured)
+    url = await registry.resolve(agent_name)
+
+    # Create httpx client with timeout. Push requests return as soon as the task is submitted;
+    # blocking ones get a timeout adapted to the peer's observed p95.
+    timeout = 30.0 if push else health.timeout(PEER_TIMEOUT_SECONDS, PEER_MIN_TIMEOUT_SECONDS)
+    async with httpx.AsyncClient(timeout=timeout) as http_client:
+        try:
+            return await _send(
+                registry, request_id, agent_name, parts, push, message_id, health, url, http_client, timeout,
+            )
+        except Exception:
+            registry.forget_card(url)
+            raise
+
+
+async def _send(
+    registry: AgentRegistry, request_id: str, agent_name: str, parts: list[Part], push: bool,
+    message_id: str, health: PeerHealth, url: str, http_client: httpx.AsyncClient, timeout: float,
+) -> Message:
+    # Connect to agent, over gRPC if its card offers it (see shared/grpc_transport.py)
+    connect_start = time.time()
+    logger.info(f"[{request_id}] Connecting to {agent_name}...")
+
+    client = await ClientFactory.connect(
+        agent=await registry.peer_card(url, http_client),
+        client_config=ClientConfig(
+            streaming=False,
+            httpx_client=http_client,
+            # Non-blocking send with our webhook attached: the peer replies with a task id at once
+            polling=push,
+            push_notification_configs=[PUSH_INBOX.config()] if push else [],
+            **client_options(),
+        ),
+        extra_transports=extra_transports(),
+    )
+
+    connect_duration = time.time() - connect_start
+    logger.info(f"[{request_id}] Connected in {connect_duration:.2f}s")
+
+    # Build and send request
+    request = Message(
+        role=Role.user,
+        parts=parts,
+        messageId=message_id,
+        # Reuse our own contextId so peers keep one conversation per negotiation
+        contextId=current_context_id(),
+    )
+
+    send_start = time.time()
+    logger.info(f"[{request_id}] Sending request to {agent_name}...")
+
+    # The httpx timeout doesn't cover gRPC calls, so blocking requests are also bounded here
+    async with asyncio.timeout(None if push else timeout):
+        # Collect response from async iterator
+        async for event in client.send_message(
+            request, request_metadata=_request_metadata()
+        ):
+            event_duration = time.time() - send_start
+
+            if isinstance(event, Message):
+                _record_peer_usage(agent_name, event)
+                logger.info(f"[{request_id}] Got response in {event_duration:.2f}s")
+                return event
+            elif isinstance(event, tuple):
+                task, _ = event
+                if task.status.state not in DONE_STATES:
+                    task_id = task.id
+                    logger.info(f"[{request_id}] Submitted task {task_id} in {event_duration:.2f}s, awaiting push")
+                    try:
+                        task = await PUSH_INBOX.wait(
+                            task_id,
+                            poll=lambda: client.get_task(TaskQueryParams(id=task_id)),
+                            poll_interval=PEER_POLL_INTERVAL_SECONDS,
+                            timeout=health.timeout(
+                                PEER_TASK_TIMEOUT_SECONDS, PEER_MIN_TASK_TIMEOUT_SECONDS, push=True,
+                            ),
+                        )
+                    except TaskTimeout as e:
+                        # The peer has the task; sending it again would only queue a second run
+                        await _cancel_task(request_id, client, task_id)
+                        raise GiveUp(str(e)) from e
+                    event_duration = time.time() - send_start
+                return _task_reply(request_id, agent_name, task, event_duration)
+
+    logger.warning(f"[{request_id}] No response received from {agent_name}")
+    return new_agent_text_message("No response received")
+
+
+async def _cancel_task(request_id: str, client, task_id: str):
+    """Ask the peer to stop a task we gave up on (best effort)."""
+    try:
+        await client.cancel_task(TaskIdParams(id=task_id))
+    except Exception as e:
+        logger.info(f"[{request_id}] Could not cancel task {task_id}: {e}")
+
+
+def _task_reply(request_id: str, agent_name: str, task: Task, duration: float) -> Message:
+    """The peer's reply from a finished task: its final status message, else history or artifacts."""
+    reply = task.status.message or (task.history[-1] if task.history else None)
+    if reply is not None:
+        _record_peer_usage(agent_name, reply)
+        logger.info(f"[{request_id}] Got task {task.status.state.value} reply in {duration:.2f}s")
+        return reply
+    if task.artifacts:
+        for artifact in task.artifacts:
+            if artifact.parts:
+                logger.info(f"[{request_id}] Got artifacts in {duration:.2f}s")
+                return new_agent_parts_message(artifact.parts)
+    logger.warning(f"[{request_id}] Task status: {task.status}")
+    return new_agent_text_message(f"Task status: {task.status}")
+
+
+async def send_a2a_message(registry: AgentRegistry, agent_name: str, message: str) -> str:
+    """Send a text message to a peer agent and return its reply text (or an error string)."""
+    try:
+        # Peers answer free text with a full LLM run, so don't hold a connection open for it
+        reply = await exchange(registry, agent_name, [Part(root=TextPart(text=message))], message, push=True)
+    except Exception as e:
+        logger.error(f"Failed to contact {agent_name}: {e}", exc_info=True)
+        return f"Failed to contact {agent_name}: {e}"
+    return _reply_text(reply)
+
+
+async def request_availability(
+    registry: AgentRegistry, agent_name: str, slots: list[ProposedSlot],
+) -> AvailabilityResponse | str:
+    """Ask a peer for free/busy on specific slots via a structured DataPart.
+    Returns the structured answer, or the peer's text reply if it needed its LLM to decide.
+    """
+    # Slots are only held for a conversation we name; the peer can't tie a hold to us otherwise
+    request = AvailabilityRequest(
+        slots=[SlotQuery(**s.model_dump()) for s in slots], hold=current_context_id() is not None,
+    )
+    try:
+        reply = await exchange(
+            registry, agent_name, [Part(root=DataPart(data=request.model_dump()))], request.to_text(),
+        )
+    except Exception as e:
+        logger.error(f"Failed to contact {agent_name}: {e}", exc_info=True)
+        return f"Failed to contact {agent_name}: {e}"
+
+    for part in reply.parts:
+        if isinstance(part.root, DataPart) and part.root.data.get("type") == "availability_response":
+            return AvailabilityResponse.model_validate(part.root.data)
+    return _reply_text(reply)
+
+
+async def send_slot_command(
+    registry: AgentRegistry, agent_name: str, command: SlotCommand,
+) -> SlotCommandResponse | str:
+    """Send a negotiation's accept/book/release for its slot. Returns the peer's structured
+    answer, or its text reply if it didn't give one.
+    """
+    slot = command.slot
+    try:
+        reply = await exchange(
+            registry, agent_name, [Part(root=DataPart(data=command.model_dump()))],
+            f"{command.action} {slot.date} {slot.start_time}-{slot.end_time}",
+        )
+    except Exception as e:
+        logger.error(f"Failed to contact {agent_name}: {e}", exc_info=True)
+        return f"Failed to contact {agent_name}: {e}"
+
+    for part in reply.parts:
+        if isinstance(part.root, DataPart) and part.root.data.get("type") == "slot_command_response":
+            return SlotCommandResponse.model_validate(part.root.data)
+    return _reply_text(reply)
+
+
+def build_orchestration_tools(registry: AgentRegistry, negotiations: NegotiationEngine) -> list:
     """Build tools that let Person A's agent talk to other agents."""
 
+    @tool
+    async def start_negotiation(
+        title: str, attendees: list[str], duration_minutes: int, window_start: str, window_end: str,
+    ) -> str:
+        """Schedule a meeting with other people's agents from start to finish:
+        propose slots, collect availability, confirm with everyone and book it.
+        Progress is saved, so it continues after interruptions. Prefer this for new meetings.
+        Args:
+            title: Meeting title
+            attendees: Agents to invite (e.g. ["person_b", "person_c"])
+            duration_minutes: Meeting length
+            window_start: First acceptable date, YYYY-MM-DD
+            window_end: Last acceptable date, YYYY-MM-DD
+        """
+        state = negotiations.new(title, attendees, duration_minutes, window_start, window_end)
+        return summarize(await negotiations.run(state.meeting_id))
+
+    @tool
+    async def negotiation_status(meeting_id: str = "", resume: bool = False) -> str:
+        """Check on negotiations started with start_negotiation, optionally resuming a stalled one.
+        Args:
+            meeting_id: The negotiation to check; empty lists all unfinished ones
+            resume: Retry a stalled negotiation from its last completed step
+        """
+        if not meeting_id:
+            pending = negotiations.store.unfinished()
+            return "\n".join(summarize(s) for s in pending) or "No unfinished negotiations."
+        state = negotiations.store.load(meeting_id)
+        if state is None:
+            return f"Unknown negotiation: {meeting_id}"
+        if resume and not state.finished:
+            state = await negotiations.run(meeting_id)
+        return summarize(state)
+
     @tool
     async def send_message_to_agent(agent_name: str, message: str) -> str:
         """Send a natural language message to another person's agent via A2A.
@@ -42,79 +347,20 @@ def build_orchestration_tools(registry: AgentRegistry) -> list:
             agent_name: The agent to contact (e.g. "person_b", "person_c")
             message: The natural language message to send
         """
-        request_id = f"a2a_{agent_name}_{int(time.time() * 1000)}"
-        logger.info(f"[{request_id}] Sending message to '{agent_name}'")
-        logger.info(f"[{request_id}] >>> {message[:150]}{'...' if len(message) > 150 else ''}")
-        try:
-            # Lookup agent URL
-            url = registry.get_agent_url(agent_name)
-
-            # Create httpx client with timeout
-            http_client = httpx.AsyncClient(timeout=180.0)  # 3 minutes
-
-            # Connect to agent
-            connect_start = time.time()
-            logger.info(f"[{request_id}] Connecting to {agent_name}...")
-
-            client = await ClientFactory.connect(
-                agent=url,
-                client_config=ClientConfig(
-                    streaming=False,
-                    httpx_client=http_client
-                ),
-            )
-
-            connect_duration = time.time() - connect_start
-            logger.info(f"[{request_id}] Connected in {connect_duration:.2f}s")
+        return await send_a2a_message(registry, agent_name, message)
 
-            # Build and send request
-            request = Message(
-                role=Role.user,
-                parts=[Part(root=TextPart(text=message))],
-                messageId=f"msg-{request_id}",
-            )
-
-            send_start = time.time()
-            logger.info(f"[{request_id}] Sending request to {agent_name}...")
-
-            # Collect response from async iterator
-            async for event in client.send_message(
-                request, request_metadata={"sender": "person_a"}
-            ):
-                event_duration = time.time() - send_start
-
-                if isinstance(event, Message):
-                    texts = get_text_parts(event.parts)
-                    response = "\n".join(texts) if texts else str(event)
-                    logger.info(f"[{request_id}] Got response in {event_duration:.2f}s")
-                    logger.info(f"[{request_id}] <<< {response[:150]}{'...' if len(response) > 150 else ''}")
-                    return response
-                elif isinstance(event, tuple):
-                    task, _ = event
-                    if task.history:
-                        last_msg = task.history[-1]
-                        texts = get_text_parts(last_msg.parts)
-                        response = "\n".join(texts) if texts else str(last_msg)
-                        logger.info(f"[{request_id}] Got task history in {event_duration:.2f}s")
-                        logger.info(f"[{request_id}] <<< {response[:150]}{'...' if len(response) > 150 else ''}")
-                        return response
-                    if task.artifacts:
-                        for artifact in task.artifacts:
-                            texts = get_text_parts(artifact.parts)
-                            if texts:
-                                response = "\n".join(texts)
-                                logger.info(f"[{request_id}] Got artifacts in {event_duration:.2f}s")
-                                logger.info(f"[{request_id}] <<< {response[:150]}{'...' if len(response) > 150 else ''}")
-                                return response
-                    logger.warning(f"[{request_id}] Task status: {task.status}")
-                    return f"Task status: {task.status}"
-
-            logger.warning(f"[{request_id}] No response received from {agent_name}")
-            return "No response received"
-
-        except Exception as e:
-            logger.error(f"[{request_id}] Failed to contact {agent_name}: {e}", exc_info=True)
-            return f"Failed to contact {agent_name}: {e}"
+    @tool
+    async def check_agent_availability(agent_name: str, slots: list[ProposedSlot]) -> str:
+        """Quickly check whether another person is free at specific times.
+        Much faster than send_message_to_agent; use it before proposing or confirming slots.
+        Returns free/held/busy per slot, or the agent's own reply if it needs to decide itself.
+        Free slots are held for this conversation for a while, so confirm one soon.
+        Args:
+            agent_name: The agent to ask (e.g. "person_b", "person_c")
+            slots: Time slots to check, each with date (YYYY-MM-DD), start_time and end_time (HH:MM)
+        """
+        answer = await request_availability(registry, agent_name, slots)
+        return answer if isinstance(answer, str) else answer.to_text()
 
     @tool
     def list_available_agents() -> str:
@@ -122,19 +368,43 @@ def build_orchestration_tools(registry: AgentRegistry) -> list:
         agents = registry.list_known_agents()
         return f"Known agents: {', '.join(agents)}"
 
-    return [send_message_to_agent, list_available_agents]
+    return [
+        start_negotiation, negotiation_status,
+        send_message_to_agent, check_agent_availability, list_available_agents,
+    ]
 
 
 def create_person_a_agent() -> SchedulingAgent:
     """Create Person A's scheduling agent with orchestration tools."""
     logger.info("Creating Person A's agent with orchestration tools")
-    registry = AgentRegistry(KNOWN_AGENTS)
-    extra_tools = build_orchestration_tools(registry)
+    registry = AgentRegistry(
+        KNOWN_AGENTS, fleet_source=FLEET_MAP, reload_seconds=FLEET_RELOAD_SECONDS,
+        health_options={
+            "p95_multiplier": PEER_TIMEOUT_P95_MULTIPLIER,
+            "breaker_failures": PEER_BREAKER_FAILURES,
+            "breaker_cooldown": PEER_BREAKER_COOLDOWN_SECONDS,
+        },
+    )
+    negotiations = NegotiationEngine(
+        NegotiationStore(NEGOTIATION_DIR),
+        ask=lambda agent, slots: request_availability(registry, agent, slots),
+        command=lambda agent, command: send_slot_command(registry, agent, command),
+        day_start=AVAILABILITY_POLICY.day_start, day_end=AVAILABILITY_POLICY.day_end,
+        # Proposals stay inside the hours all attendees share, which peers answer without their LLM
+        working_hours=working_hours(KNOWN_AGENTS),
+    )
+    extra_tools = build_orchestration_tools(registry, negotiations)
 
-    return SchedulingAgent(
+    agent = SchedulingAgent(
         soul_path=str(AGENT_DIR / "soul.md"),
         context_path=str(AGENT_DIR / "person_context.md"),
         calendar_path=str(AGENT_DIR / "calendar.csv"),
         extra_tools=extra_tools,
         agent_name="person_a_scheduling_agent",
+        availability_policy=AVAILABILITY_POLICY,
+        model_policy=MODEL_POLICY,
+        # Pick up negotiations interrupted by a restart
+        startup_tasks=[negotiations.resume_pending],
     )
+    negotiations.calendar = agent.calendar
+    return agent
@@ -6,6 +6,8 @@ from a2a.types import (
     AgentCapabilities,
 )
 
+from shared.availability import AVAILABILITY_MIME_TYPE, AVAILABILITY_SKILL_ID
+
 
 def build_agent_card(host: str = "localhost", port: int = 10003) -> AgentCard:
     return AgentCard(
@@ -20,7 +22,7 @@ def build_agent_card(host: str = "localhost", port: int = 10003) -> AgentCard:
         version="0.1.0",
         capabilities=AgentCapabilities(
             streaming=False,
-            pushNotifications=False,
+            pushNotifications=True,
         ),
         skills=[
             AgentSkill(
@@ -33,5 +35,17 @@ def build_agent_card(host: str = "localhost", port: int = 10003) -> AgentCard:
                     "What's your availability this week?",
                 ],
             ),
+            AgentSkill(
+                id=AVAILABILITY_SKILL_ID,
+                name="Structured Availability",
+                description=(
+                    "Machine-readable free/busy check. Send a DataPart "
+                    '{"type": "availability_request", "slots": [{"date", "start_time", "end_time"}]}; '
+                    "the reply is an availability_response with free/busy per slot, no event details."
+                ),
+                tags=["calendar", "availability", "structured"],
+                inputModes=[AVAILABILITY_MIME_TYPE],
+                outputModes=[AVAILABILITY_MIME_TYPE],
+            ),
         ],
     )
@@ -5,6 +5,9 @@ Uses the base SchedulingAgent as-is. Protective behavior comes from soul.md.
 
 from pathlib import Path
 from agents.base_agent import SchedulingAgent
+from agents.policies import AVAILABILITY_POLICIES
+from shared.availability import AVAILABILITY_SKILL_ID
+from shared.model_router import ModelPolicy
 
 AGENT_DIR = Path(__file__).parent
 
@@ -13,6 +16,13 @@ KNOWN_AGENTS = {
     "person_a": "http://localhost:10001",
 }
 
+# Structured availability requests answered without the LLM (see agents/policies.py)
+AVAILABILITY_POLICY = AVAILABILITY_POLICIES["person_c"]
+
+
+# Replies are mostly routine, so the small model answers unless a turn needs more.
+# Structured availability requests only reach the LLM when they need judgment.
+MODEL_POLICY = ModelPolicy(default_tier="small", skill_tiers={AVAILABILITY_SKILL_ID: "large"})
 
 def create_person_c_agent() -> SchedulingAgent:
     """Create Person C's scheduling agent — no extra tools."""
@@ -21,4 +31,6 @@ def create_person_c_agent() -> SchedulingAgent:
         context_path=str(AGENT_DIR / "person_context.md"),
         calendar_path=str(AGENT_DIR / "calendar.csv"),
         agent_name="person_c_scheduling_agent",
+        availability_policy=AVAILABILITY_POLICY,
+        model_policy=MODEL_POLICY,
     )
@@ -1,18 +1,28 @@
 """Person C's A2A server — unaware responder agent."""
 
 import logging
+import os
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
+from a2a.server.tasks import (
+    BasePushNotificationSender, InMemoryPushNotificationConfigStore, InMemoryTaskStore,
+)
+import httpx
 import uvicorn
 
 from agents.base_agent import SchedulingAgentExecutor
 from agents.person_c.agent_card import build_agent_card
 from agents.person_c.scheduling_agent import create_person_c_agent
+from config import CASSETTE_DIR, CASSETTE_LATENCY, CASSETTE_MODE, OTLP_ENDPOINT, TRACE_EXPORTER, TRACE_FILE
+from shared.cassette import configure_cassette
+from shared.grpc_transport import with_grpc_interface, with_grpc_server
 from shared.logging_config import setup_logging
+from shared.metrics import install_metrics, metrics_routes
+from shared.profiling import profile_routes
+from shared.tracing import configure_tracing
 
 
-PORT = 10003
+PORT = int(os.getenv("AGENT_PORT", 10003))  # override to run extra instances
 
 def _init_logging():
     # Make idempotent so reload doesn't duplicate handlers
@@ -24,18 +34,27 @@ def _init_logging():
 def create_app():
     _init_logging()
     logging.getLogger("person_c").info("Building app...")
+    configure_tracing("person_c", TRACE_EXPORTER, TRACE_FILE, OTLP_ENDPOINT)
+    configure_cassette("person_c", CASSETTE_MODE, CASSETTE_DIR, CASSETTE_LATENCY)
+    install_metrics()
 
     agent = create_person_c_agent()
     executor = SchedulingAgentExecutor(agent)
 
+    # Non-blocking callers get task updates POSTed to their webhook
+    push_store = InMemoryPushNotificationConfigStore()
     handler = DefaultRequestHandler(
         agent_executor=executor,
         task_store=InMemoryTaskStore(), # What does InMemoryTaskStore give us?
+        push_config_store=push_store,
+        push_sender=BasePushNotificationSender(httpx.AsyncClient(timeout=10.0), push_store),
     )
 
-    card = build_agent_card(port=PORT)
+    # Also served over gRPC for peers that support it
+    card = with_grpc_interface(build_agent_card(port=PORT), PORT)
     app = A2AStarletteApplication(agent_card=card, http_handler=handler)
-    return app.build()
+    lifespan = with_grpc_server(agent.lifespan, card, handler, PORT)
+    return app.build(routes=metrics_routes() + profile_routes(), lifespan=lifespan)
 
 def main():
     # Start uvicorn in reload mode, but using an import string so it can re-import on changes
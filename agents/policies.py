@@ -0,0 +1,41 @@
+"""
+Every person's availability policy, in one place.
+Each agent answers structured availability requests with its own entry (see
+shared/availability.py, and soul.md for the rules they mirror). Person A's
+negotiations and the batch scheduler read the others' entries to keep proposed
+meetings inside everyone's working hours and daily limits.
+"""
+
+from datetime import time
+
+from shared.availability import AvailabilityPolicy
+
+
+AVAILABILITY_POLICIES = {
+    "person_a": AvailabilityPolicy(
+        trusted_senders={"person_b", "person_c"},
+        day_start=time(9, 0),
+        day_end=time(17, 0),
+        max_meetings_per_day=5,
+    ),
+    "person_b": AvailabilityPolicy(
+        trusted_senders={"person_a", "person_c"},
+        day_start=time(9, 0),
+        day_end=time(17, 0),
+        max_meetings_per_day=5,
+    ),
+    "person_c": AvailabilityPolicy(
+        trusted_senders={"person_a", "person_b"},
+        day_start=time(10, 0),
+        day_end=time(17, 0),
+        max_meetings_per_day=4,
+    ),
+}
+
+
+def working_hours(people) -> dict[str, tuple[time, time]]:
+    """(day_start, day_end) for each of `people` that has a policy."""
+    return {
+        person: (AVAILABILITY_POLICIES[person].day_start, AVAILABILITY_POLICIES[person].day_end)
+        for person in people if person in AVAILABILITY_POLICIES
+    }
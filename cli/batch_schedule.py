@@ -0,0 +1,79 @@
+"""
+Batch interface — schedules a list of meetings directly against the calendars,
+without an LLM conversation per meeting. Meetings the solver can't place can be
+handed to Person A's agent one by one.
+
+Requests are a JSON list (see data/batch_requests_template.json):
+    [{"id": "sync-1", "title": "Team sync", "attendees": ["person_b", "person_c"],
+      "duration_minutes": 30, "window_start": "2026-03-02", "window_end": "2026-03-06",
+      "priority": 1}, ...]
+
+Usage: python -m cli.batch_schedule REQUESTS.json [--dry-run] [--llm-fallback]
+           [--calendar person_b=path/to/calendar.csv ...]
+"""
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from agents.policies import AVAILABILITY_POLICIES
+from cli.trigger import send_request
+from shared.batch_scheduler import BatchScheduler, load_requests
+from shared.calendar_store import CalendarStore
+from shared.logging_config import setup_logging
+
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent / "agents"
+
+
+def open_calendars(people: set[str], overrides: list[str]) -> dict[str, CalendarStore]:
+    """CalendarStore per person: agents/<person>/calendar.csv unless overridden with person=path."""
+    paths = {person: AGENTS_DIR / person / "calendar.csv" for person in people}
+    for item in overrides:
+        person, _, path = item.partition("=")
+        paths[person] = Path(path)
+    for person, path in paths.items():
+        if not path.exists():
+            raise SystemExit(f"No calendar for {person} at {path} (use --calendar {person}=PATH)")
+    return {person: CalendarStore(str(path), watch=False) for person, path in paths.items()}
+
+
+def main():
+    setup_logging("batch_schedule", level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Schedule many meetings in one pass")
+    parser.add_argument("requests", help="JSON list of meeting requests")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without booking")
+    parser.add_argument("--llm-fallback", action="store_true",
+                        help="send meetings that could not be placed to Person A's agent")
+    parser.add_argument("--calendar", action="append", default=[], metavar="PERSON=CSV",
+                        help="calendar file for a person (repeatable)")
+    args = parser.parse_args()
+
+    requests = load_requests(args.requests)
+    people = {p for r in requests for p in r.attendees}
+    stores = open_calendars(people, args.calendar)
+    scheduler = BatchScheduler(stores, {p: AVAILABILITY_POLICIES[p] for p in people if p in AVAILABILITY_POLICIES})
+    result = scheduler.solve(requests)
+
+    titles = {r.id: r.title for r in requests}
+    for a in result.assignments:
+        note = " (moved by repair)" if a.moved else ""
+        print(f"{a.request_id}: {titles[a.request_id]} on {a.date} {a.start_time}-{a.end_time}{note}")
+    for req in result.unscheduled:
+        print(f"{req.id}: {req.title} could not be placed")
+
+    if not args.dry_run and result.assignments:
+        booked = scheduler.book(result, requests)
+        print(f"\nBooked {sum(booked.values())} events across {len(booked)} calendars")
+
+    if args.llm_fallback and result.unscheduled:
+        print(f"\nHanding {len(result.unscheduled)} meetings to Person A's agent...")
+        for req in result.unscheduled:
+            print(f"\n[{req.id}]")
+            asyncio.run(send_request(req.describe()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark JSON-RPC against gRPC for agent-to-agent calls.
+Sends the same structured availability requests to a running peer over each
+transport the peer's AgentCard offers. The peer answers these without its LLM,
+so the numbers are transport overhead plus a calendar lookup. Each transport
+uses one client (one HTTP connection pool or gRPC channel) for all requests.
+
+Usage: python -m cli.bench_transport [--agent person_b] [--requests 500] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+
+import httpx
+from a2a.client import A2ACardResolver, ClientFactory
+from a2a.client.client import ClientConfig
+from a2a.types import DataPart, Message, Part, Role, TransportProtocol
+
+from config import KNOWN_AGENTS
+from shared.availability import AvailabilityRequest, AvailabilityResponse, SlotQuery
+from shared.grpc_transport import close_channels, extra_transports, grpc_available
+from shared.logging_config import setup_logging
+
+
+def workload(count: int, slots_per_request: int = 3) -> list[AvailabilityRequest]:
+    """The same availability requests for every transport, spread over two working weeks."""
+    days = [date.today() + timedelta(days=d) for d in range(14) if (date.today() + timedelta(days=d)).weekday() < 5]
+    requests = []
+    for i in range(count):
+        slots = []
+        for j in range(slots_per_request):
+            day = days[(i + j) % len(days)]
+            hour = 9 + (i * slots_per_request + j) % 8
+            slots.append(SlotQuery(date=day.isoformat(), start_time=f"{hour:02d}:00", end_time=f"{hour + 1:02d}:00"))
+        requests.append(AvailabilityRequest(slots=slots))
+    return requests
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def run(transport: str, card, http_client: httpx.AsyncClient, requests, concurrency: int, sender: str) -> dict:
+    client = await ClientFactory.connect(
+        agent=card,
+        client_config=ClientConfig(
+            streaming=False,
+            httpx_client=http_client,
+            supported_transports=[transport],
+        ),
+        extra_transports=extra_transports(),
+    )
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int, request: AvailabilityRequest):
+        nonlocal errors
+        message = Message(
+            role=Role.user, parts=[Part(root=DataPart(data=request.model_dump()))],
+            messageId=f"bench-{transport}-{i}-{time.monotonic_ns()}",
+        )
+        async with gate:
+            start = time.perf_counter()
+            try:
+                async for event in client.send_message(message, request_metadata={"sender": sender}):
+                    AvailabilityResponse.model_validate(event.parts[0].root.data)
+                    break
+            except Exception as e:
+                errors += 1
+                logging.getLogger("bench_transport").warning(f"{transport} request {i} failed: {e}")
+                return
+            latencies.append(time.perf_counter() - start)
+
+    # Warm up connections and the peer's calendar caches
+    await asyncio.gather(*(one(-i - 1, r) for i, r in enumerate(requests[:min(20, len(requests))])))
+    latencies.clear()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, r) for i, r in enumerate(requests)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "transport": transport,
+        "requests": len(latencies),
+        "errors": errors,
+        "per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(ordered, 0.50) * 1000 if ordered else 0.0,
+        "p95_ms": _percentile(ordered, 0.95) * 1000 if ordered else 0.0,
+        "p99_ms": _percentile(ordered, 0.99) * 1000 if ordered else 0.0,
+    }
+
+
+async def bench(agent: str, count: int, concurrency: int, sender: str):
+    url = KNOWN_AGENTS[agent]
+    async with httpx.AsyncClient(timeout=30.0, limits=httpx.Limits(max_connections=concurrency)) as http_client:
+        card = await A2ACardResolver(http_client, url).get_agent_card()
+        offered = [card.preferred_transport] + [i.transport for i in card.additional_interfaces or []]
+        transports = [t.value for t in (TransportProtocol.jsonrpc, TransportProtocol.grpc) if t.value in offered]
+        if TransportProtocol.grpc.value not in transports:
+            print(f"{agent} does not offer gRPC; start it with a2a-sdk[grpc] installed and A2A_GRPC=on")
+        elif not grpc_available():
+            print("gRPC client support is not available here (install a2a-sdk[grpc])")
+            transports.remove(TransportProtocol.grpc.value)
+
+        requests = workload(count)
+        results = [await run(t, card, http_client, requests, concurrency, sender) for t in transports]
+    await close_channels()
+
+    print(f"\n{count} availability requests to {agent}, concurrency {concurrency}")
+    print(f"{'transport':<10} {'ok':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(
+            f"{r['transport']:<10} {r['requests']:>6} {r['errors']:>6} {r['per_second']:>9.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+
+
+def main():
+    setup_logging("bench_transport", level=logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="Compare A2A transports on a running peer")
+    parser.add_argument("--agent", default="person_b", choices=sorted(KNOWN_AGENTS))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sender", default="person_a", help="sender the peer trusts for structured requests")
+    args = parser.parse_args()
+    asyncio.run(bench(args.agent, args.requests, args.concurrency, args.sender))
+
+
+if __name__ == "__main__":
+    main()
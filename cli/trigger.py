@@ -3,7 +3,7 @@ Human interface — sends a natural language message to Person A's agent, and re
 This is like a low-level frontend. Ideally, we would connect this to a nicer visualization,
 and stream text and show options on the fly. We would also have "human-in-the-loop",
 and store previous message history (compacted).
-Usage: python cli/trigger.py "Schedule a 1-hour meeting with Person B and Person C"
+Usage: python cli/trigger.py [--budget TOKENS] "Schedule a 1-hour meeting with Person B and Person C"
 """
 
 import sys
@@ -19,6 +19,7 @@ from a2a.utils.parts import get_text_parts
 
 from config import KNOWN_AGENTS
 from shared.logging_config import setup_logging
+from shared.usage import BUDGET_METADATA_KEY, USAGE_METADATA_KEY
 
 
 PERSON_A_URL = KNOWN_AGENTS["person_a"]
@@ -29,7 +30,24 @@ def extract_text(parts: list[Part]) -> str:
     return "\n".join(get_text_parts(parts))
 
 
-async def send_request(message_text: str):
+def print_usage(message: Message):
+    """Print the token/cost summary Person A's agent attached to its reply."""
+    usage = (message.metadata or {}).get(USAGE_METADATA_KEY)
+    if not usage:
+        return
+    total = usage["total"]
+    print(
+        f"\nUsage: {total['total_tokens']} tokens "
+        f"(prompt={total['prompt_tokens']}, cached={total['cached_tokens']}, "
+        f"completion={total['completion_tokens']}), {total['llm_calls']} LLM calls, "
+        f"${total['cost_usd']:.4f}"
+        + (f", {usage['model_tier']} model" if usage.get("model_tier") else "")
+    )
+    for peer, peer_usage in usage.get("peers", {}).items():
+        print(f"  {peer}: {peer_usage['total_tokens']} tokens, ${peer_usage['cost_usd']:.4f}")
+
+
+async def send_request(message_text: str, budget: int | None = None):
     """Send a message to Person A's agent and print the response."""
     logger = logging.getLogger("trigger_client")
     request_id = f"cli_{int(time.time() * 1000)}"
@@ -69,8 +87,12 @@ async def send_request(message_text: str):
         logger.info(f"[{request_id}] Sending request...")
 
         # We send the message with client.send_message() async, then wait for event.
+        request_metadata = {"sender": "human"}
+        if budget is not None:
+            request_metadata[BUDGET_METADATA_KEY] = budget
+
         async for event in client.send_message(
-            request, request_metadata={"sender": "human"}
+            request, request_metadata=request_metadata
         ):
             event_duration = time.time() - send_start
             logger.debug(f"[{request_id}] Received event after {event_duration:.2f}s")
@@ -83,6 +105,7 @@ async def send_request(message_text: str):
                     total_duration = time.time() - send_start
                     logger.info(f"[{request_id}] Received response in {total_duration:.2f}s")
                     print(f"Response:\n{text}")
+                    print_usage(event)
                 else:
                     logger.warning(f"[{request_id}] Received message with no text")
                     print(f"Response (no text): {event}")
@@ -96,6 +119,7 @@ async def send_request(message_text: str):
                         total_duration = time.time() - send_start
                         logger.info(f"[{request_id}] Received task history in {total_duration:.2f}s")
                         print(f"Response:\n{text}")
+                        print_usage(last_msg)
                 elif task.artifacts:
                     for artifact in task.artifacts:
                         text = extract_text(artifact.parts)
@@ -124,12 +148,18 @@ def main():
     # Setup logging
     setup_logging("trigger_client", level=logging.INFO)
 
-    if len(sys.argv) < 2:
-        print("Usage: python cli/trigger.py \"Your message here\"")
+    args = sys.argv[1:]
+    budget = None
+    if len(args) >= 2 and args[0] == "--budget":
+        budget = int(args[1])
+        args = args[2:]
+
+    if not args:
+        print("Usage: python cli/trigger.py [--budget TOKENS] \"Your message here\"")
         sys.exit(1)
 
-    message = " ".join(sys.argv[1:])
-    asyncio.run(send_request(message))
+    message = " ".join(args)
+    asyncio.run(send_request(message, budget=budget))
 
 
 if __name__ == "__main__":
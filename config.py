@@ -5,6 +5,7 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY_SDIC")
 if OPENAI_API_KEY:
     os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 OPENAI_MODEL = "gpt-5.2"
+OPENAI_SMALL_MODEL = "gpt-5-mini"  # routine turns (see shared/model_router.py)
 
 # Agent servers
 KNOWN_AGENTS = {
@@ -12,3 +13,64 @@ KNOWN_AGENTS = {
     "person_b": "http://localhost:10002",
     "person_c": "http://localhost:10003",
 }
+
+# Worker threads for blocking calendar I/O (bounds concurrent calendar work per agent)
+CALENDAR_WORKER_THREADS = 8
+# Bookings are group-committed to the CSV this often, or sooner once a batch fills
+CALENDAR_FLUSH_INTERVAL_SECONDS = 0.05
+CALENDAR_MAX_BATCH = 256
+CALENDAR_RECHECK_SECONDS = 2.0  # idle re-check for outside edits (e.g. a person moved between workers)
+# Calendar tool results are paginated to stay under this many tokens (see shared/calendar_views.py)
+TOOL_RESULT_MAX_TOKENS = 300
+CALENDAR_VIEW_MAX_DAYS = 62  # longest range get_busy_blocks covers in one call
+
+# Optional fleet map (JSON file path or registry service URL) routing people to shards of workers
+FLEET_MAP = os.getenv("A2A_FLEET_MAP")
+FLEET_RELOAD_SECONDS = 5.0
+
+# A2A transports. Servers also serve gRPC on their HTTP port + offset when a2a-sdk[grpc] is
+# installed (see shared/grpc_transport.py); clients use the first of A2A_TRANSPORTS a peer offers
+GRPC_ENABLED = os.getenv("A2A_GRPC", "on") == "on"
+GRPC_PORT_OFFSET = 100
+A2A_TRANSPORTS = os.getenv("A2A_TRANSPORTS", "GRPC,JSONRPC").split(",")
+
+# Push notifications — where peers POST task updates for Person A's non-blocking requests
+PUSH_WEBHOOK_URL = os.getenv("A2A_PUSH_WEBHOOK_URL", f"{KNOWN_AGENTS['person_a']}/a2a/notifications")
+PEER_TASK_TIMEOUT_SECONDS = 600   # give up on a peer task after this long
+PEER_POLL_INTERVAL_SECONDS = 15   # poll the peer if no notification arrived in this long
+
+# Peer resilience (see shared/peer_health.py). Timeouts adapt to each peer's observed p95
+PEER_TIMEOUT_SECONDS = 180.0          # blocking exchanges, until a p95 is known
+PEER_MIN_TIMEOUT_SECONDS = 5.0
+PEER_MIN_TASK_TIMEOUT_SECONDS = 60.0  # push exchanges; PEER_TASK_TIMEOUT_SECONDS is the cap
+PEER_TIMEOUT_P95_MULTIPLIER = 2.0
+PEER_RETRIES = 2                      # transport failures, with full-jitter backoff
+PEER_RETRY_BASE_SECONDS = 0.5
+PEER_BREAKER_FAILURES = 5             # consecutive failures before failing fast
+PEER_BREAKER_COOLDOWN_SECONDS = 30.0
+
+# Record/replay — "off", "record" (save LLM calls and A2A messages to cassettes) or "replay"
+CASSETTE_MODE = os.getenv("A2A_CASSETTE_MODE", "off")
+CASSETTE_DIR = os.getenv("A2A_CASSETTE_DIR", "cassettes")
+CASSETTE_LATENCY = os.getenv("A2A_CASSETTE_LATENCY", "original")  # "original", "zero" or a multiplier
+
+# Tracing — exporter is one of "none", "console", "file", "otlp"
+TRACE_EXPORTER = os.getenv("A2A_TRACE_EXPORTER", "none")
+TRACE_FILE = os.getenv("A2A_TRACE_FILE", "traces.jsonl")
+OTLP_ENDPOINT = os.getenv("A2A_OTLP_ENDPOINT", "http://localhost:4318")
+
+# Admin routes — GET /admin/profile samples stacks (see shared/profiling.py); set a token to require it
+ADMIN_TOKEN = os.getenv("A2A_ADMIN_TOKEN")
+PROFILE_MAX_SECONDS = 120
+
+# USD per 1M tokens, used for cost accounting. Update to match your contract.
+MODEL_PRICES = {
+    "gpt-5.2": {"input": 1.75, "cached_input": 0.175, "output": 14.00},
+    "gpt-5-mini": {"input": 0.25, "cached_input": 0.025, "output": 2.00},
+}
+
+# Conversation memory per (sender, A2A contextId)
+MEMORY_MAX_CONVERSATIONS = 256
+MEMORY_IDLE_TTL_SECONDS = 3600
+MEMORY_TOKEN_THRESHOLD = 4000   # summarize older turns once history passes this
+MEMORY_KEEP_RECENT_TURNS = 2    # turns kept verbatim after summarizing
@@ -38,8 +38,10 @@ def validate_openai_key(api_key: str) -> ChatOpenAI:
         raise
 
 def main():
-    llm = validate_openai_key(os.getenv("OPENAI_API_KEY_SDIC"))
-    print(llm)
+    # Replayed runs answer LLM calls from cassettes and need no key
+    if os.getenv("A2A_CASSETTE_MODE") != "replay":
+        llm = validate_openai_key(os.getenv("OPENAI_API_KEY_SDIC"))
+        print(llm)
     processes = []
 
     for name, script in AGENTS:
@@ -1,36 +1,196 @@
 """
-Agent discovery.
-Each agent passes in its own known_agents dict.
+Agent discovery and routing.
+Each agent passes in its own known_agents dict. Optionally a fleet map (a JSON
+file or a registry service URL) spreads people across shards of worker
+processes:
+
+    {
+      "agents": {"person_a": "http://localhost:10001"},
+      "shards": {"local": ["http://localhost:11001", "http://localhost:11002"]},
+      "people": {"person_b": "local", "person_c": "local"},
+      "default_shard": "local"
+    }
+
+"agents" pins a person to one URL. Otherwise the person's shard is looked up
+in "people" (falling back to "default_shard"), and a consistent hash ring over
+that shard's workers picks the worker, which serves the person under
+`/<person>` (see agents/fleet_worker.py). Adding or removing a worker only
+moves the people that hash to it. The map is reloaded while running.
+
+Serve a fleet file as a local registry service, or print where people route:
+    python -m shared.agent_registry serve fleet.json --port 9100
+    python -m shared.agent_registry route fleet.json person_b person_c
 """
 
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from bisect import bisect
+
 import httpx
+from a2a.client import A2ACardResolver
+from a2a.types import AgentCard
+
+from shared.peer_health import PeerHealth
+
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring; each node is placed at `replicas` points to even out the load."""
+
+    def __init__(self, nodes: list[str], replicas: int = 64):
+        if not nodes:
+            raise ValueError("a hash ring needs at least one node")
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._keys = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def lookup(self, key: str) -> str:
+        """The first node clockwise from the key's hash."""
+        return self._nodes[bisect(self._keys, _hash(key)) % len(self._keys)]
+
+
+class FleetMap:
+    """Parsed fleet map: pinned agents, shards of workers, and which shard each person lives on."""
+
+    def __init__(self, data: dict):
+        self.agents: dict[str, str] = dict(data.get("agents", {}))
+        self.shards: dict[str, list[str]] = {k: list(v) for k, v in data.get("shards", {}).items()}
+        self.people: dict[str, str] = dict(data.get("people", {}))
+        self.default_shard: str | None = data.get("default_shard")
+        for person, shard in self.people.items():
+            if shard not in self.shards:
+                raise ValueError(f"{person} is assigned to unknown shard {shard!r}")
+        self._rings = {name: HashRing(workers) for name, workers in self.shards.items() if workers}
+
+    def route(self, person: str) -> str | None:
+        """Base URL of the agent serving `person`, or None if the map doesn't cover them."""
+        if person in self.agents:
+            return self.agents[person]
+        shard = self.people.get(person, self.default_shard)
+        ring = self._rings.get(shard)
+        if ring is None:
+            return None
+        return f"{ring.lookup(person).rstrip('/')}/{person}"
+
+    def names(self) -> list[str]:
+        return list(dict.fromkeys([*self.agents, *self.people]))
 
 
 class AgentRegistry:
     """Lookup and fetch AgentCards for agents this agent knows about."""
 
-    def __init__(self, known_agents: dict[str, str]):
+    def __init__(
+        self, known_agents: dict[str, str],
+        fleet_source: str | None = None, reload_seconds: float = 5.0,
+        health_options: dict | None = None,
+    ):
         """
         Args:
             known_agents: {"person_b": "http://localhost:10002", ...}
+            fleet_source: Optional fleet map — a JSON file path or a registry service URL.
+                People it covers are routed by it; known_agents is the fallback.
+            reload_seconds: How often to check the fleet source for changes.
+            health_options: PeerHealth settings (p95_multiplier, breaker_failures, ...).
         """
         self.known_agents = known_agents
+        self.fleet_source = fleet_source
+        self.reload_seconds = reload_seconds
+        self.fleet: FleetMap | None = None
+        self._checked = 0.0
+        self._mtime: int | None = None
+        self.health_options = health_options or {}
+        self._health: dict[str, PeerHealth] = {}
+        self._cards: dict[str, AgentCard] = {}  # by base URL
+
+    def _is_remote(self) -> bool:
+        return bool(self.fleet_source) and self.fleet_source.startswith(("http://", "https://"))
+
+    def _due(self) -> bool:
+        if not self.fleet_source or time.monotonic() - self._checked < self.reload_seconds:
+            return False
+        self._checked = time.monotonic()
+        return True
+
+    def _apply(self, data: dict):
+        try:
+            fleet = FleetMap(data)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring invalid fleet map from {self.fleet_source}: {e}")
+            return
+        if self.fleet is not None:
+            logger.info(f"Reloaded fleet map from {self.fleet_source}")
+        self.fleet = fleet
+
+    def _reload_file(self):
+        """Re-read the fleet file if it changed since the last check."""
+        if self._is_remote() or not self._due():
+            return
+        try:
+            mtime = os.stat(self.fleet_source).st_mtime_ns
+            if mtime == self._mtime:
+                return
+            with open(self.fleet_source, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read fleet map {self.fleet_source}: {e}")
+            return
+        self._mtime = mtime
+        self._apply(data)
+
+    async def refresh(self):
+        """Reload the fleet map if it is due, from the file or the registry service."""
+        if not self._is_remote():
+            self._reload_file()
+            return
+        if not self._due():
+            return
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                resp = await client.get(self.fleet_source)
+                resp.raise_for_status()
+                data = resp.json()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Could not fetch fleet map from {self.fleet_source}: {e}")
+            return
+        self._apply(data)
+
+    async def resolve(self, agent_name: str) -> str:
+        """Get an agent's base URL, refreshing the fleet map first if it is due."""
+        await self.refresh()
+        return self.get_agent_url(agent_name)
 
     async def get_agent_card(self, agent_name: str) -> dict:
         """Fetch an agent's AgentCard JSON from its well-known URL."""
-        base_url = self.known_agents.get(agent_name)
-        if not base_url:
-            raise ValueError(f"Unknown agent: {agent_name}")
-
+        base_url = await self.resolve(agent_name)
         async with httpx.AsyncClient() as client:
             resp = await client.get(f"{base_url}/.well-known/agent.json")
             resp.raise_for_status()
             return resp.json()
 
+    async def peer_card(self, url: str, http_client: httpx.AsyncClient) -> AgentCard:
+        """The AgentCard served at `url`, fetched once and reused until `forget_card`."""
+        if url not in self._cards:
+            self._cards[url] = await A2ACardResolver(http_client, url).get_agent_card()
+        return self._cards[url]
+
+    def forget_card(self, url: str):
+        """Drop a cached card, e.g. after a failed call (the peer may have restarted differently)."""
+        self._cards.pop(url, None)
+
     async def get_all_agent_cards(self) -> dict[str, dict]:
         """Fetch AgentCards for all known agents."""
         cards = {}
-        for name in self.known_agents:
+        for name in self.list_known_agents():
             try:
                 cards[name] = await self.get_agent_card(name)
             except Exception:
@@ -39,11 +199,54 @@ class AgentRegistry:
 
     def get_agent_url(self, agent_name: str) -> str:
         """Get the base URL for a known agent."""
-        url = self.known_agents.get(agent_name)
+        self._reload_file()
+        url = self.fleet.route(agent_name) if self.fleet else None
+        url = url or self.known_agents.get(agent_name)
         if not url:
             raise ValueError(f"Unknown agent: {agent_name}")
         return url
 
+    def peer_health(self, agent_name: str) -> PeerHealth:
+        """Latency stats and circuit breaker for a peer, created on first use."""
+        if agent_name not in self._health:
+            self._health[agent_name] = PeerHealth(agent_name, **self.health_options)
+        return self._health[agent_name]
+
     def list_known_agents(self) -> list[str]:
         """List all known agent names."""
-        return list(self.known_agents.keys())
+        self._reload_file()
+        fleet_names = self.fleet.names() if self.fleet else []
+        return list(dict.fromkeys([*self.known_agents, *fleet_names]))
+
+
+def _serve(path: str, port: int):
+    """A minimal registry service: GET /fleet returns the fleet file, re-read on every request."""
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import FileResponse
+    from starlette.routing import Route
+
+    async def fleet(request):
+        return FileResponse(path, media_type="application/json")
+
+    uvicorn.run(Starlette(routes=[Route("/fleet", fleet)]), host="0.0.0.0", port=port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fleet map tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="serve a fleet file at /fleet")
+    serve.add_argument("fleet")
+    serve.add_argument("--port", type=int, default=9100)
+    route = sub.add_parser("route", help="print where people are routed")
+    route.add_argument("fleet")
+    route.add_argument("people", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        _serve(args.fleet, args.port)
+    else:
+        with open(args.fleet, encoding="utf-8") as f:
+            fleet_map = FleetMap(json.load(f))
+        for person in args.people:
+            print(f"{person} -> {fleet_map.route(person)}")
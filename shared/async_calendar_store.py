@@ -0,0 +1,181 @@
+"""
+Async front end for CalendarStore.
+Reads are answered from the store's in-memory index on the event loop. The
+facade owns the CSV, so reads never check it on disk. While a cancellation or
+reload holds the store's lock through a CSV rewrite, calls go to the worker
+pool instead, so the loop never waits on that lock. Bookings update memory
+at once and are group-committed: a background task appends everything booked
+in the last `flush_interval` seconds to the CSV in one write on the worker
+pool, and each `book_event` returns once its batch is on disk. While idle, the
+committer re-checks the file every `recheck_interval` seconds, so a person who
+moves to another fleet worker sees bookings the previous worker made.
+
+Servers call `open()` on startup and `close()` on shutdown (see
+SchedulingAgent.lifespan); `close()` flushes pending bookings.
+"""
+
+import asyncio
+import logging
+from datetime import date, time
+from time import monotonic
+
+from config import CALENDAR_FLUSH_INTERVAL_SECONDS, CALENDAR_MAX_BATCH, CALENDAR_RECHECK_SECONDS
+from shared.availability import AvailabilityPolicy, AvailabilityRequest, AvailabilityResponse, answer_availability
+from shared.calendar_event import CalendarEvent, Hold
+from shared.calendar_store import CalendarStore
+from shared.freebusy import CandidateGrid
+from shared.offload import offload
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCalendarStore:
+    """Async CalendarStore API with in-memory reads and group-committed writes."""
+
+    def __init__(
+        self, store: CalendarStore,
+        flush_interval: float = CALENDAR_FLUSH_INTERVAL_SECONDS, max_batch: int = CALENDAR_MAX_BATCH,
+        recheck_interval: float = CALENDAR_RECHECK_SECONDS,
+    ):
+        store.watch = False
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.recheck_interval = recheck_interval
+        self._rechecked = monotonic()
+        self._pending: list[tuple[CalendarEvent, asyncio.Future]] = []
+        self._batch_full = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+        self._loaded = False
+
+    async def open(self):
+        """Load the calendar off the loop and start the background committer. Idempotent."""
+        if not self._loaded:
+            await offload(self.store.load)
+            self._loaded = True
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop(), name=f"flush:{self.store.csv_path}")
+
+    async def flush(self):
+        """Write every pending booking now."""
+        async with self._write_lock:
+            await self._commit()
+
+    async def close(self):
+        """Stop the committer and flush what is left."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._batch_full.clear()
+            try:
+                await self.flush()
+                if monotonic() - self._rechecked >= self.recheck_interval:
+                    await self._recheck()
+            except Exception:
+                logger.exception(f"Failed to sync {self.store.csv_path}")
+
+    async def _recheck(self):
+        async with self._write_lock:
+            if not self._pending:
+                await offload(self.store.reload_if_changed)
+                self._rechecked = monotonic()
+
+    async def _commit(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Shielded: a write on the pool can't be stopped, and the batch's bookers wait on its outcome
+        # even if the committer is cancelled meanwhile (e.g. by close())
+        await asyncio.shield(self._write(batch))
+
+    async def _write(self, batch: list[tuple[CalendarEvent, asyncio.Future]]):
+        try:
+            await offload(self.store.append_events, [event for event, _ in batch])
+        except Exception as e:
+            # Drop the unwritten bookings from memory
+            self.store.invalidate()
+            for _, done in batch:
+                done.set_exception(e)
+            raise
+        for _, done in batch:
+            done.set_result(None)
+
+    async def _call(self, method, *args, **kwargs):
+        """Run a store method on the loop if the store's lock is free, else on the worker pool."""
+        await self.open()
+        lock = self.store._lock
+        if lock.acquire(blocking=False):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                lock.release()
+        return await offload(method, *args, **kwargs)
+
+    async def get_events(self, target_date: date) -> list[CalendarEvent]:
+        return await self._call(self.store.get_events, target_date)
+
+    async def get_events_range(self, start: date, end: date) -> list[CalendarEvent]:
+        return await self._call(self.store.get_events_range, start, end)
+
+    async def is_available(self, target_date: date, start: time, end: time, owner: str | None = None) -> bool:
+        return await self._call(self.store.is_available, target_date, start, end, owner)
+
+    async def slot_status(self, target_date: date, start: time, end: time, owner: str | None = None) -> str:
+        return await self._call(self.store.slot_status, target_date, start, end, owner)
+
+    async def get_free_slots(
+        self, target_date: date, duration_minutes: int,
+        day_start: time = time(9, 0), day_end: time = time(17, 0), owner: str | None = None,
+    ) -> list[dict]:
+        return await self._call(self.store.get_free_slots, target_date, duration_minutes, day_start, day_end, owner)
+
+    async def place_hold(
+        self, target_date: date, start: time, end: time, owner: str, ttl_seconds: float,
+    ) -> Hold | None:
+        """Holds are in memory only, so nothing is written."""
+        return await self._call(self.store.place_hold, target_date, start, end, owner, ttl_seconds)
+
+    async def release_holds(self, owner: str):
+        await self._call(self.store.release_holds, owner)
+
+    async def find_free_starts(self, start: date, end: date, duration_minutes: int, **kwargs) -> CandidateGrid:
+        return await self._call(self.store.find_free_starts, start, end, duration_minutes, **kwargs)
+
+    async def answer_availability(
+        self, request: AvailabilityRequest, sender: str, policy: AvailabilityPolicy, owner: str | None = None,
+    ) -> AvailabilityResponse | None:
+        """`shared.availability.answer_availability` against this calendar, as one locked call."""
+        return await self._call(answer_availability, self.store, request, sender, policy, owner)
+
+    async def book_event(self, *args, **kwargs) -> CalendarEvent | None:
+        """Book like `CalendarStore.book_event`; returns once the booking is on disk."""
+        event = await self._call(self.store.book_event, *args, persist=False, **kwargs)
+        if event is None:
+            return None
+        committed = asyncio.get_running_loop().create_future()
+        self._pending.append((event, committed))
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+        await committed
+        return event
+
+    async def cancel_event(self, event_id: str) -> bool:
+        """Cancel an event. Pending bookings are written first, since this rewrites the file."""
+        await self.open()
+        async with self._write_lock:
+            await self._commit()
+            return await offload(self.store.cancel_event, event_id)
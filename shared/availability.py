@@ -0,0 +1,202 @@
+"""
+Structured availability exchange between agents.
+A peer sends an `availability_request` as an A2A DataPart; the receiving
+executor answers it straight from CalendarStore and the person's policy,
+without an LLM run. Answers only say "free", "held" or "busy" per slot — never
+what the event is. A request with `hold` set has its free slots tentatively
+held for the asking negotiation (the A2A contextId it sends), so they are still
+free when it comes back to confirm. Plain probes hold nothing.
+Requests the policy can't decide alone (unknown sender, outside working hours,
+a day already at its meeting limit) fall back to the LLM as plain text.
+
+A negotiation settles its chosen slot with `slot_command`s, also answered
+without an LLM: "accept" checks the slot and keeps it held, "book" books it
+once every attendee has accepted, and "release" drops the hold and cancels the
+booking if the meeting falls through.
+"""
+
+from datetime import date, time
+from typing import TYPE_CHECKING, Literal
+
+from pydantic import BaseModel
+
+from shared.calendar_store import CalendarStore
+
+if TYPE_CHECKING:
+    from shared.async_calendar_store import AsyncCalendarStore
+
+
+AVAILABILITY_SKILL_ID = "structured_availability"
+AVAILABILITY_MIME_TYPE = "application/json"
+
+
+class SlotQuery(BaseModel):
+    date: str        # YYYY-MM-DD
+    start_time: str  # HH:MM
+    end_time: str    # HH:MM
+
+
+class SlotAnswer(SlotQuery):
+    status: Literal["free", "held", "busy"]  # held = tentatively reserved by another negotiation
+
+
+class AvailabilityRequest(BaseModel):
+    type: Literal["availability_request"] = "availability_request"
+    slots: list[SlotQuery]
+    hold: bool = False  # hold free slots for the sender's contextId; only set when sending one
+
+    def to_text(self) -> str:
+        """Natural-language form, used when the request falls back to the LLM."""
+        lines = [f"- {s.date} {s.start_time}-{s.end_time}" for s in self.slots]
+        return "Are you available for any of these time slots?\n" + "\n".join(lines)
+
+
+class AvailabilityResponse(BaseModel):
+    type: Literal["availability_response"] = "availability_response"
+    slots: list[SlotAnswer]
+
+    def to_text(self) -> str:
+        lines = [f"- {s.date} {s.start_time}-{s.end_time}: {s.status}" for s in self.slots]
+        return "Availability:\n" + "\n".join(lines)
+
+
+class AvailabilityPolicy(BaseModel):
+    """What an agent may answer on its own, mirroring the rules in its soul.md."""
+    trusted_senders: set[str] | None = None  # None = anyone
+    day_start: time = time(9, 0)
+    day_end: time = time(17, 0)
+    max_meetings_per_day: int | None = None
+    hold_ttl_seconds: float | None = 600  # hold reported free slots this long; None = don't hold
+
+
+class SlotCommand(BaseModel):
+    type: Literal["slot_command"] = "slot_command"
+    action: Literal["accept", "book", "release"]
+    slot: SlotQuery
+    title: str = ""
+    attendees: list[str] = []
+
+
+class SlotCommandResponse(BaseModel):
+    type: Literal["slot_command_response"] = "slot_command_response"
+    action: Literal["accept", "book", "release"]
+    ok: bool
+    reason: str | None = None  # why a command was refused
+
+    def to_text(self) -> str:
+        return f"{self.action}: {'ok' if self.ok else f'refused ({self.reason})'}"
+
+
+# How long an accepted slot stays held if the policy doesn't hold slots itself
+ACCEPT_HOLD_SECONDS = 600
+
+
+def booking_marker(owner: str) -> str:
+    """Notes of the event a negotiation booked, so repeated and cancelling commands find it."""
+    return f"negotiation:{owner}"
+
+
+def parse_availability_request(data: dict) -> AvailabilityRequest | None:
+    """Return the request if `data` is a well-formed availability_request."""
+    if not isinstance(data, dict) or data.get("type") != "availability_request":
+        return None
+    try:
+        return AvailabilityRequest.model_validate(data)
+    except ValueError:
+        return None
+
+
+def parse_slot_command(data: dict) -> SlotCommand | None:
+    """Return the command if `data` is a well-formed slot_command."""
+    if not isinstance(data, dict) or data.get("type") != "slot_command":
+        return None
+    try:
+        return SlotCommand.model_validate(data)
+    except ValueError:
+        return None
+
+
+def _parse_slot(slot: SlotQuery) -> tuple[date, time, time] | None:
+    try:
+        parsed = date.fromisoformat(slot.date), time.fromisoformat(slot.start_time), time.fromisoformat(slot.end_time)
+    except ValueError:
+        return None
+    return parsed if parsed[1] < parsed[2] else None
+
+
+def _outside_policy(policy: AvailabilityPolicy, sender: str, start: time, end: time) -> str | None:
+    """Why the policy can't decide a slot on its own, or None."""
+    if policy.trusted_senders is not None and sender not in policy.trusted_senders:
+        return "sender not trusted"
+    if start < policy.day_start or end > policy.day_end:
+        return "outside working hours"
+    return None
+
+
+def answer_availability(
+    calendar: CalendarStore, request: AvailabilityRequest,
+    sender: str, policy: AvailabilityPolicy, owner: str | None = None,
+) -> AvailabilityResponse | None:
+    """Answer from the calendar, or None if the request needs the LLM's judgment.
+    Free slots are held for `owner` (the negotiation id) if the request asks and the policy allows.
+    """
+    answers, free_slots = [], []
+    for slot in request.slots:
+        parsed = _parse_slot(slot)
+        if parsed is None or _outside_policy(policy, sender, parsed[1], parsed[2]):
+            return None
+        slot_date, start, end = parsed
+
+        status = calendar.slot_status(slot_date, start, end, owner)
+        if status == "free" and policy.max_meetings_per_day is not None:
+            if len(calendar.get_events(slot_date)) >= policy.max_meetings_per_day:
+                return None
+        if status == "free":
+            free_slots.append((slot_date, start, end))
+        answers.append(SlotAnswer(**slot.model_dump(), status=status))
+
+    if owner and request.hold and policy.hold_ttl_seconds:
+        for slot_date, start, end in free_slots:
+            calendar.place_hold(slot_date, start, end, owner, policy.hold_ttl_seconds)
+    return AvailabilityResponse(slots=answers)
+
+
+async def answer_slot_command(
+    calendar: "AsyncCalendarStore", command: SlotCommand, sender: str, policy: AvailabilityPolicy, owner: str,
+) -> SlotCommandResponse:
+    """Carry out a negotiation's `command` for `owner` (its contextId). Every action can be repeated."""
+    def reply(ok: bool, reason: str | None = None) -> SlotCommandResponse:
+        return SlotCommandResponse(action=command.action, ok=ok, reason=reason)
+
+    parsed = _parse_slot(command.slot)
+    if parsed is None:
+        return reply(False, "malformed slot")
+    slot_date, start, end = parsed
+    marker = booking_marker(owner)
+    booked = [e for e in await calendar.get_events(slot_date) if e.notes == marker]
+
+    if command.action == "release":
+        await calendar.release_holds(owner)
+        for event in booked:
+            await calendar.cancel_event(event.event_id)
+        return reply(True)
+    if booked:
+        return reply(True)
+
+    if command.action == "accept":
+        reason = _outside_policy(policy, sender, start, end)
+        if reason is not None:
+            return reply(False, reason)
+        if policy.max_meetings_per_day is not None:
+            if len(await calendar.get_events(slot_date)) >= policy.max_meetings_per_day:
+                return reply(False, "day is at its meeting limit")
+        ttl = policy.hold_ttl_seconds or ACCEPT_HOLD_SECONDS
+        if await calendar.place_hold(slot_date, start, end, owner, ttl) is None:
+            return reply(False, "no longer free")
+        return reply(True)
+
+    event = await calendar.book_event(
+        command.title or "Meeting", slot_date, start, end,
+        attendees=command.attendees, notes=marker, owner=owner,
+    )
+    return reply(True) if event is not None else reply(False, "no longer free")
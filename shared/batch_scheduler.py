@@ -0,0 +1,256 @@
+"""
+Batch scheduling without the LLM.
+Solves many meeting requests at once: each participant's calendar is read
+once into a free/busy bitmap, meetings are placed greedily (highest priority,
+then largest, first) on working copies of those bitmaps, and a repair pass
+tries to make room for meetings that did not fit by moving one meeting of
+equal or lower priority elsewhere. Bookings are then written with one append per calendar.
+Each attendee's AvailabilityPolicy narrows a meeting's day window to their
+working hours and keeps their days under its meeting limit.
+Requests the solver can't place are returned for the LLM to negotiate.
+
+See cli/batch_schedule.py for the command-line entry point.
+"""
+
+import json
+import logging
+from datetime import date, time
+
+from pydantic import BaseModel, Field, model_validator
+
+from shared.availability import AvailabilityPolicy
+from shared.calendar_event import CalendarEvent
+from shared.calendar_store import CalendarStore
+from shared.freebusy import FreeBusyBitmap, date_range, format_minutes, score_starts, to_minutes
+
+
+logger = logging.getLogger(__name__)
+
+
+class MeetingRequest(BaseModel):
+    """One meeting to place, somewhere between window_start and window_end."""
+    id: str
+    title: str
+    attendees: list[str] = Field(min_length=1)
+    duration_minutes: int = Field(gt=0)
+    window_start: date
+    window_end: date
+    day_start: time = time(9, 0)
+    day_end: time = time(17, 0)
+    priority: int = 0  # higher is placed first
+    buffer_minutes: int = 0
+    step_minutes: int = 15
+    location: str = ""
+
+    @model_validator(mode="after")
+    def _check_window(self):
+        if self.window_end < self.window_start:
+            raise ValueError(f"{self.id}: window_end is before window_start")
+        return self
+
+    def describe(self) -> str:
+        """Natural-language form, for handing the request to an agent."""
+        return (
+            f"Schedule a {self.duration_minutes}-minute meeting \"{self.title}\" with "
+            f"{', '.join(self.attendees)} between {self.window_start} and {self.window_end}, "
+            f"during {self.day_start:%H:%M}-{self.day_end:%H:%M}."
+        )
+
+
+class Assignment(BaseModel):
+    request_id: str
+    date: date
+    start_time: str  # "HH:MM"
+    end_time: str
+    moved: bool = False  # placed by the repair pass
+
+
+class BatchResult(BaseModel):
+    assignments: list[Assignment]
+    unscheduled: list[MeetingRequest]
+
+
+def load_requests(path: str) -> list[MeetingRequest]:
+    """Read meeting requests from a JSON list."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    requests = [MeetingRequest.model_validate(item) for item in data]
+    ids = [r.id for r in requests]
+    if len(set(ids)) != len(ids):
+        raise ValueError("meeting request ids must be unique")
+    return requests
+
+
+class BatchScheduler:
+    """Place many meetings across many calendars in one deterministic pass."""
+
+    def __init__(
+        self, stores: dict[str, CalendarStore], policies: dict[str, AvailabilityPolicy] | None = None,
+        max_repairs: int = 8,
+    ):
+        """
+        Args:
+            stores: {"person_b": CalendarStore(...), ...} for every attendee.
+            policies: Attendees' AvailabilityPolicy, for their working hours and daily meeting limit.
+                People without one are bound only by each request's own day window.
+            max_repairs: Placed meetings to try moving per unplaced request.
+        """
+        resolutions = {store.bitmap.resolution for store in stores.values()}
+        if len(resolutions) > 1:
+            raise ValueError("all calendars must share a bitmap resolution")
+        self.stores = stores
+        self.policies = policies or {}
+        self.max_repairs = max_repairs
+        self._work: dict[str, FreeBusyBitmap] = {}
+        self._counts: dict[str, dict[date, int]] = {}  # meetings per person per day, as placed so far
+        self._placed: dict[str, tuple[date, int]] = {}
+
+    def _pull(self, requests: list[MeetingRequest]):
+        """Read free/busy for every attendee's days once, into working copies."""
+        days: dict[str, set[date]] = {}
+        for req in requests:
+            missing = [p for p in req.attendees if p not in self.stores]
+            if missing:
+                raise ValueError(f"{req.id}: no calendar for {', '.join(missing)}")
+            for person in req.attendees:
+                days.setdefault(person, set()).update(date_range(req.window_start, req.window_end))
+        self._work = {
+            person: self.stores[person].load_days(sorted(d)).copy(sorted(d))
+            for person, d in days.items()
+        }
+        self._counts = {
+            person: {day: len(self.stores[person].get_events(day)) for day in d}
+            for person, d in days.items()
+            if self.policies.get(person) and self.policies[person].max_meetings_per_day is not None
+        }
+
+    def _hours(self, req: MeetingRequest) -> tuple[time, time]:
+        """The request's day window narrowed to every attendee's working hours."""
+        policies = [self.policies[p] for p in req.attendees if p in self.policies]
+        return (
+            max([req.day_start] + [p.day_start for p in policies]),
+            min([req.day_end] + [p.day_end for p in policies]),
+        )
+
+    def _full(self, person: str, day: date) -> bool:
+        counts = self._counts.get(person)
+        return counts is not None and counts[day] >= self.policies[person].max_meetings_per_day
+
+    def _find(self, req: MeetingRequest) -> tuple[date, int] | None:
+        day_start, day_end = self._hours(req)
+        if to_minutes(day_end) - to_minutes(day_start) < req.duration_minutes:
+            return None
+        grid = score_starts(
+            [self._work[p] for p in req.attendees], req.window_start, req.window_end,
+            req.duration_minutes, day_start, day_end, req.buffer_minutes, req.step_minutes,
+        )
+        for i, day in enumerate(grid.days):
+            if any(self._full(p, day) for p in req.attendees):
+                grid.scores[i, :] = -1
+        starts = grid.starts(limit=1)
+        if not starts:
+            return None
+        day, start = starts[0]
+        return day, to_minutes(time.fromisoformat(start))
+
+    def _mark(self, req: MeetingRequest, spot: tuple[date, int], busy: bool = True):
+        day, start = spot
+        for person in req.attendees:
+            bitmap = self._work[person]
+            if busy:
+                bitmap.mark_busy(day, start, start + req.duration_minutes)
+            else:
+                bitmap.mark_free(day, start, start + req.duration_minutes)
+            if person in self._counts:
+                self._counts[person][day] += 1 if busy else -1
+
+    def _repair(self, req: MeetingRequest, by_id: dict[str, MeetingRequest]) -> str | None:
+        """Move one placed meeting of equal or lower priority that shares an attendee,
+        if that frees a slot for `req`.
+        Returns the moved meeting's id."""
+        rivals = sorted(
+            (by_id[rid] for rid in self._placed
+             if by_id[rid].priority <= req.priority and set(by_id[rid].attendees) & set(req.attendees)),
+            key=lambda r: r.priority,
+        )
+        for rival in rivals[:self.max_repairs]:
+            old = self._placed[rival.id]
+            self._mark(rival, old, busy=False)
+            spot = self._find(req)
+            if spot is not None:
+                self._mark(req, spot)
+                new = self._find(rival)
+                if new is not None:
+                    self._mark(rival, new)
+                    self._placed[rival.id] = new
+                    self._placed[req.id] = spot
+                    return rival.id
+                self._mark(req, spot, busy=False)
+            self._mark(rival, old)
+        return None
+
+    def solve(self, requests: list[MeetingRequest]) -> BatchResult:
+        """Assign a start to as many requests as possible. Calendars are only read."""
+        self._pull(requests)
+        self._placed = {}
+        by_id = {r.id: r for r in requests}
+        order = sorted(requests, key=lambda r: (-r.priority, -len(r.attendees), -r.duration_minutes, r.id))
+
+        failed = []
+        for req in order:
+            spot = self._find(req)
+            if spot is None:
+                failed.append(req)
+                continue
+            self._mark(req, spot)
+            self._placed[req.id] = spot
+
+        moved, unscheduled = set(), []
+        for req in failed:
+            rival = self._repair(req, by_id)
+            if rival is None:
+                unscheduled.append(req)
+            else:
+                moved.add(rival)
+        logger.info(
+            f"Batch: placed {len(self._placed)}/{len(requests)} meetings "
+            f"({len(failed) - len(unscheduled)} by repair)"
+        )
+
+        assignments = []
+        for req in requests:
+            if req.id in self._placed:
+                day, start = self._placed[req.id]
+                assignments.append(Assignment(
+                    request_id=req.id, date=day, start_time=format_minutes(start),
+                    end_time=format_minutes(start + req.duration_minutes), moved=req.id in moved,
+                ))
+        return BatchResult(assignments=assignments, unscheduled=unscheduled)
+
+    def book(self, result: BatchResult, requests: list[MeetingRequest]) -> dict[str, int]:
+        """Book every assignment, writing each calendar once. Returns events booked per person.
+        Raises RuntimeError (before writing anything) if a calendar changed since `solve`.
+        """
+        by_id = {r.id: r for r in requests}
+        booked: dict[str, list[CalendarEvent]] = {}
+        for a in result.assignments:
+            req = by_id[a.request_id]
+            start, end = time.fromisoformat(a.start_time), time.fromisoformat(a.end_time)
+            for person in req.attendees:
+                event = self.stores[person].book_event(
+                    req.title, a.date, start, end, location=req.location,
+                    attendees=req.attendees, notes=f"batch:{req.id}", persist=False,
+                )
+                if event is None:
+                    # Drop the unwritten bookings from memory
+                    for name in booked:
+                        self.stores[name].invalidate()
+                    self.stores[person].invalidate()
+                    raise RuntimeError(
+                        f"{req.id}: {person} is no longer free on {a.date} {a.start_time}; re-run the batch"
+                    )
+                booked.setdefault(person, []).append(event)
+
+        for person, events in booked.items():
+            self.stores[person].append_events(events)
+        return {person: len(events) for person, events in booked.items()}
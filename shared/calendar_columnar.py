@@ -0,0 +1,213 @@
+"""
+Memory-mapped columnar calendar snapshot.
+A `calendar.cal` file next to `calendar.csv` stores its events sorted by start as
+fixed-width arrays (start/end epoch minutes, category codes, string offsets)
+plus a string heap. It is opened with mmap, so range queries are a binary
+search over the mapped arrays and nothing is parsed up front.
+
+The snapshot records how many CSV bytes it covers, the CSV's mtime and a
+checksum of the last of those bytes, so checking it doesn't read the whole file.
+Rows appended to the CSV later (which is how CalendarStore books and cancels
+events) are parsed on their own at startup; other CSV changes invalidate it.
+
+Convert:
+    python -m shared.calendar_columnar import agents/person_a/calendar.csv
+    python -m shared.calendar_columnar export agents/person_a/calendar.cal out.csv
+"""
+
+import csv
+import mmap
+import os
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from shared.calendar_event import CalendarEvent, apply_cancellations
+
+
+MAGIC = b"A2ACAL01"
+VERSION = 3
+# magic, version, event count, category count, csv bytes covered, csv mtime (ns), csv crc
+HEADER = struct.Struct("<8sIIIQqI4x")
+STRING_FIELDS = ("event_id", "title", "location", "attendees", "recurring", "notes")
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def snapshot_path(csv_path: str | Path) -> Path:
+    return Path(csv_path).with_suffix(".cal")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def csv_fingerprint(csv_path: Path, size: int) -> int:
+    """crc32 of the last FINGERPRINT_BYTES of the CSV's first `size` bytes.
+    Appends past `size` leave it alone; an edit that adds or removes bytes in the
+    covered rows shifts them and changes it. A same-length edit outside this window
+    is only caught if nothing was appended too (see `matches`).
+    """
+    start = max(size - FINGERPRINT_BYTES, 0)
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        return zlib.crc32(f.read(size - start))
+
+
+def write_snapshot(events: list[CalendarEvent], out_path: str | Path, csv_path: str | Path):
+    """Write events as a columnar snapshot covering the CSV's current contents."""
+    out_path, csv_path = Path(out_path), Path(csv_path)
+    events = sorted(events, key=lambda e: e.start)
+    csv_stat = csv_path.stat()
+    csv_size = csv_stat.st_size
+
+    categories = sorted({e.category for e in events})
+    category_codes = {c: i for i, c in enumerate(categories)}
+
+    strings = [
+        value.encode("utf-8")
+        for e in events
+        for value in (e.event_id, e.title, e.location, ";".join(e.attendees), e.recurring, e.notes)
+    ] + [c.encode("utf-8") for c in categories]
+    offsets = np.zeros(len(strings) + 1, dtype="<u8")
+    np.cumsum([len(s) for s in strings], out=offsets[1:])
+
+    starts = np.array([e.start for e in events], dtype="<i4")
+    ends = np.array([e.end for e in events], dtype="<i4")
+    codes = np.array([category_codes[e.category] for e in events], dtype="<u2")
+
+    tmp_path = out_path.with_suffix(".cal.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, len(events), len(categories), csv_size, csv_stat.st_mtime_ns,
+            csv_fingerprint(csv_path, csv_size),
+        ))
+        for array in (starts, ends, codes, offsets):
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(array.tobytes())
+        f.write(b"".join(strings))
+    os.replace(tmp_path, out_path)
+
+
+class ColumnarCalendar:
+    """Read-only view over a mapped snapshot."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.count, self.category_count,
+         self.csv_size, self.csv_mtime, self.csv_crc) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a calendar snapshot")
+
+        offset = HEADER.size
+        arrays = []
+        for dtype, length in (
+            ("<i4", self.count), ("<i4", self.count), ("<u2", self.count),
+            ("<u8", self.count * len(STRING_FIELDS) + self.category_count + 1),
+        ):
+            offset = _align(offset)
+            arrays.append(np.frombuffer(self._mm, dtype=dtype, count=length, offset=offset))
+            offset += arrays[-1].nbytes
+        self.starts, self.ends, self.codes, self._offsets = arrays
+        self._heap = offset
+        self.categories = [
+            self._string(self.count * len(STRING_FIELDS) + i) for i in range(self.category_count)
+        ]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def matches(self, csv_path: Path) -> bool:
+        """True if the CSV still starts with the bytes this snapshot covers (see `csv_fingerprint`)."""
+        stat = csv_path.stat()
+        if stat.st_size == self.csv_size:
+            # Nothing appended, so a newer mtime means the covered rows were rewritten
+            return stat.st_mtime_ns == self.csv_mtime
+        return stat.st_size > self.csv_size and csv_fingerprint(csv_path, self.csv_size) == self.csv_crc
+
+    def _string(self, index: int) -> str:
+        start = self._heap + int(self._offsets[index])
+        end = self._heap + int(self._offsets[index + 1])
+        return self._mm[start:end].decode("utf-8")
+
+    def event(self, i: int) -> CalendarEvent:
+        base = i * len(STRING_FIELDS)
+        event_id, title, location, attendees, recurring, notes = (
+            self._string(base + j) for j in range(len(STRING_FIELDS))
+        )
+        return CalendarEvent(
+            event_id=event_id,
+            start=int(self.starts[i]),
+            end=int(self.ends[i]),
+            title=title,
+            location=location,
+            attendees=tuple(a for a in attendees.split(";") if a),
+            category=self.categories[self.codes[i]],
+            recurring=recurring,
+            notes=notes,
+        )
+
+    def find(self, event_id: str) -> CalendarEvent | None:
+        """The event with `event_id`, by a scan of the id strings only."""
+        key = event_id.encode("utf-8")
+        for i in range(self.count):
+            index = i * len(STRING_FIELDS)
+            start = self._heap + int(self._offsets[index])
+            if self._mm[start:self._heap + int(self._offsets[index + 1])] == key:
+                return self.event(i)
+        return None
+
+    def starting_between(self, start: int, end: int) -> list[CalendarEvent]:
+        """Events starting in [start, end) epoch minutes, ordered by start."""
+        lo = int(np.searchsorted(self.starts, start, side="left"))
+        hi = int(np.searchsorted(self.starts, end, side="left"))
+        return [self.event(i) for i in range(lo, hi)]
+
+    def all_events(self) -> list[CalendarEvent]:
+        return [self.event(i) for i in range(self.count)]
+
+    def close(self):
+        self.starts = self.ends = self.codes = self._offsets = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # an event array is still referenced; the map closes when it is collected
+
+
+def csv_to_snapshot(csv_path: str | Path, out_path: str | Path | None = None) -> Path:
+    """Build a snapshot from a FIELDNAMES-schema CSV."""
+    csv_path = Path(csv_path)
+    out_path = Path(out_path) if out_path else snapshot_path(csv_path)
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        events, _ = apply_cancellations([CalendarEvent.from_row(row) for row in csv.DictReader(f)])
+    write_snapshot(events, out_path, csv_path)
+    return out_path
+
+
+def snapshot_to_csv(snapshot: str | Path, csv_path: str | Path):
+    """Write a snapshot's events back out in the FIELDNAMES CSV schema."""
+    from shared.calendar_store import FIELDNAMES
+
+    calendar = ColumnarCalendar(snapshot)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(e.to_dict() for e in calendar.all_events())
+    calendar.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "import":
+        out = csv_to_snapshot(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+        print(f"Wrote {out}")
+    elif len(sys.argv) == 4 and sys.argv[1] == "export":
+        snapshot_to_csv(sys.argv[2], sys.argv[3])
+        print(f"Wrote {sys.argv[3]}")
+    else:
+        print("Usage: python -m shared.calendar_columnar import CSV [OUT.cal]")
+        print("       python -m shared.calendar_columnar export SNAPSHOT.cal OUT.csv")
+        sys.exit(1)
@@ -0,0 +1,168 @@
+"""
+Compact typed calendar event.
+Events are parsed from CSV once into slotted records with integer
+epoch-minute start/end, interned strings and attendee tuples. Plain dicts
+(the CSV row shape) are only produced at the tool/serialization boundary.
+`Hold` is the same shape for tentative, expiring reservations.
+A row in the `cancelled` category is a tombstone: it cancels the earlier row
+with the same event_id, so cancelling can append instead of rewriting the CSV.
+"""
+
+import sys
+from datetime import date, datetime, time, timedelta
+
+
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+CANCELLED = "cancelled"
+
+
+def epoch_minutes(day: date, t: time) -> int:
+    """Minutes since 1970-01-01 00:00 (naive local time) for a date and time of day."""
+    return (day - EPOCH.date()).days * MINUTES_PER_DAY + t.hour * 60 + t.minute
+
+
+def day_number(day: date) -> int:
+    """Days since 1970-01-01; the key CalendarStore indexes days by."""
+    return (day - EPOCH.date()).days
+
+
+def _intern(value: str) -> str:
+    return sys.intern(value) if value else ""
+
+
+class CalendarEvent:
+    """One calendar event. `start`/`end` are epoch minutes."""
+
+    __slots__ = (
+        "event_id", "start", "end", "title", "location",
+        "attendees", "category", "recurring", "notes",
+    )
+
+    def __init__(
+        self, event_id: str, start: int, end: int, title: str = "",
+        location: str = "", attendees: tuple[str, ...] = (), category: str = "work",
+        recurring: str = "none", notes: str = "",
+    ):
+        self.event_id = event_id
+        self.start = start
+        self.end = end
+        self.title = _intern(title)
+        self.location = _intern(location)
+        self.attendees = tuple(_intern(a) for a in attendees)
+        self.category = _intern(category)
+        self.recurring = _intern(recurring)
+        self.notes = notes
+
+    @classmethod
+    def from_row(cls, row: dict) -> "CalendarEvent":
+        """Parse a CSV row (all strings) into an event."""
+        day = date.fromisoformat(row["date"])
+        attendees = row.get("attendees") or ""
+        return cls(
+            event_id=row["event_id"],
+            start=epoch_minutes(day, time.fromisoformat(row["start_time"])),
+            end=epoch_minutes(day, time.fromisoformat(row["end_time"])),
+            title=row.get("title") or "",
+            location=row.get("location") or "",
+            attendees=tuple(a for a in attendees.split(";") if a),
+            category=row.get("category") or "",
+            recurring=row.get("recurring") or "none",
+            notes=row.get("notes") or "",
+        )
+
+    @property
+    def day(self) -> int:
+        return self.start // MINUTES_PER_DAY
+
+    @property
+    def date(self) -> date:
+        return EPOCH.date() + timedelta(days=self.day)
+
+    @property
+    def start_minute(self) -> int:
+        """Minute of the day the event starts."""
+        return self.start - self.day * MINUTES_PER_DAY
+
+    @property
+    def end_minute(self) -> int:
+        return self.end - self.day * MINUTES_PER_DAY
+
+    @property
+    def start_time(self) -> time:
+        return time(*divmod(self.start_minute, 60))
+
+    @property
+    def end_time(self) -> time:
+        return time(*divmod(self.end_minute, 60))
+
+    def overlaps(self, start: int, end: int) -> bool:
+        return start < self.end and end > self.start
+
+    def to_dict(self) -> dict:
+        """CSV row shape — use at the tool/serialization boundary only."""
+        return {
+            "event_id": self.event_id,
+            "date": self.date.isoformat(),
+            "start_time": self.start_time.strftime("%H:%M"),
+            "end_time": self.end_time.strftime("%H:%M"),
+            "title": self.title,
+            "location": self.location,
+            "attendees": ";".join(self.attendees),
+            "category": self.category,
+            "recurring": self.recurring,
+            "notes": self.notes,
+        }
+
+    def tombstone(self) -> "CalendarEvent":
+        """The row that cancels this event when appended after it."""
+        return CalendarEvent(
+            self.event_id, self.start, self.end, self.title, self.location,
+            self.attendees, CANCELLED, self.recurring, self.notes,
+        )
+
+    def __repr__(self) -> str:
+        return f"CalendarEvent({self.event_id!r}, {self.date} {self.start_time:%H:%M}-{self.end_time:%H:%M})"
+
+
+def apply_cancellations(events: list[CalendarEvent]) -> tuple[list[CalendarEvent], set[str]]:
+    """Drop tombstones and the events they cancel.
+    Returns the remaining events and the ids of cancelled events that weren't
+    among them (they were written earlier, e.g. into a snapshot).
+    """
+    cancelled = {e.event_id for e in events if e.category == CANCELLED}
+    if not cancelled:
+        return events, set()
+    live = [e for e in events if e.category != CANCELLED]
+    return [e for e in live if e.event_id not in cancelled], cancelled - {e.event_id for e in live}
+
+
+class Hold:
+    """A tentative reservation owned by one negotiation. `expires` is a time.time() timestamp."""
+
+    __slots__ = ("hold_id", "owner", "start", "end", "expires")
+
+    def __init__(self, hold_id: str, owner: str, start: int, end: int, expires: float):
+        self.hold_id = hold_id
+        self.owner = owner
+        self.start = start
+        self.end = end
+        self.expires = expires
+
+    @property
+    def day(self) -> int:
+        return self.start // MINUTES_PER_DAY
+
+    @property
+    def start_minute(self) -> int:
+        return self.start - self.day * MINUTES_PER_DAY
+
+    @property
+    def end_minute(self) -> int:
+        return self.end - self.day * MINUTES_PER_DAY
+
+    def overlaps(self, start: int, end: int) -> bool:
+        return start < self.end and end > self.start
+
+    def __repr__(self) -> str:
+        return f"Hold({self.hold_id!r}, owner={self.owner!r}, {self.start}-{self.end})"
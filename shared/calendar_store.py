@@ -2,13 +2,30 @@
 CSV calendar backend.
 Each agent creates a CalendarStore pointed at its own CSV file.
 The agent's LangChain tools wrap methods from this class.
+If a columnar snapshot (`calendar.cal`, see shared/calendar_columnar.py) sits
+next to the CSV, the store maps it instead of parsing the whole file.
 """
 
 import csv
+import io
+import threading
+import time as clock
 import uuid
-from datetime import date, time, datetime, timedelta
+from bisect import insort
+from datetime import date, time
+from functools import wraps
+from operator import attrgetter
 from pathlib import Path
 
+from shared.calendar_columnar import ColumnarCalendar, snapshot_path, write_snapshot
+from shared.calendar_event import (
+    MINUTES_PER_DAY, CalendarEvent, Hold, apply_cancellations, day_number, epoch_minutes,
+)
+from shared.freebusy import (
+    CandidateGrid, FreeBusyBitmap, date_range, format_minutes, score_starts, to_minutes,
+)
+from shared.tracing import traced
+
 
 FIELDNAMES = [
     "event_id", "date", "start_time", "end_time",
@@ -16,120 +33,373 @@ FIELDNAMES = [
     "recurring", "notes",
 ]
 
+_start_key = attrgetter("start")
+
+
+def _synchronized(method):
+    """Hold the store's lock for the call; tools may hit one store from several threads."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class CalendarStore:
+    """Calendar events parsed once from CSV into typed records, indexed by day.
+    The CSV is re-read only if it changes on disk outside this store.
+    Public methods are thread-safe, so async callers can run them on a worker pool.
+    With a snapshot, only rows appended to the CSV since it was written are
+    parsed; everything else is read from the mapped arrays on demand.
+    Cancelling then appends a tombstone row instead of rewriting both files.
+    Tentative holds block a slot for everyone but their owner (a negotiation id)
+    until they expire or the owner books. They live in memory only.
+    """
 
-    def __init__(self, csv_path: str):
+    def __init__(self, csv_path: str, resolution: int = 1, watch: bool = True):
+        """`watch=False` skips the on-disk change check once loaded, for a store that owns its file."""
         self.csv_path = Path(csv_path)
+        self.watch = watch
         if not self.csv_path.exists():
             self._create_empty()
+        self.snapshot_path = snapshot_path(self.csv_path)
+        # With a snapshot these hold only the events appended after it
+        self._by_day: dict[int, list[CalendarEvent]] = {}  # day number -> events sorted by start
+        self._by_id: dict[str, CalendarEvent] = {}
+        self._snapshot: ColumnarCalendar | None = None
+        self._cancelled: set[str] = set()  # snapshot events cancelled by tombstones in the tail
+        self._mtime: int | None = None
+        self._lock = threading.RLock()
+        self._holds: dict[int, list[Hold]] = {}  # day number -> holds
+        # Busy bitmaps per day, built lazily and kept in sync with our own writes
+        self.bitmap = FreeBusyBitmap(resolution)
 
     def _create_empty(self):
         with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
             writer.writeheader()
 
-    def _read_all(self) -> list[dict]:
+    def _read_all(self) -> list[CalendarEvent]:
         with open(self.csv_path, "r", newline="", encoding="utf-8") as f:
-            return list(csv.DictReader(f))
+            return apply_cancellations([CalendarEvent.from_row(row) for row in csv.DictReader(f)])[0]
+
+    def _read_tail(self, offset: int) -> list[CalendarEvent]:
+        """Events in rows appended after the first `offset` bytes of the CSV."""
+        with open(self.csv_path, "rb") as f:
+            f.seek(offset)
+            tail = f.read().decode("utf-8")
+        reader = csv.DictReader(io.StringIO(tail, newline=""), fieldnames=FIELDNAMES)
+        return [CalendarEvent.from_row(row) for row in reader]
 
-    def _write_all(self, rows: list[dict]):
+    def _write_all(self, events: list[CalendarEvent]):
         with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
             writer.writeheader()
-            writer.writerows(rows)
+            writer.writerows(e.to_dict() for e in events)
+        self._mtime = self.csv_path.stat().st_mtime_ns
 
-    def get_events(self, target_date: date) -> list[dict]:
-        """Get all events for a specific date."""
-        date_str = target_date.isoformat()
-        return [r for r in self._read_all() if r["date"] == date_str]
+    def _append(self, events: list[CalendarEvent]):
+        """Append rows instead of rewriting the whole file."""
+        with open(self.csv_path, "rb") as f:
+            size = f.seek(0, 2)
+            needs_newline = False
+            if size:
+                f.seek(-1, 2)
+                needs_newline = f.read(1) not in (b"\n", b"\r")
+        with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+            if needs_newline:
+                f.write("\r\n")
+            csv.DictWriter(f, fieldnames=FIELDNAMES).writerows(e.to_dict() for e in events)
+        self._mtime = self.csv_path.stat().st_mtime_ns
 
-    def get_events_range(self, start: date, end: date) -> list[dict]:
-        """Get all events between start and end dates (inclusive)."""
-        return [
-            r for r in self._read_all()
-            if start.isoformat() <= r["date"] <= end.isoformat()
-        ]
+    def _write_snapshot(self, events: list[CalendarEvent]):
+        """Rewrite the snapshot to cover the whole CSV and map it."""
+        write_snapshot(events, self.snapshot_path, self.csv_path)
+        self._open_snapshot()
+        self._by_day.clear()
+        self._by_id.clear()
+        self._cancelled.clear()
 
-    def is_available(self, target_date: date, start: time, end: time) -> bool:
-        """Check if a time slot has no conflicts."""
-        for event in self.get_events(target_date):
-            evt_start = time.fromisoformat(event["start_time"])
-            evt_end = time.fromisoformat(event["end_time"])
-            if start < evt_end and end > evt_start:
-                return False
+    def _open_snapshot(self) -> bool:
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        try:
+            snapshot = ColumnarCalendar(self.snapshot_path)
+        except (OSError, ValueError):
+            return False
+        if not snapshot.matches(self.csv_path):
+            snapshot.close()
+            return False
+        self._snapshot = snapshot
         return True
 
+    def _load(self, check: bool = False):
+        """(Re)build the in-memory index if the CSV changed on disk."""
+        if self._mtime is not None and not (self.watch or check):
+            return
+        mtime = self.csv_path.stat().st_mtime_ns
+        if mtime == self._mtime:
+            return
+        self._by_day.clear()
+        self._by_id.clear()
+        self._cancelled.clear()
+        self.bitmap.clear()
+        if not self.snapshot_path.exists():
+            events = self._read_all()
+        elif self._open_snapshot():
+            events, self._cancelled = apply_cancellations(self._read_tail(self._snapshot.csv_size))
+        else:
+            # Stale snapshot (the CSV was edited, not appended to): parse once and refresh it
+            self._write_snapshot(self._read_all())
+            events = []
+        for event in events:
+            self._add(event)
+        self._mtime = mtime
+
+    def _add(self, event: CalendarEvent):
+        insort(self._by_day.setdefault(event.day, []), event, key=_start_key)
+        self._by_id[event.event_id] = event
+
+    def _remove(self, event: CalendarEvent):
+        day_events = self._by_day[event.day]
+        day_events.remove(event)
+        if not day_events:
+            del self._by_day[event.day]
+        del self._by_id[event.event_id]
+
+    def _days(self, first: int, last: int) -> list[CalendarEvent]:
+        """Events starting on day numbers first..last, ordered by start."""
+        if last - first > len(self._by_day):
+            days = sorted(d for d in self._by_day if first <= d <= last)
+        else:
+            days = [d for d in range(first, last + 1) if d in self._by_day]
+        events = [e for d in days for e in self._by_day[d]]
+        if self._snapshot is None:
+            return events
+        mapped = self._snapshot.starting_between(first * MINUTES_PER_DAY, (last + 1) * MINUTES_PER_DAY)
+        if self._cancelled:
+            mapped = [e for e in mapped if e.event_id not in self._cancelled]
+        return sorted(mapped + events, key=_start_key) if events else mapped
+
+    @_synchronized
+    def load(self):
+        """Parse the CSV (or map its snapshot) now rather than on first use."""
+        self._load()
+
+    @_synchronized
+    def reload_if_changed(self):
+        """Pick up outside changes to the CSV even when `watch` is off."""
+        self._load(check=True)
+
+    @_synchronized
+    def invalidate(self):
+        """Forget the in-memory index; it is rebuilt from disk on next use."""
+        self._mtime = None
+
+    @_synchronized
+    def all_events(self) -> list[CalendarEvent]:
+        """Every event, ordered by start."""
+        self._load()
+        events = [e for day in sorted(self._by_day) for e in self._by_day[day]]
+        if self._snapshot is None:
+            return events
+        mapped = [e for e in self._snapshot.all_events() if e.event_id not in self._cancelled]
+        return sorted(mapped + events, key=_start_key)
+
+    @_synchronized
+    def load_days(self, days: list[date]) -> FreeBusyBitmap:
+        """Make sure the bitmap covers `days`."""
+        self._load()
+        for day in days:
+            if day not in self.bitmap:
+                dn = day_number(day)
+                events = self._days(dn, dn)
+                self.bitmap.set_day(day, [(e.start_minute, e.end_minute) for e in events])
+        return self.bitmap
+
+    @traced("calendar.get_events")
+    @_synchronized
+    def get_events(self, target_date: date) -> list[CalendarEvent]:
+        """Get all events for a specific date, ordered by start."""
+        self._load()
+        dn = day_number(target_date)
+        return self._days(dn, dn)
+
+    @traced("calendar.get_events_range")
+    @_synchronized
+    def get_events_range(self, start: date, end: date) -> list[CalendarEvent]:
+        """Get all events between start and end dates (inclusive)."""
+        self._load()
+        return self._days(day_number(start), day_number(end))
+
+    def _held(self, day: int, owner: str | None) -> list[Hold]:
+        """Unexpired holds on a day that belong to someone other than `owner`."""
+        holds = self._holds.get(day)
+        if not holds:
+            return []
+        now = clock.time()
+        live = [h for h in holds if h.expires > now]
+        if not live:
+            del self._holds[day]
+        elif len(live) != len(holds):
+            self._holds[day] = live
+        return [h for h in live if h.owner != owner]
+
+    def _release(self, owner: str):
+        for day in list(self._holds):
+            kept = [h for h in self._holds[day] if h.owner != owner]
+            if kept:
+                self._holds[day] = kept
+            else:
+                del self._holds[day]
+
+    @traced("calendar.is_available")
+    @_synchronized
+    def is_available(self, target_date: date, start: time, end: time, owner: str | None = None) -> bool:
+        """Check if a time slot has no conflicts. Holds placed by `owner` don't count."""
+        return self.slot_status(target_date, start, end, owner) == "free"
+
+    @_synchronized
+    def slot_status(self, target_date: date, start: time, end: time, owner: str | None = None) -> str:
+        """"free", "held" (tentatively taken by another negotiation) or "busy"."""
+        bitmap = self.load_days([target_date])
+        if not bitmap.is_free(target_date, to_minutes(start), to_minutes(end)):
+            return "busy"
+        s, e = epoch_minutes(target_date, start), epoch_minutes(target_date, end)
+        held = self._held(day_number(target_date), owner)
+        return "held" if any(h.overlaps(s, e) for h in held) else "free"
+
+    @traced("calendar.place_hold")
+    @_synchronized
+    def place_hold(
+        self, target_date: date, start: time, end: time, owner: str, ttl_seconds: float,
+    ) -> Hold | None:
+        """Tentatively reserve a slot for `owner`. Returns None if it is busy or held by someone else."""
+        if not self.is_available(target_date, start, end, owner):
+            return None
+        hold = Hold(
+            hold_id=f"hold_{uuid.uuid4().hex[:8]}",
+            owner=owner,
+            start=epoch_minutes(target_date, start),
+            end=epoch_minutes(target_date, end),
+            expires=clock.time() + ttl_seconds,
+        )
+        self._holds.setdefault(hold.day, []).append(hold)
+        return hold
+
+    @_synchronized
+    def release_holds(self, owner: str):
+        """Drop every hold `owner` placed."""
+        self._release(owner)
+
+    @traced("calendar.get_free_slots")
+    @_synchronized
     def get_free_slots(
         self, target_date: date, duration_minutes: int,
-        day_start: time = time(9, 0), day_end: time = time(17, 0),
+        day_start: time = time(9, 0), day_end: time = time(17, 0), owner: str | None = None,
     ) -> list[dict]:
-        """Find available slots of the given duration within the day window."""
-        events = self.get_events(target_date)
-        busy = sorted(
-            [(time.fromisoformat(e["start_time"]), time.fromisoformat(e["end_time"]))
-             for e in events],
-            key=lambda x: x[0],
-        )
-
-        free = []
-        cursor = datetime.combine(target_date, day_start)
-        end_of_day = datetime.combine(target_date, day_end)
-        duration = timedelta(minutes=duration_minutes)
-
-        for busy_start, busy_end in busy:
-            busy_start_dt = datetime.combine(target_date, busy_start)
-            busy_end_dt = datetime.combine(target_date, busy_end)
-
-            if cursor + duration <= busy_start_dt:
-                free.append({
-                    "date": target_date.isoformat(),
-                    "start_time": cursor.time().strftime("%H:%M"),
-                    "end_time": busy_start_dt.time().strftime("%H:%M"),
-                })
-            cursor = max(cursor, busy_end_dt)
-
-        if cursor + duration <= end_of_day:
-            free.append({
+        """Find available slots of the given duration within the day window.
+        Slots held by other negotiations are left out.
+        """
+        bitmap = self.load_days([target_date])
+        held = [(h.start_minute, h.end_minute) for h in self._held(day_number(target_date), owner)]
+        return [
+            {
                 "date": target_date.isoformat(),
-                "start_time": cursor.time().strftime("%H:%M"),
-                "end_time": end_of_day.time().strftime("%H:%M"),
-            })
+                "start_time": format_minutes(start),
+                "end_time": format_minutes(end),
+            }
+            for start, end in bitmap.free_slots(
+                target_date, duration_minutes, to_minutes(day_start), to_minutes(day_end), held,
+            )
+        ]
 
-        return free
+    @traced("calendar.find_free_starts")
+    @_synchronized
+    def find_free_starts(
+        self, start: date, end: date, duration_minutes: int, **kwargs,
+    ) -> CandidateGrid:
+        """Score every meeting start between two dates. See `find_common_starts`."""
+        return find_common_starts([self], start, end, duration_minutes, **kwargs)
 
+    @traced("calendar.book_event")
+    @_synchronized
     def book_event(
         self, title: str, target_date: date, start: time, end: time,
         location: str = "", attendees: list[str] | None = None,
-        category: str = "work", notes: str = "",
-    ) -> dict | None:
-        """Book a new event. Returns the event dict, or None if slot is taken."""
-        if not self.is_available(target_date, start, end):
+        category: str = "work", notes: str = "", persist: bool = True, owner: str | None = None,
+    ) -> CalendarEvent | None:
+        """Book a new event. Returns the event, or None if slot is taken.
+        Booking for `owner` turns its hold into the event and releases its other holds.
+        With `persist=False` the event is only added in memory; pass it to `append_events` later.
+        """
+        if not self.is_available(target_date, start, end, owner):
             return None
 
-        event = {
-            "event_id": f"evt_{uuid.uuid4().hex[:8]}",
-            "date": target_date.isoformat(),
-            "start_time": start.strftime("%H:%M"),
-            "end_time": end.strftime("%H:%M"),
-            "title": title,
-            "location": location,
-            "attendees": ";".join(attendees or []),
-            "category": category,
-            "recurring": "none",
-            "notes": notes,
-        }
-
-        rows = self._read_all()
-        rows.append(event)
-        self._write_all(rows)
+        event = CalendarEvent(
+            event_id=f"evt_{uuid.uuid4().hex[:8]}",
+            start=epoch_minutes(target_date, start),
+            end=epoch_minutes(target_date, end),
+            title=title,
+            location=location,
+            attendees=tuple(attendees or ()),
+            category=category,
+            notes=notes,
+        )
+
+        if persist:
+            self._append([event])
+        self._add(event)
+        self.bitmap.mark_busy(target_date, event.start_minute, event.end_minute)
+        if owner is not None:
+            self._release(owner)
         return event
 
+    @traced("calendar.append_events")
+    def append_events(self, events: list[CalendarEvent]):
+        """Write events booked with `persist=False` to the CSV in one append.
+        Does not take the store lock, so reads carry on during the write.
+        """
+        self._append(events)
+
+    @traced("calendar.cancel_event")
+    @_synchronized
     def cancel_event(self, event_id: str) -> bool:
         """Remove an event by ID. Returns True if found and removed."""
-        rows = self._read_all()
-        filtered = [r for r in rows if r["event_id"] != event_id]
-        if len(filtered) == len(rows):
+        self._load()
+        event = self._by_id.get(event_id)
+        if event is not None:
+            self._remove(event)
+        elif self._snapshot is not None and event_id not in self._cancelled:
+            event = self._snapshot.find(event_id)
+            if event is not None:
+                self._cancelled.add(event_id)
+        if event is None:
             return False
-        self._write_all(filtered)
+        if self._snapshot is None:
+            self._write_all(self.all_events())
+        else:
+            # Both files stay as they are; the tombstone is picked up with the tail on reload
+            self._append([event.tombstone()])
+        # Other events may overlap the cancelled one, so rebuild that day on next use
+        self.bitmap.forget(event.date)
         return True
+
+
+def find_common_starts(
+    stores: list[CalendarStore], start: date, end: date, duration_minutes: int,
+    day_start: time = time(9, 0), day_end: time = time(17, 0),
+    buffer_minutes: int = 0, step_minutes: int | None = None,
+) -> CandidateGrid:
+    """Score every meeting start from `start` to `end` across several calendars at once.
+    `grid.starts()` lists starts where everyone is free; `grid.scores` counts free people.
+    Tentative holds are not counted; confirm a chosen start with `is_available`.
+    """
+    days = date_range(start, end)
+    bitmaps = [store.load_days(days) for store in stores]
+    return score_starts(
+        bitmaps, start, end, duration_minutes,
+        day_start=day_start, day_end=day_end,
+        buffer_minutes=buffer_minutes, step_minutes=step_minutes,
+    )
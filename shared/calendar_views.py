@@ -0,0 +1,87 @@
+"""
+Compact, paginated calendar views for agent tools.
+Tool results stay in the LLM context for the rest of a conversation, so the
+calendar tools return summaries rather than raw events: overlapping or
+back-to-back events merge into busy blocks, one line per day, labelled
+"prior commitment" unless they are focus time. No result is longer than a token
+budget. When lines are left over, the result ends with a cursor the model
+passes back for the next page. A cursor is the key of the last line returned
+(a date or a start time), so pages stay consistent while bookings come in.
+"""
+
+from datetime import date
+
+from config import TOOL_RESULT_MAX_TOKENS
+from shared.calendar_event import CalendarEvent
+from shared.freebusy import format_minutes
+
+
+PRIVATE_LABEL = "prior commitment"
+FOCUS_LABEL = "focus"
+CHARS_PER_TOKEN = 4  # the estimate langchain's count_tokens_approximately uses
+
+# Room kept for the "More: ..." line
+_FOOTER_TOKENS = 20
+
+
+def approx_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def busy_blocks(events: list[CalendarEvent]) -> dict[date, list[tuple[int, int, str]]]:
+    """Events merged per day into (start_minute, end_minute, label) blocks, in order.
+    Overlapping or back-to-back events with the same label become one block.
+    """
+    days: dict[date, list[tuple[int, int, str]]] = {}
+    for event in sorted(events, key=lambda e: e.start):
+        label = FOCUS_LABEL if event.category == "focus" else PRIVATE_LABEL
+        blocks = days.setdefault(event.date, [])
+        if blocks and blocks[-1][2] == label and event.start_minute <= blocks[-1][1]:
+            start, end, _ = blocks[-1]
+            blocks[-1] = (start, max(end, event.end_minute), label)
+        else:
+            blocks.append((event.start_minute, event.end_minute, label))
+    return days
+
+
+def busy_lines(events: list[CalendarEvent]) -> list[tuple[str, str]]:
+    """(date key, line) per day with events, e.g. "2026-03-02 Mon: 09:00-10:30, 13:00-14:00 (focus)"."""
+    lines = []
+    for day, blocks in sorted(busy_blocks(events).items()):
+        spans = ", ".join(
+            f"{format_minutes(start)}-{format_minutes(end)}" + (f" ({label})" if label != PRIVATE_LABEL else "")
+            for start, end, label in blocks
+        )
+        lines.append((day.isoformat(), f"{day.isoformat()} {day:%a}: {spans}"))
+    return lines
+
+
+def paginate(
+    items: list[tuple[str, str]], cursor: str = "", header: str = "", empty: str = "Nothing found.",
+    max_tokens: int = TOOL_RESULT_MAX_TOKENS,
+) -> str:
+    """The lines of `items` ((key, line) sorted by key) after `cursor` that fit in `max_tokens`,
+    with a cursor for the next page if any are left.
+    """
+    remaining = [item for item in items if item[0] > cursor] if cursor else items
+    if not remaining:
+        return empty if not cursor else "No more results."
+
+    out = [header] if header else []
+    used = approx_tokens(header)
+    budget = max_tokens - _FOOTER_TOKENS
+    shown = 0
+    for key, line in remaining:
+        cost = approx_tokens(line) + 1
+        if used + cost > budget:
+            if shown:
+                break
+            # A single line over budget is cut rather than never shown
+            line = line[:max((budget - used) * CHARS_PER_TOKEN - 3, 0)] + "..."
+        out.append(line)
+        used += cost
+        shown += 1
+        last = key
+    if shown < len(remaining):
+        out.append(f'More: {len(remaining) - shown} more lines, call again with cursor="{last}".')
+    return "\n".join(out)
@@ -0,0 +1,225 @@
+"""
+Record and replay of LLM calls and A2A messages.
+In record mode every outbound OpenAI HTTP call (through `CassetteTransport`),
+every peer exchange (through `replay_or_call`) and every reply an agent serves
+is appended to `<dir>/<service>.jsonl`. In replay mode LLM calls and peer
+exchanges are answered from that file instead of the network, after the
+recorded latency or none at all, so the same prompt takes the same path on
+every run and what is left to time is the system's own overhead.
+
+Recorded requests are matched on their content with volatile ids removed; when
+nothing matches (e.g. a prompt mentions the current time) the next unused
+entry of the same kind is served.
+
+Usage:
+    A2A_CASSETTE_MODE=record python run_servers.py
+    A2A_CASSETTE_MODE=replay A2A_CASSETTE_LATENCY=zero python run_servers.py
+
+Summarize a cassette:
+    python -m shared.cassette cassettes/person_a.jsonl
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+# Ids, trace context and usage differ on every run and are left out of matching
+VOLATILE_KEYS = frozenset({
+    "id", "messageId", "contextId", "taskId", "metadata", "prompt_cache_key", "traceparent",
+})
+# Recorded bodies are stored decoded, so these no longer describe them
+_DROP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recorded entry for a request."""
+
+
+def _strip(value):
+    if isinstance(value, dict):
+        return {k: _strip(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip(v) for v in value]
+    return value
+
+
+def fingerprint(request) -> str:
+    """Stable key for a request, ignoring volatile fields."""
+    canonical = json.dumps(_strip(request), sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+class Cassette:
+    """One process's recording: a JSONL file of {kind, key, request, response, elapsed} entries."""
+
+    def __init__(self, path: str, mode: str, latency: str = "original"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries: list[dict] = []
+        self._by_key: dict[tuple[str, str], list[int]] = defaultdict(list)
+        self._by_kind: dict[str, list[int]] = defaultdict(list)
+        self._used: set[int] = set()
+
+        if mode == "record":
+            # One cassette per run; mixing runs would break replay order
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("")
+        elif mode == "replay":
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+            self._entries = [json.loads(line) for line in lines if line.strip()]
+            for i, entry in enumerate(self._entries):
+                self._by_key[(entry["kind"], entry["key"])].append(i)
+                self._by_kind[entry["kind"]].append(i)
+
+    def record(self, kind: str, request, response, elapsed: float):
+        line = json.dumps({
+            "kind": kind, "key": fingerprint(request), "request": request,
+            "response": response, "elapsed": round(elapsed, 6),
+        }, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def take(self, kind: str, request) -> dict:
+        """The recorded entry for `request`: an unused exact match, else the next unused one of its kind."""
+        key = fingerprint(request)
+        with self._lock:
+            index = next((i for i in self._by_key.get((kind, key), ()) if i not in self._used), None)
+            if index is None:
+                index = next((i for i in self._by_kind.get(kind, ()) if i not in self._used), None)
+                if index is None:
+                    raise CassetteMiss(f"No recorded {kind} entry left in {self.path}")
+                logger.warning(f"Cassette: no exact {kind} match, serving entry {index} in recorded order")
+            self._used.add(index)
+            return self._entries[index]
+
+    def delay(self, entry: dict) -> float:
+        """Seconds to wait before serving `entry`: recorded, zero, or recorded times a factor."""
+        if self.latency == "original":
+            return entry["elapsed"]
+        if self.latency == "zero":
+            return 0.0
+        return entry["elapsed"] * float(self.latency)
+
+
+_cassette: Cassette | None = None
+
+
+def configure_cassette(service_name: str, mode: str = "off", directory: str = "cassettes", latency: str = "original"):
+    """Set up the process-wide cassette. Mode "off" disables recording and replay."""
+    global _cassette
+    _cassette = None if mode == "off" else Cassette(Path(directory) / f"{service_name}.jsonl", mode, latency)
+    if _cassette is not None:
+        logger.info(f"Cassette {mode}: {_cassette.path}")
+    return _cassette
+
+
+def get_cassette() -> Cassette | None:
+    return _cassette
+
+
+def record(kind: str, request, response, elapsed: float):
+    """Append an entry if recording; a no-op otherwise."""
+    if _cassette is not None and _cassette.mode == "record":
+        _cassette.record(kind, request, response, elapsed)
+
+
+async def replay_or_call(kind: str, request: dict, call, model):
+    """Await `call()` and record its pydantic result, or return the recorded result in replay."""
+    cassette = _cassette
+    if cassette is None:
+        return await call()
+    if cassette.mode == "replay":
+        entry = cassette.take(kind, request)
+        await asyncio.sleep(cassette.delay(entry))
+        return model.model_validate(entry["response"])
+    start = time.perf_counter()
+    result = await call()
+    cassette.record(kind, request, result.model_dump(mode="json", exclude_none=True), time.perf_counter() - start)
+    return result
+
+
+def _body(content: bytes):
+    try:
+        return json.loads(content) if content else None
+    except ValueError:
+        return content.decode("utf-8", "replace")
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records or replays requests through the process-wide cassette."""
+
+    def __init__(self, kind: str = "llm", transport: httpx.AsyncBaseTransport | None = None):
+        self.kind = kind
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = _cassette
+        if cassette is None:
+            return await self._transport.handle_async_request(request)
+
+        await request.aread()
+        recorded_request = {"method": request.method, "url": str(request.url), "body": _body(request.content)}
+        if cassette.mode == "replay":
+            entry = cassette.take(self.kind, recorded_request)
+            await asyncio.sleep(cassette.delay(entry))
+            response = entry["response"]
+            return httpx.Response(
+                response["status"], headers=response["headers"],
+                content=response["body"].encode(), request=request,
+            )
+
+        start = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        content = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        # Decode (gzip etc.) so the cassette holds readable text
+        decoded = httpx.Response(response.status_code, headers=response.headers, content=content).content
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+        cassette.record(
+            self.kind, recorded_request,
+            {"status": response.status_code, "headers": headers, "body": decoded.decode("utf-8", "replace")},
+            time.perf_counter() - start,
+        )
+        return httpx.Response(response.status_code, headers=headers, content=decoded, request=request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# --- Cassette summary ---
+
+def summarize(path: str) -> str:
+    """Entries and recorded time per kind."""
+    totals: dict[str, list[float]] = defaultdict(list)
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            entry = json.loads(line)
+            totals[entry["kind"]].append(entry["elapsed"])
+    return "\n".join(
+        f"{kind:<12} {len(times):>5} entries  {sum(times):>9.2f}s total  {max(times):>7.2f}s max"
+        for kind, times in sorted(totals.items())
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m shared.cassette cassettes/<service>.jsonl")
+        sys.exit(1)
+    print(summarize(sys.argv[1]))
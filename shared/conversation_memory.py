@@ -0,0 +1,140 @@
+"""
+Per-counterparty conversation memory.
+Conversations are keyed by (sender, A2A contextId), so round 2 of a
+negotiation sees what was already said and checked in round 1. Once a
+conversation's history passes a token threshold, older turns are folded into
+a running summary; idle conversations are evicted least-recently-used first.
+Only what was said is kept: tool calls and their results are dropped once a
+turn ends, since the calendar can be asked again. Tokens spent on a summary are
+charged to the conversation's next reply.
+"""
+
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Awaitable, Callable
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from shared.usage import TokenUsage
+
+
+Summarizer = Callable[[str, list[BaseMessage]], Awaitable[str]]
+
+_current_context_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_context_id", default=None,
+)
+
+
+class Conversation:
+    """History with one counterparty in one A2A context."""
+
+    def __init__(self, key: tuple[str, str]):
+        self.key = key
+        self.summary = ""
+        self.messages: list[BaseMessage] = []
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.unbilled = TokenUsage()  # compaction usage not yet charged to a reply
+
+    def take_unbilled(self) -> TokenUsage:
+        usage, self.unbilled = self.unbilled, TokenUsage()
+        return usage
+
+    def history(self) -> list[BaseMessage]:
+        """Messages to prepend to the next turn: summary first, then recent turns."""
+        if not self.summary:
+            return list(self.messages)
+        recap = HumanMessage(content=f"[Summary of our earlier conversation]\n{self.summary}")
+        return [recap, *self.messages]
+
+    @property
+    def tokens(self) -> int:
+        return count_tokens_approximately(self.history())
+
+
+def transcript(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """The messages without tool calls and tool results, for storing a finished turn."""
+    kept = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            continue
+        if isinstance(message, AIMessage) and message.tool_calls:
+            if not message.content:
+                continue
+            message = AIMessage(content=message.content)
+        kept.append(message)
+    return kept
+
+
+class ConversationMemory:
+    """Bounded LRU of conversations with summary-based compaction."""
+
+    def __init__(
+        self, summarizer: Summarizer, max_conversations: int = 256,
+        idle_ttl_seconds: float = 3600, token_threshold: int = 4000, keep_recent_turns: int = 2,
+    ):
+        self.summarizer = summarizer
+        self.max_conversations = max_conversations
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.token_threshold = token_threshold
+        self.keep_recent_turns = keep_recent_turns
+        self._conversations: OrderedDict[tuple[str, str], Conversation] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def get(self, sender: str, context_id: str) -> Conversation:
+        """Fetch or create the conversation, marking it most recently used."""
+        key = (sender, context_id)
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = Conversation(key)
+            self._conversations[key] = conversation
+        self._conversations.move_to_end(key)
+        conversation.last_used = time.monotonic()
+        self._evict()
+        return conversation
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        while self._conversations:
+            key, oldest = next(iter(self._conversations.items()))
+            if len(self._conversations) <= self.max_conversations and oldest.last_used >= cutoff:
+                break
+            del self._conversations[key]
+
+    async def compact(self, conversation: Conversation) -> bool:
+        """Fold all but the last few turns into the summary if history is over threshold.
+        Caller must hold `conversation.lock`. Returns True if it compacted.
+        """
+        if conversation.tokens <= self.token_threshold:
+            return False
+
+        # A turn starts at each human message, so tool calls stay with their results
+        turn_starts = [i for i, m in enumerate(conversation.messages) if isinstance(m, HumanMessage)]
+        if len(turn_starts) <= self.keep_recent_turns:
+            return False
+        split = turn_starts[-self.keep_recent_turns] if self.keep_recent_turns else len(conversation.messages)
+
+        old, recent = conversation.messages[:split], conversation.messages[split:]
+        conversation.summary = await self.summarizer(conversation.summary, old)
+        conversation.messages = recent
+        return True
+
+
+@contextmanager
+def conversation_scope(context_id: str | None):
+    """Expose the current request's A2A contextId to outbound A2A calls."""
+    token = _current_context_id.set(context_id)
+    try:
+        yield context_id
+    finally:
+        _current_context_id.reset(token)
+
+
+def current_context_id() -> str | None:
+    return _current_context_id.get()
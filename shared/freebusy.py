@@ -0,0 +1,198 @@
+"""
+Vectorized free/busy bitmaps.
+Each day is a NumPy bool array with one cell per `resolution` minutes
+(True = busy). Free-slot search, buffers and multi-person intersection are
+array operations instead of Python loops over events, and `score_starts`
+scores every candidate start across a date range for many people at once.
+"""
+
+from datetime import date, time, timedelta
+
+import numpy as np
+
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def window_sums(busy: np.ndarray, width: int) -> np.ndarray:
+    """Busy cells in every window of `width` cells along the last axis.
+    Result[..., i] covers cells i .. i+width-1 (a box convolution via cumsum).
+    """
+    padded = np.concatenate(
+        [np.zeros(busy.shape[:-1] + (1,), dtype=np.int32), np.cumsum(busy, axis=-1, dtype=np.int32)],
+        axis=-1,
+    )
+    return padded[..., width:] - padded[..., :-width]
+
+
+def dilate(busy: np.ndarray, cells: int) -> np.ndarray:
+    """Grow every busy block by `cells` on both sides (meeting buffers)."""
+    if cells <= 0:
+        return busy
+    pad = np.zeros(busy.shape[:-1] + (cells,), dtype=bool)
+    padded = np.concatenate([pad, busy, pad], axis=-1)
+    return window_sums(padded, 2 * cells + 1) > 0
+
+
+def free_runs(free: np.ndarray) -> list[tuple[int, int]]:
+    """(start, end) cell indexes of each run of True in a 1-D array."""
+    edges = np.diff(np.concatenate([[False], free, [False]]).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+class FreeBusyBitmap:
+    """Per-day busy bitmaps for one calendar."""
+
+    def __init__(self, resolution: int = 1):
+        if MINUTES_PER_DAY % resolution:
+            raise ValueError("resolution must divide 1440 minutes")
+        self.resolution = resolution
+        self.cells_per_day = MINUTES_PER_DAY // resolution
+        self._days: dict[date, np.ndarray] = {}
+        self._empty = np.zeros(self.cells_per_day, dtype=bool)
+        self._empty.flags.writeable = False
+
+    def _cells(self, start_minute: int, end_minute: int) -> slice:
+        """Cells touched by [start, end) — rounded outward so partial cells count as busy."""
+        return slice(start_minute // self.resolution, -(-end_minute // self.resolution))
+
+    def __contains__(self, day: date) -> bool:
+        return day in self._days
+
+    def day(self, day: date) -> np.ndarray:
+        """Read-only busy array for a day (all free if nothing was recorded)."""
+        return self._days.get(day, self._empty)
+
+    def set_day(self, day: date, intervals: list[tuple[int, int]]):
+        """Replace a day's bitmap from (start_minute, end_minute) intervals."""
+        busy = np.zeros(self.cells_per_day, dtype=bool)
+        for start, end in intervals:
+            busy[self._cells(start, end)] = True
+        self._days[day] = busy
+
+    def mark_busy(self, day: date, start_minute: int, end_minute: int):
+        busy = self._days.get(day)
+        if busy is None:
+            busy = self._days[day] = np.zeros(self.cells_per_day, dtype=bool)
+        busy[self._cells(start_minute, end_minute)] = True
+
+    def mark_free(self, day: date, start_minute: int, end_minute: int):
+        busy = self._days.get(day)
+        if busy is not None:
+            busy[self._cells(start_minute, end_minute)] = False
+
+    def copy(self, days: list[date]) -> "FreeBusyBitmap":
+        """Independent copy of `days`, for planning changes without touching this bitmap."""
+        clone = FreeBusyBitmap(self.resolution)
+        clone._days = {d: self.day(d).copy() for d in days}
+        return clone
+
+    def forget(self, day: date):
+        self._days.pop(day, None)
+
+    def clear(self):
+        self._days.clear()
+
+    def is_free(self, day: date, start_minute: int, end_minute: int) -> bool:
+        return not self.day(day)[self._cells(start_minute, end_minute)].any()
+
+    def free_slots(
+        self, day: date, duration_minutes: int, day_start: int, day_end: int,
+        extra_busy: list[tuple[int, int]] = (),
+    ) -> list[tuple[int, int]]:
+        """Free (start_minute, end_minute) gaps within [day_start, day_end) at least `duration` long.
+        `extra_busy` intervals (e.g. tentative holds) count as busy without being recorded.
+        """
+        first = -(-day_start // self.resolution)
+        last = day_end // self.resolution
+        busy = self.day(day)
+        if extra_busy:
+            busy = busy.copy()
+            for start, end in extra_busy:
+                busy[self._cells(start, end)] = True
+        free = ~busy[first:last]
+        min_cells = -(-duration_minutes // self.resolution)
+        return [
+            ((first + s) * self.resolution, (first + e) * self.resolution)
+            for s, e in free_runs(free) if e - s >= min_cells
+        ]
+
+    def busy_matrix(self, days: list[date]) -> np.ndarray:
+        """Stack days into a (len(days), cells_per_day) busy matrix."""
+        return np.stack([self.day(d) for d in days]) if days else np.zeros((0, self.cells_per_day), bool)
+
+
+def date_range(start: date, end: date) -> list[date]:
+    """Dates from start to end inclusive."""
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+class CandidateGrid:
+    """Scores for every candidate meeting start across a date range.
+    `scores[d, i]` is how many people are free for the whole meeting starting at
+    cell i of day d; -1 marks starts outside the allowed day window.
+    """
+
+    def __init__(self, days: list[date], resolution: int, scores: np.ndarray, people: int):
+        self.days = days
+        self.resolution = resolution
+        self.scores = scores
+        self.people = people
+
+    @property
+    def all_free(self) -> np.ndarray:
+        return self.scores == self.people
+
+    def starts(self, min_free: int | None = None, limit: int | None = None) -> list[tuple[date, str]]:
+        """(date, "HH:MM") starts where at least `min_free` people (default: all) are free."""
+        needed = self.people if min_free is None else min_free
+        day_idx, cell_idx = np.nonzero(self.scores >= needed)
+        if limit is not None:
+            day_idx, cell_idx = day_idx[:limit], cell_idx[:limit]
+        return [
+            (self.days[d], format_minutes(int(c) * self.resolution))
+            for d, c in zip(day_idx.tolist(), cell_idx.tolist())
+        ]
+
+
+def score_starts(
+    bitmaps: list[FreeBusyBitmap], start: date, end: date, duration_minutes: int,
+    day_start: time = time(9, 0), day_end: time = time(17, 0),
+    buffer_minutes: int = 0, step_minutes: int | None = None,
+) -> CandidateGrid:
+    """Score every meeting start from `start` to `end` for all `bitmaps` in one shot.
+    All bitmaps must share a resolution. `step_minutes` keeps only starts on that grid
+    (e.g. 15 for quarter hours).
+    """
+    if not bitmaps:
+        raise ValueError("score_starts needs at least one calendar")
+    resolution = bitmaps[0].resolution
+    if any(b.resolution != resolution for b in bitmaps):
+        raise ValueError("all bitmaps must share a resolution")
+
+    days = date_range(start, end)
+    width = -(-duration_minutes // resolution)
+    buffer_cells = -(-buffer_minutes // resolution)
+
+    # (people, days, cells) busy cube -> free-for-whole-meeting per start -> count of people
+    busy = np.stack([dilate(b.busy_matrix(days), buffer_cells) for b in bitmaps])
+    free_starts = window_sums(busy, width) == 0
+    scores = free_starts.sum(axis=0).astype(np.int32)
+
+    # Starts must fit inside the day window (and sit on the step grid)
+    cells = np.arange(scores.shape[-1]) * resolution
+    allowed = (cells >= to_minutes(day_start)) & (cells + duration_minutes <= to_minutes(day_end))
+    if step_minutes:
+        allowed &= cells % step_minutes == 0
+    scores[:, ~allowed] = -1
+    return CandidateGrid(days, resolution, scores, len(bitmaps))
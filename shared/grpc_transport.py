@@ -0,0 +1,114 @@
+"""
+Optional A2A gRPC transport for traffic inside the fleet.
+Agent servers can serve the A2A gRPC service next to JSON-RPC, on their HTTP
+port + GRPC_PORT_OFFSET, and list it in their AgentCard as an additional
+interface. Clients try transports in A2A_TRANSPORTS order and use the first one
+the peer's card offers, so gRPC is used when both sides support it and
+JSON-RPC otherwise. gRPC channels are kept open per peer address for the life
+of the process instead of a new HTTP connection per message.
+
+Needs `a2a-sdk[grpc]`; without it everything stays JSON-RPC.
+Compare the transports on a running peer with `python -m cli.bench_transport`.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from a2a.types import AgentCard, AgentInterface, TransportProtocol
+
+from config import A2A_TRANSPORTS, GRPC_ENABLED, GRPC_PORT_OFFSET
+
+try:
+    import grpc
+    from a2a.client.transports.grpc import GrpcTransport
+    from a2a.grpc import a2a_pb2_grpc
+    from a2a.server.request_handlers import GrpcHandler
+except ImportError:
+    grpc = None
+
+
+logger = logging.getLogger(__name__)
+
+# grpc.aio channels by target ("host:port"), reused across requests
+_channels: dict[str, "grpc.aio.Channel"] = {}
+
+
+def grpc_available() -> bool:
+    return GRPC_ENABLED and grpc is not None
+
+
+def grpc_port(http_port: int) -> int:
+    return http_port + GRPC_PORT_OFFSET
+
+
+def with_grpc_interface(card: AgentCard, http_port: int) -> AgentCard:
+    """`card` listing both its JSON-RPC URL and the gRPC address, if gRPC is available."""
+    if not grpc_available():
+        return card
+    host = urlparse(card.url).hostname or "localhost"
+    return card.model_copy(update={
+        "preferred_transport": TransportProtocol.jsonrpc.value,
+        "additional_interfaces": [
+            AgentInterface(transport=TransportProtocol.jsonrpc.value, url=card.url),
+            AgentInterface(transport=TransportProtocol.grpc.value, url=f"{host}:{grpc_port(http_port)}"),
+        ],
+    })
+
+
+def with_grpc_server(lifespan, card: AgentCard, request_handler, http_port: int):
+    """Wrap a Starlette lifespan so the A2A gRPC service runs alongside the app.
+    Returns `lifespan` unchanged when gRPC is not available.
+    """
+    if not grpc_available():
+        return lifespan
+
+    @asynccontextmanager
+    async def combined(app):
+        server = grpc.aio.server()
+        a2a_pb2_grpc.add_A2AServiceServicer_to_server(GrpcHandler(card, request_handler), server)
+        address = f"[::]:{grpc_port(http_port)}"
+        server.add_insecure_port(address)
+        await server.start()
+        logger.info(f"A2A gRPC service listening on {address}")
+        try:
+            async with lifespan(app) as state:
+                yield state
+        finally:
+            await server.stop(grace=5)
+
+    return combined
+
+
+def channel(target: str) -> "grpc.aio.Channel":
+    """Shared channel to a peer's gRPC address (ClientConfig.grpc_channel_factory)."""
+    if target not in _channels:
+        _channels[target] = grpc.aio.insecure_channel(target)
+    return _channels[target]
+
+
+async def close_channels():
+    for target in list(_channels):
+        await _channels.pop(target).close()
+
+
+def client_transports() -> list[str]:
+    """Transports to offer a peer, in preference order."""
+    transports = [t for t in A2A_TRANSPORTS if t != TransportProtocol.grpc.value or grpc_available()]
+    return transports or [TransportProtocol.jsonrpc.value]
+
+
+def client_options() -> dict:
+    """ClientConfig arguments that make the client prefer gRPC when the peer offers it."""
+    return {"supported_transports": client_transports(), "use_client_preference": True}
+
+
+def _grpc_transport(card: AgentCard, url: str, config, interceptors) -> "GrpcTransport":
+    # GrpcTransport.create passes the config's default `extensions=[]` through, which makes
+    # it send an empty, upper-case X-A2A-Extensions header that grpc rejects
+    return GrpcTransport(channel(url), card, config.extensions or None)
+
+
+def extra_transports() -> dict:
+    """ClientFactory.connect(extra_transports=...) for the shared gRPC channels."""
+    return {TransportProtocol.grpc.value: _grpc_transport} if grpc_available() else {}
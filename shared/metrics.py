@@ -0,0 +1,118 @@
+"""
+Prometheus metrics for agent servers.
+Most metrics are fed from finished tracing spans (see shared/tracing.py),
+so every instrumented hop is counted without a second set of timers.
+Gauges for in-flight work are updated directly by the executor.
+
+Mount next to the A2A routes:
+    app.build(routes=metrics_routes())
+"""
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from shared.tracing import Span, get_tracer
+
+
+# Seconds — agent runs and LLM calls are slow, calendar operations are fast
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+REQUESTS = Counter(
+    "a2a_requests_total", "A2A executions handled, by skill and outcome.",
+    ["agent", "skill", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "a2a_request_latency_seconds", "A2A execution latency by skill.",
+    ["agent", "skill"], buckets=SLOW_BUCKETS,
+)
+LLM_LATENCY = Histogram(
+    "llm_call_latency_seconds", "Latency of a single LLM call.",
+    ["agent", "model"], buckets=SLOW_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "LLM tokens by kind (input, output, cached).",
+    ["agent", "model", "kind"],
+)
+TOOL_CALLS = Counter(
+    "tool_calls_total", "Agent tool calls by tool and outcome.",
+    ["agent", "tool", "status"],
+)
+TOOL_LATENCY = Histogram(
+    "tool_call_duration_seconds", "Agent tool call duration.",
+    ["agent", "tool"], buckets=SLOW_BUCKETS,
+)
+CALENDAR_LATENCY = Histogram(
+    "calendar_operation_seconds", "CalendarStore operation latency.",
+    ["agent", "operation"], buckets=FAST_BUCKETS,
+)
+OFFLOAD_WAIT = Histogram(
+    "calendar_offload_wait_seconds", "Time calendar work waited for a worker thread.",
+    ["agent"], buckets=FAST_BUCKETS,
+)
+OUTBOUND_LATENCY = Histogram(
+    "a2a_outbound_latency_seconds", "Latency of outbound A2A messages by peer.",
+    ["agent", "peer", "status"], buckets=SLOW_BUCKETS,
+)
+MODEL_ROUTES = Counter(
+    "llm_model_routes_total", "Agent turns by model tier and routing reason.",
+    ["agent", "tier", "reason"],
+)
+PROMPT_CACHE_HIT_RATIO = Gauge(
+    "llm_prompt_cache_hit_ratio", "Cached share of prompt tokens in the last request.", ["agent"],
+)
+PROMPT_PREFIX_REBUILDS = Counter(
+    "prompt_prefix_rebuilds_total", "Prompt prefix rebuilds after context file edits.", ["agent"],
+)
+INFLIGHT_TASKS = Gauge(
+    "a2a_inflight_tasks", "A2A executions currently running.", ["agent"],
+)
+
+
+def record_span(span: Span):
+    """Span processor: turn a finished span into metric observations."""
+    agent = span.service
+    seconds = span.duration_ms / 1000
+    attrs = span.attributes
+    name = span.name
+
+    if name == "a2a.execute":
+        skill = attrs.get("skill", "default")
+        REQUESTS.labels(agent, skill, span.status).inc()
+        REQUEST_LATENCY.labels(agent, skill).observe(seconds)
+    elif name == "llm.call":
+        model = attrs.get("model") or "unknown"
+        LLM_LATENCY.labels(agent, model).observe(seconds)
+        for kind in ("input", "output", "cached"):
+            tokens = attrs.get(f"{kind}_tokens", 0)
+            if tokens:
+                LLM_TOKENS.labels(agent, model, kind).inc(tokens)
+    elif name == "tool.call":
+        tool = attrs.get("tool", "unknown")
+        TOOL_CALLS.labels(agent, tool, span.status).inc()
+        TOOL_LATENCY.labels(agent, tool).observe(seconds)
+    elif name.startswith("calendar."):
+        CALENDAR_LATENCY.labels(agent, name.removeprefix("calendar.")).observe(seconds)
+    elif name == "a2a.send":
+        OUTBOUND_LATENCY.labels(agent, attrs.get("peer", "unknown"), span.status).observe(seconds)
+
+
+def install_metrics():
+    """Feed finished spans into the metrics above. Idempotent."""
+    tracer = get_tracer()
+    if record_span not in tracer.processors:
+        tracer.add_span_processor(record_span)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def metrics_routes() -> list[Route]:
+    """Routes to pass to `A2AStarletteApplication.build(routes=...)`."""
+    return [Route("/metrics", metrics_endpoint, methods=["GET"])]
@@ -0,0 +1,85 @@
+"""
+Model tier routing.
+Routine turns ("yes, 10am works", simple availability questions) go to a
+small, fast model; anything long, ambiguous or multi-party goes to the large
+one. Rules are cheap string checks configured per agent and per skill. A turn
+the small model handles badly — a failed tool call, an empty or hedging reply,
+or an error — is escalated to the large model, which continues from the tool
+results the small model already got.
+"""
+
+import re
+from typing import Literal
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from pydantic import BaseModel, Field
+
+from config import OPENAI_MODEL, OPENAI_SMALL_MODEL
+
+
+Tier = Literal["small", "large"]
+
+
+class ModelPolicy(BaseModel):
+    """Which model tier an agent uses for which turns."""
+    models: dict[str, str] = Field(default_factory=lambda: {"small": OPENAI_SMALL_MODEL, "large": OPENAI_MODEL})
+    default_tier: Tier = "large"
+    skill_tiers: dict[str, Tier] = {}  # skill id -> tier, checked before the rules below
+    small_max_chars: int = 400  # longer messages go to the large model
+    small_max_history: int = 8  # as do turns deep into a conversation
+    routine_patterns: list[str] = [
+        r"\b(works|confirm(ed)?|sounds good|yes|no|available|free|busy|booked|thanks?)\b",
+    ]
+    escalate_patterns: list[str] = [
+        r"\b(reschedul\w*|instead|conflict|cancel\w*|priority|urgent|either|unless|depends|not sure)\b",
+    ]
+    hedge_patterns: list[str] = [  # small-model replies that mean it is out of its depth
+        r"\b(not sure|unclear|unable to|can't determine|cannot determine|could you clarify)\b",
+    ]
+
+
+class RouteDecision(BaseModel):
+    tier: Tier
+    reason: str  # short code, used as a metric label
+    escalated: bool = False
+
+
+def _matches(patterns: list[str], text: str) -> bool:
+    return any(re.search(p, text, re.IGNORECASE) for p in patterns)
+
+
+def route(policy: ModelPolicy, message: str, skill: str = "default", history_length: int = 0) -> RouteDecision:
+    """Pick the tier for a turn before running it."""
+    if skill in policy.skill_tiers:
+        return RouteDecision(tier=policy.skill_tiers[skill], reason="skill")
+    if len(message) > policy.small_max_chars:
+        return RouteDecision(tier="large", reason="long_message")
+    if history_length > policy.small_max_history:
+        return RouteDecision(tier="large", reason="long_history")
+    if _matches(policy.escalate_patterns, message):
+        return RouteDecision(tier="large", reason="ambiguous")
+    if _matches(policy.routine_patterns, message):
+        return RouteDecision(tier="small", reason="routine")
+    return RouteDecision(tier=policy.default_tier, reason="default")
+
+
+def escalation_reason(policy: ModelPolicy, new_messages: list[BaseMessage]) -> str | None:
+    """Why a small-model turn should be redone by the large model, or None if it went fine."""
+    for message in new_messages:
+        if isinstance(message, ToolMessage) and message.status == "error":
+            return "tool_error"
+        if isinstance(message, AIMessage) and message.invalid_tool_calls:
+            return "tool_error"
+    reply = new_messages[-1] if new_messages else None
+    text = reply.content if isinstance(reply, AIMessage) and isinstance(reply.content, str) else ""
+    if not text.strip():
+        return "empty_reply"
+    if _matches(policy.hedge_patterns, text):
+        return "hedge"
+    return None
+
+
+def carry_over(new_messages: list[BaseMessage]) -> list[BaseMessage]:
+    """The small model's turn up to its last tool result, so the large model sees what was already done."""
+    last_tool = max((i for i, m in enumerate(new_messages) if isinstance(m, ToolMessage)), default=-1)
+    return new_messages[:last_tool + 1]
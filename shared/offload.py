@@ -0,0 +1,30 @@
+"""
+Bounded thread pool for blocking calendar work.
+Calendar reads and writes do file I/O, so async code hands them to this pool
+instead of running them on the event loop. The pool size caps how many run at
+once; time spent waiting for a free thread is exported as a metric.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+
+from config import CALENDAR_WORKER_THREADS
+from shared.metrics import OFFLOAD_WAIT
+from shared.tracing import get_tracer
+
+
+_executor = ThreadPoolExecutor(max_workers=CALENDAR_WORKER_THREADS, thread_name_prefix="calendar")
+
+
+async def offload(fn, *args, **kwargs):
+    """Run `fn(*args, **kwargs)` on the calendar pool, keeping the caller's trace and usage context."""
+    submitted = time.perf_counter()
+
+    def run():
+        OFFLOAD_WAIT.labels(get_tracer().service_name).observe(time.perf_counter() - submitted)
+        return fn(*args, **kwargs)
+
+    return await asyncio.get_running_loop().run_in_executor(_executor, partial(copy_context().run, run))
@@ -0,0 +1,266 @@
+"""
+Per-peer latency tracking, adaptive timeouts and circuit breaking.
+Each peer agent gets a PeerHealth in the AgentRegistry. It keeps recent
+latencies (separately for blocking and push exchanges) and sets timeouts from
+the observed p95, and it has a circuit breaker. After enough consecutive
+failures the breaker opens and calls fail at once with PeerUnavailable; after
+a cooldown one trial call is let through to see if the peer is back.
+
+`call_with_retries` retries transport failures with full jitter, within an
+overall time budget. A GiveUp error counts against the peer but is never
+retried, e.g. a task the peer accepted and did not finish in time. Retries reuse
+the request's messageId, and the receiving executor answers a repeated
+messageId from its `IdempotencyCache` instead of running it again. Cheap,
+idempotent requests can also be hedged: if one is slower than the peer's p95, a
+second copy (with its own messageId, so the peer really runs it) is sent and
+the first to finish wins.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+
+import httpx
+from a2a.client.errors import A2AClientHTTPError, A2AClientTimeoutError
+
+
+logger = logging.getLogger(__name__)
+
+# Failures worth retrying: the request may never have reached the peer, or the peer is overloaded
+RETRYABLE = (httpx.TransportError, A2AClientTimeoutError, TimeoutError)
+
+
+class GiveUp(Exception):
+    """The peer failed in a way another attempt won't fix quickly (e.g. it accepted a task and
+    never finished it). Counts as a failure, but is not retried.
+    """
+
+
+class PeerUnavailable(Exception):
+    """The peer's circuit breaker is open; the call was not attempted."""
+
+    def __init__(self, peer: str, retry_in: float):
+        super().__init__(f"{peer} is failing, skipped for another {retry_in:.0f}s")
+        self.peer = peer
+        self.retry_in = retry_in
+
+
+def _retryable(error: BaseException) -> bool:
+    if isinstance(error, A2AClientHTTPError):
+        return error.status_code >= 500 or error.status_code == 429
+    return isinstance(error, RETRYABLE)
+
+
+class LatencyStats:
+    """Latencies of the last `window` successful calls."""
+
+    def __init__(self, window: int = 100):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures; half-opens after `cooldown` seconds."""
+
+    def __init__(self, failures: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failures
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> tuple[bool, float | None]:
+        """(is_trial, None) if a call may go ahead, else (False, seconds until the next trial).
+        The trial call must end in `success`, `failure` or `end_trial`.
+        """
+        state = self.state
+        if state == "closed":
+            return False, None
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True, None
+        return False, max(self.cooldown - (time.monotonic() - self.opened_at), 0.0)
+
+    def end_trial(self):
+        """The trial call ended without an outcome (e.g. it was cancelled); let another one through."""
+        self._trial = False
+
+    def success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def failure(self):
+        self.consecutive_failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class PeerHealth:
+    """Latency stats and circuit breaker for one peer."""
+
+    def __init__(
+        self, name: str, min_samples: int = 10, p95_multiplier: float = 2.0,
+        breaker_failures: int = 5, breaker_cooldown: float = 30.0,
+    ):
+        self.name = name
+        self.min_samples = min_samples
+        self.p95_multiplier = p95_multiplier
+        self.latency = {False: LatencyStats(), True: LatencyStats()}  # keyed by push
+        self.breaker = CircuitBreaker(breaker_failures, breaker_cooldown)
+
+    def p95(self, push: bool = False) -> float | None:
+        """Observed p95, once there are enough samples to trust it."""
+        stats = self.latency[push]
+        return stats.percentile(0.95) if len(stats) >= self.min_samples else None
+
+    def timeout(self, default: float, floor: float, push: bool = False) -> float:
+        """`p95 x multiplier`, kept between `floor` and `default`; `default` until p95 is known."""
+        p95 = self.p95(push)
+        if p95 is None:
+            return default
+        return min(max(p95 * self.p95_multiplier, floor), default)
+
+    def check(self) -> bool:
+        """Raise PeerUnavailable if the breaker is open; True if this call is the half-open trial."""
+        trial, retry_in = self.breaker.allow()
+        if retry_in is not None:
+            raise PeerUnavailable(self.name, retry_in)
+        return trial
+
+    def success(self, seconds: float, push: bool = False):
+        self.latency[push].observe(seconds)
+        self.breaker.success()
+
+    def failure(self):
+        was_closed = self.breaker.state == "closed"
+        self.breaker.failure()
+        if was_closed and self.breaker.state != "closed":
+            logger.warning(f"Circuit opened for {self.name} after {self.breaker.consecutive_failures} failures")
+
+
+async def call_with_retries(
+    health: PeerHealth, attempt, push: bool = False,
+    retries: int = 2, base_delay: float = 0.5, hedge=None, budget: float | None = None,
+):
+    """Run `attempt()` through the peer's breaker, retrying transport failures with full jitter.
+    With `hedge` (another coroutine function), it is also started if `attempt()` is slower than
+    the peer's p95, and the first to finish wins. `budget` caps the seconds spent across all
+    attempts and backoffs; an attempt still running when it runs out fails with TimeoutError.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if budget is None else loop.time() + budget
+    trial = health.check()
+    try:
+        for n in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                async with asyncio.timeout_at(deadline):
+                    result = await (_hedged(attempt, hedge, health.p95(push)) if hedge else attempt())
+            except GiveUp:
+                health.failure()
+                raise
+            except Exception as e:
+                if not _retryable(e):
+                    # The peer answered, so it is up
+                    health.success(time.perf_counter() - start, push)
+                    raise
+                health.failure()
+                delay = random.uniform(0, base_delay * 2 ** n)
+                if n == retries or (deadline is not None and loop.time() + delay >= deadline):
+                    raise
+                logger.info(f"Retrying {health.name} in {delay:.2f}s after {type(e).__name__}: {e}")
+                await asyncio.sleep(delay)
+                trial = health.check() or trial
+                continue
+            health.success(time.perf_counter() - start, push)
+            return result
+    finally:
+        # Cancelled (or otherwise ended) mid-trial: don't leave the breaker waiting on it forever
+        if trial:
+            health.breaker.end_trial()
+
+
+async def _hedged(attempt, hedge, after: float | None):
+    """First result of `attempt()` and, if that takes longer than `after`, `hedge()`."""
+    first = asyncio.ensure_future(attempt())
+    if after is None:
+        return await first
+    pending = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=after)
+        if done:
+            return first.result()
+        logger.info(f"Hedging a request slower than {after:.2f}s")
+        pending.add(asyncio.ensure_future(hedge()))
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class IdempotencyCache:
+    """Replies by request key (sender, messageId), so a retried or hedged request is answered once.
+    Keeps the last `max_entries` keys for `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, asyncio.Future]] = OrderedDict()
+
+    def claim(self, key: tuple) -> asyncio.Future | None:
+        """The first request's reply future if `key` was seen, else None (and `key` is now claimed)."""
+        now = time.monotonic()
+        while self._entries and next(iter(self._entries.values()))[0] < now - self.ttl_seconds:
+            self._entries.popitem(last=False)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry[1]
+        self._entries[key] = (now, asyncio.get_running_loop().create_future())
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return None
+
+    def resolve(self, key: tuple, reply):
+        entry = self._entries.get(key)
+        if entry is not None and not entry[1].done():
+            entry[1].set_result(reply)
+
+    def discard(self, key: tuple, error: BaseException):
+        """The first request failed: let waiting duplicates fail too, and let a later retry run.
+        No-op once the request has its reply.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[1].done():
+            return
+        del self._entries[key]
+        entry[1].set_exception(error)
+        entry[1].exception()  # retrieved, so an unawaited future doesn't warn
@@ -0,0 +1,193 @@
+"""
+On-demand profiling for live agent servers.
+
+`GET /admin/profile?seconds=10` samples every thread's Python stack from a
+background thread for that long and returns them in collapsed-stack format
+(`frame;frame;frame count` per line), ready for flamegraph.pl or speedscope.
+The event loop thread's stacks are rooted at `event-loop`, other threads at
+their thread name. While sampling, the loop's scheduling lag is measured too
+and returned in the `X-Event-Loop-Max-Lag-Ms` header; a large lag points at a
+stall, and the `event-loop` stacks show what was running. Query parameters:
+`interval_ms` (default 10), `idle=1` to keep samples of threads that are only
+waiting, `threads=loop` for the event loop thread only.
+
+A request whose A2A metadata has `"profile": "<token>"` runs its `execute`
+under cProfile, and the top functions are logged with the request id. cProfile
+follows the event loop thread, so other requests served at the same time show
+up in the same profile.
+
+Mount next to the A2A routes:
+    app.build(routes=metrics_routes() + profile_routes())
+Both need A2A_ADMIN_TOKEN: admin routes want `Authorization: Bearer <token>`,
+and without a token the routes aren't mounted and the metadata flag is ignored.
+"""
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from config import ADMIN_TOKEN, PROFILE_MAX_SECONDS
+
+
+PROFILE_METADATA_KEY = "profile"
+
+# A thread whose innermost frame is in one of these is waiting, not working
+IDLE_MODULES = {"selectors", "threading", "queue", "concurrent.futures.thread"}
+
+# One sampling run and one cProfile at a time per process
+_sampling = threading.Lock()
+_profiling = threading.Lock()
+
+
+def _frame_name(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+class StackSampler:
+    """Collects collapsed stacks of all threads every `interval` seconds."""
+
+    def __init__(self, interval: float = 0.01, loop_thread: int | None = None,
+                 include_idle: bool = False, loop_only: bool = False):
+        self.interval = interval
+        self.loop_thread = loop_thread
+        self.include_idle = include_idle
+        self.loop_only = loop_only
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+
+    def _root(self, ident: int, names: dict[int, str]) -> str:
+        if ident == self.loop_thread:
+            return "event-loop"
+        return names.get(ident, f"thread-{ident}").replace(";", ":").replace(" ", "_")
+
+    def sample(self):
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me or (self.loop_only and ident != self.loop_thread):
+                continue
+            if not self.include_idle and frame.f_globals.get("__name__") in IDLE_MODULES:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+            frames.append(self._root(ident, names))
+            self.stacks[";".join(reversed(frames))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float):
+        """Sample until `seconds` have passed (blocking; run it off the event loop)."""
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self.sample()
+            time.sleep(self.interval)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+async def _loop_lag(done: asyncio.Event, tick: float = 0.01) -> float:
+    """Largest delay, in seconds, of a `tick` sleep on the event loop until `done` is set."""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not done.is_set():
+        start = loop.time()
+        await asyncio.sleep(tick)
+        worst = max(worst, loop.time() - start - tick)
+    return worst
+
+
+async def sample_stacks(seconds: float, interval: float = 0.01,
+                        include_idle: bool = False, loop_only: bool = False) -> tuple[StackSampler, float]:
+    """Sample stacks for `seconds` without blocking the event loop; returns (sampler, max loop lag)."""
+    sampler = StackSampler(interval, threading.get_ident(), include_idle, loop_only)
+    done = asyncio.Event()
+    lag = asyncio.create_task(_loop_lag(done))
+    try:
+        # A dedicated thread, so a busy default executor can't delay the sampling
+        await asyncio.to_thread(sampler.run, seconds)
+    finally:
+        done.set()
+    return sampler, await lag
+
+
+def _authorized(request: Request) -> bool:
+    header = request.headers.get("authorization", "")
+    return bool(ADMIN_TOKEN) and secrets.compare_digest(header, f"Bearer {ADMIN_TOKEN}")
+
+
+def profile_requested(metadata: dict) -> bool:
+    """True if request metadata asks for a cProfile run with the admin token. Never without one."""
+    flag = metadata.get(PROFILE_METADATA_KEY)
+    return bool(ADMIN_TOKEN) and isinstance(flag, str) and secrets.compare_digest(flag, ADMIN_TOKEN)
+
+
+async def profile_endpoint(request: Request) -> PlainTextResponse:
+    if not _authorized(request):
+        return PlainTextResponse("unauthorized\n", status_code=401)
+    try:
+        seconds = float(request.query_params.get("seconds", 10))
+        interval = float(request.query_params.get("interval_ms", 10)) / 1000
+    except ValueError:
+        return PlainTextResponse("seconds and interval_ms must be numbers\n", status_code=400)
+    if not 0 < seconds <= PROFILE_MAX_SECONDS or not 0.001 <= interval <= 1:
+        return PlainTextResponse(
+            f"seconds must be in (0, {PROFILE_MAX_SECONDS}] and interval_ms in [1, 1000]\n", status_code=400,
+        )
+    if not _sampling.acquire(blocking=False):
+        return PlainTextResponse("a profile is already running\n", status_code=409)
+    try:
+        sampler, lag = await sample_stacks(
+            seconds, interval,
+            include_idle=request.query_params.get("idle") == "1",
+            loop_only=request.query_params.get("threads") == "loop",
+        )
+    finally:
+        _sampling.release()
+    return PlainTextResponse(sampler.collapsed(), headers={
+        "X-Profile-Samples": str(sampler.samples),
+        "X-Event-Loop-Max-Lag-Ms": f"{lag * 1000:.1f}",
+    })
+
+
+def profile_routes() -> list[Route]:
+    """Routes to pass to `A2AStarletteApplication.build(routes=...)`; none unless A2A_ADMIN_TOKEN is set."""
+    if not ADMIN_TOKEN:
+        return []
+    return [Route("/admin/profile", profile_endpoint, methods=["GET"])]
+
+
+@contextmanager
+def profiled(label: str, logger: logging.Logger, enabled: bool = True, top: int = 25):
+    """Run the block under cProfile and log its top `top` functions by cumulative time."""
+    if not enabled:
+        yield
+        return
+    if not _profiling.acquire(blocking=False):
+        logger.warning(f"[{label}] Profiling requested, but another request is being profiled")
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        _profiling.release()
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(top)
+        logger.info(f"[{label}] Profile, top {top} by cumulative time:\n{out.getvalue()}")
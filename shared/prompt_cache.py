@@ -0,0 +1,65 @@
+"""
+Stable, cacheable system prompt prefix.
+Providers cache the longest byte-identical prompt prefix, so the static part
+of every request (soul.md, person_context.md, tool schemas) is built once,
+normalized, and fingerprinted. Per-request details (sender, message) go after
+it in the user turn. Editing a context file changes the fingerprint, which
+the agent picks up on its next request and rebuilds once.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+def _normalize(text: str) -> str:
+    """Line endings and trailing whitespace must not make two prefixes differ."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip() + "\n"
+
+
+class PromptPrefix:
+    """The static system prompt for one agent plus a fingerprint of everything cached."""
+
+    def __init__(self, soul_path: str, context_path: str, tools: list, agent_name: str = "agent"):
+        self.soul_path = Path(soul_path)
+        self.context_path = Path(context_path)
+        self.agent_name = agent_name
+        # Tool schemas are sent ahead of the messages, so they are part of the cached prefix
+        self.tool_schemas = json.dumps(
+            [convert_to_openai_tool(t) for t in tools], sort_keys=True, ensure_ascii=False,
+        )
+        self._mtimes: tuple[int, int] = (0, 0)
+        self.soul = ""
+        self.person_context = ""
+        self.text = ""
+        self.fingerprint = ""
+        self.load()
+
+    def _stat(self) -> tuple[int, int]:
+        return (self.soul_path.stat().st_mtime_ns, self.context_path.stat().st_mtime_ns)
+
+    def load(self):
+        self._mtimes = self._stat()
+        self.soul = _normalize(self.soul_path.read_text(encoding="utf-8"))
+        self.person_context = _normalize(self.context_path.read_text(encoding="utf-8"))
+        self.text = f"{self.soul}\n## Person Context\n{self.person_context}"
+        digest = hashlib.sha256()
+        digest.update(self.text.encode("utf-8"))
+        digest.update(self.tool_schemas.encode("utf-8"))
+        self.fingerprint = digest.hexdigest()[:16]
+
+    def refresh(self) -> bool:
+        """Reload if a context file changed on disk. Returns True if the prefix changed."""
+        if self._stat() == self._mtimes:
+            return False
+        old = self.fingerprint
+        self.load()
+        return self.fingerprint != old
+
+    @property
+    def cache_key(self) -> str:
+        """Routing key so requests sharing this prefix land on the same provider cache."""
+        return f"{self.agent_name}:{self.fingerprint}"
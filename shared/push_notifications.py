@@ -0,0 +1,109 @@
+"""
+A2A push notifications.
+Instead of holding a request open for a peer's whole LLM run, the caller
+submits a non-blocking task with a push-notification config and gets a task
+id back at once. The peer's request handler POSTs the task to the caller's
+webhook as it changes; `PushInbox` receives those and wakes whoever waits on
+the task id. Waiters also poll the peer now and then, in case a notification
+is lost.
+"""
+
+import asyncio
+import logging
+import secrets
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from a2a.types import PushNotificationConfig, Task, TaskState
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = "/a2a/notifications"
+TOKEN_HEADER = "X-A2A-Notification-Token"
+
+# States after which a task needs nothing more from the peer
+DONE_STATES = {
+    TaskState.completed, TaskState.failed, TaskState.canceled, TaskState.rejected,
+    TaskState.input_required, TaskState.auth_required, TaskState.unknown,
+}
+
+
+class TaskTimeout(Exception):
+    """A task the peer accepted did not finish in time."""
+
+    def __init__(self, task_id: str, timeout: float):
+        super().__init__(f"Task {task_id} did not finish within {timeout:.0f}s")
+        self.task_id = task_id
+
+
+class PushInbox:
+    """Webhook receiver for task updates, with one future per awaited task id."""
+
+    def __init__(self, webhook_url: str, max_unclaimed: int = 1024):
+        self.webhook_url = webhook_url
+        self.token = secrets.token_urlsafe(16)
+        self._waiters: dict[str, asyncio.Future] = {}
+        # Finished tasks that arrived before anyone waited on them (the push can beat the send reply)
+        self._unclaimed: OrderedDict[str, Task] = OrderedDict()
+        self._max_unclaimed = max_unclaimed
+
+    def config(self) -> PushNotificationConfig:
+        """Push config to attach to an outbound non-blocking send."""
+        return PushNotificationConfig(url=self.webhook_url, token=self.token)
+
+    def deliver(self, task: Task):
+        if task.status.state not in DONE_STATES:
+            return
+        waiter = self._waiters.pop(task.id, None)
+        if waiter is not None:
+            if not waiter.done():
+                waiter.set_result(task)
+            return
+        self._unclaimed[task.id] = task
+        while len(self._unclaimed) > self._max_unclaimed:
+            self._unclaimed.popitem(last=False)
+
+    async def wait(
+        self, task_id: str, poll: Callable[[], Awaitable[Task]],
+        poll_interval: float, timeout: float,
+    ) -> Task:
+        """Wait for a task to finish. Raises TaskTimeout after `timeout` seconds."""
+        if task_id in self._unclaimed:
+            return self._unclaimed.pop(task_id)
+        waiter = self._waiters.setdefault(task_id, asyncio.get_running_loop().create_future())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TaskTimeout(task_id, timeout)
+                try:
+                    return await asyncio.wait_for(asyncio.shield(waiter), min(poll_interval, remaining))
+                except TimeoutError:
+                    pass
+                # No notification yet — ask the peer directly
+                task = await poll()
+                if task.status.state in DONE_STATES:
+                    logger.info(f"Task {task_id} finished without a push notification; got it by polling")
+                    return task
+        finally:
+            self._waiters.pop(task_id, None)
+
+    async def endpoint(self, request: Request) -> Response:
+        if request.headers.get(TOKEN_HEADER) != self.token:
+            return JSONResponse({"error": "invalid notification token"}, status_code=401)
+        try:
+            task = Task.model_validate(await request.json())
+        except ValueError:
+            return JSONResponse({"error": "body is not an A2A task"}, status_code=400)
+        logger.info(f"Push notification: task {task.id} is {task.status.state.value}")
+        self.deliver(task)
+        return Response(status_code=204)
+
+    def routes(self) -> list[Route]:
+        return [Route(WEBHOOK_PATH, self.endpoint, methods=["POST"])]
@@ -0,0 +1,406 @@
+"""
+Span tracing for agent hops.
+Spans cover executor runs, LLM calls, tool calls, CalendarStore operations
+and outbound A2A messages. Trace context travels in A2A request metadata
+(W3C `traceparent` format), so a negotiation across agents is one trace.
+
+Usage:
+    configure_tracing("person_a", exporter="file", file_path="traces.jsonl")
+    with start_span("agent.invoke", sender="person_b") as span:
+        ...
+
+Summarize a trace file:
+    python -m shared.tracing traces.jsonl
+"""
+
+import contextvars
+import functools
+import json
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+
+TRACEPARENT_KEY = "traceparent"
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None,
+)
+# Overrides the tracer's service name, for processes serving several agents
+_current_service: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_service", default=None,
+)
+
+
+class SpanContext:
+    """Identifies a span across process boundaries."""
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class Span:
+    """A timed operation. Ended spans are handed to the tracer's exporters."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "service",
+        "attributes", "status", "start_ns", "end_ns", "_tracer",
+    )
+
+    def __init__(
+        self, tracer: "Tracer", name: str, trace_id: str,
+        parent_id: str | None, attributes: dict | None = None,
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.service = tracer.service_name
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict):
+        self.attributes.update(attributes)
+
+    def record_error(self, exc: BaseException):
+        self.status = "error"
+        self.attributes["error.type"] = type(exc).__name__
+        self.attributes["error.message"] = str(exc)[:500]
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self._tracer._export(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "service": self.service,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+# --- Exporters ---
+
+class ConsoleExporter:
+    """Prints one line per finished span to stdout."""
+
+    def export(self, span: Span):
+        attrs = " ".join(f"{k}={v}" for k, v in span.attributes.items())
+        print(
+            f"[span] {span.service} {span.name} {span.duration_ms:.1f}ms "
+            f"trace={span.trace_id[:8]} status={span.status} {attrs}",
+            file=sys.stdout,
+        )
+
+    def shutdown(self):
+        pass
+
+
+class FileExporter:
+    """Appends finished spans to a JSONL file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def shutdown(self):
+        pass
+
+
+class OTLPHttpExporter:
+    """
+    Batches spans and POSTs them as OTLP/HTTP JSON to `{endpoint}/v1/traces`.
+    Works against an OpenTelemetry collector or any stand-in that accepts
+    the same payload. Export runs on a background thread.
+    """
+
+    def __init__(self, endpoint: str, batch_size: int = 64, flush_interval: float = 2.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: list[Span] = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        with self._cond:
+            self._buffer.append(span)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        import httpx
+
+        with httpx.Client(timeout=5.0) as client:
+            while True:
+                with self._cond:
+                    if not self._buffer and not self._stopped:
+                        self._cond.wait(self.flush_interval)
+                    batch, self._buffer = self._buffer, []
+                    stopped = self._stopped
+                if batch:
+                    try:
+                        client.post(self.url, json=self._payload(batch))
+                    except httpx.HTTPError as e:
+                        print(f"[tracing] OTLP export failed: {e}", file=sys.stderr)
+                if stopped:
+                    return
+
+    @staticmethod
+    def _payload(spans: list[Span]) -> dict:
+        by_service: dict[str, list[dict]] = defaultdict(list)
+        for s in spans:
+            by_service[s.service].append({
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "status": {"code": 2 if s.status == "error" else 1},
+                "attributes": [
+                    {"key": k, "value": {"stringValue": str(v)}}
+                    for k, v in s.attributes.items()
+                ],
+            })
+        return {"resourceSpans": [
+            {
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": service}},
+                ]},
+                "scopeSpans": [{"scope": {"name": "a2a"}, "spans": items}],
+            }
+            for service, items in by_service.items()
+        ]}
+
+
+# --- Tracer ---
+
+class Tracer:
+    """Creates spans for one service and forwards finished spans to exporters."""
+
+    def __init__(self, service_name: str, exporters: list | None = None):
+        self.default_service = service_name
+        self.exporters = list(exporters or [])
+        self.processors: list = []
+
+    @property
+    def service_name(self) -> str:
+        """The service spans are attributed to: the current `service_scope`, else the tracer's."""
+        return _current_service.get() or self.default_service
+
+    def add_span_processor(self, processor):
+        """Register a callable invoked with every finished span (e.g. metrics)."""
+        self.processors.append(processor)
+
+    def _export(self, span: Span):
+        for processor in self.processors:
+            processor(span)
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                print(f"[tracing] {type(exporter).__name__} failed: {e}", file=sys.stderr)
+
+    def new_span(
+        self, name: str, parent: "Span | SpanContext | None" = None,
+        attributes: dict | None = None,
+    ) -> Span:
+        """Create a span without making it current. Caller must call `end()`."""
+        if parent is None:
+            parent = _current_span.get()
+        if parent is None:
+            return Span(self, name, secrets.token_hex(16), None, attributes)
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    @contextmanager
+    def start_span(
+        self, name: str, parent: "Span | SpanContext | None" = None, **attributes,
+    ):
+        """Context manager that makes the new span current for its duration."""
+        span = self.new_span(name, parent, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def shutdown(self):
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+_tracer = Tracer("a2a")
+
+
+def build_exporter(exporter: str, file_path: str = "traces.jsonl", otlp_endpoint: str = ""):
+    """Build an exporter from its config name: none, console, file or otlp."""
+    if exporter in ("", "none"):
+        return None
+    if exporter == "console":
+        return ConsoleExporter()
+    if exporter == "file":
+        return FileExporter(file_path)
+    if exporter == "otlp":
+        return OTLPHttpExporter(otlp_endpoint)
+    raise ValueError(f"Unknown trace exporter: {exporter}")
+
+
+def configure_tracing(
+    service_name: str, exporter: str = "none",
+    file_path: str = "traces.jsonl", otlp_endpoint: str = "",
+) -> Tracer:
+    """Set up the process-wide tracer. Safe to call again (e.g. on reload)."""
+    global _tracer
+    built = build_exporter(exporter, file_path, otlp_endpoint)
+    processors = _tracer.processors
+    _tracer.shutdown()
+    _tracer = Tracer(service_name, [built] if built else [])
+    _tracer.processors = processors
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def start_span(name: str, parent: "Span | SpanContext | None" = None, **attributes):
+    """Start a span on the process-wide tracer. See `Tracer.start_span`."""
+    return _tracer.start_span(name, parent, **attributes)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def service_scope(service_name: str):
+    """Attribute spans (and the metrics fed from them) started in this context to `service_name`.
+    Tasks created inside inherit it.
+    """
+    token = _current_service.set(service_name)
+    try:
+        yield
+    finally:
+        _current_service.reset(token)
+
+
+def traced(name: str):
+    """Decorator that wraps a sync function in a span."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _tracer.start_span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Propagation ---
+
+def inject(metadata: dict | None = None) -> dict:
+    """Add the current span's traceparent to an outbound A2A metadata dict."""
+    metadata = dict(metadata or {})
+    span = _current_span.get()
+    if span is not None:
+        metadata[TRACEPARENT_KEY] = f"00-{span.trace_id}-{span.span_id}-01"
+    return metadata
+
+
+def extract(metadata: dict | None) -> SpanContext | None:
+    """Read a traceparent from inbound A2A metadata, if present and valid."""
+    value = (metadata or {}).get(TRACEPARENT_KEY)
+    if not isinstance(value, str):
+        return None
+    parts = value.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return SpanContext(parts[1], parts[2])
+
+
+# --- Trace file summary ---
+
+def summarize(path: str) -> str:
+    """Render each trace in a JSONL span file as an indented timing tree."""
+    spans = [json.loads(line) for line in Path(path).read_text().splitlines() if line.strip()]
+    children: dict[str | None, list[dict]] = defaultdict(list)
+    span_ids = {s["span_id"] for s in spans}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in span_ids else None
+        children[parent].append(s)
+
+    lines = []
+
+    def walk(span: dict, depth: int):
+        attrs = span["attributes"]
+        detail = ", ".join(
+            f"{k}={attrs[k]}" for k in
+            ("peer", "tool", "model", "input_tokens", "output_tokens") if k in attrs
+        )
+        lines.append(
+            f"{'  ' * depth}{span['duration_ms']:>10.1f}ms  "
+            f"[{span['service']}] {span['name']}{'  (' + detail + ')' if detail else ''}"
+        )
+        for child in sorted(children[span["span_id"]], key=lambda c: c["start_ns"]):
+            walk(child, depth + 1)
+
+    for root in sorted(children[None], key=lambda s: s["start_ns"]):
+        lines.append(f"trace {root['trace_id']}")
+        walk(root, 1)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m shared.tracing traces.jsonl")
+        sys.exit(1)
+    print(summarize(sys.argv[1]))
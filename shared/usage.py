@@ -0,0 +1,155 @@
+"""
+Token and cost accounting per request.
+A UsageTracker is created for each A2A execution. It counts this agent's own
+LLM calls plus the usage peers report back in their response metadata, and
+can enforce a token budget that stops the agent loop once exceeded.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+
+USAGE_METADATA_KEY = "usage"
+BUDGET_METADATA_KEY = "token_budget"
+
+_current_usage: contextvars.ContextVar["UsageTracker | None"] = contextvars.ContextVar(
+    "current_usage", default=None,
+)
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised before an LLM call once a request has used up its token budget."""
+
+    def __init__(self, budget: int, used: int):
+        super().__init__(f"Token budget of {budget} exceeded ({used} tokens used)")
+        self.budget = budget
+        self.used = used
+
+
+class TokenUsage:
+    """Prompt, completion and cached token counts plus cost in USD."""
+
+    __slots__ = ("prompt_tokens", "completion_tokens", "cached_tokens", "llm_calls", "cost_usd")
+
+    def __init__(
+        self, prompt_tokens: int = 0, completion_tokens: int = 0,
+        cached_tokens: int = 0, llm_calls: int = 0, cost_usd: float = 0.0,
+    ):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached_tokens = cached_tokens
+        self.llm_calls = llm_calls
+        self.cost_usd = cost_usd
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens served from the provider's prompt cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def add(self, other: "TokenUsage"):
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cached_tokens += other.cached_tokens
+        self.llm_calls += other.llm_calls
+        self.cost_usd += other.cost_usd
+
+    def to_dict(self) -> dict:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_hit_rate": round(self.cache_hit_rate, 4),
+            "total_tokens": self.total_tokens,
+            "llm_calls": self.llm_calls,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TokenUsage":
+        return cls(
+            prompt_tokens=int(data.get("prompt_tokens", 0)),
+            completion_tokens=int(data.get("completion_tokens", 0)),
+            cached_tokens=int(data.get("cached_tokens", 0)),
+            llm_calls=int(data.get("llm_calls", 0)),
+            cost_usd=float(data.get("cost_usd", 0.0)),
+        )
+
+
+def llm_cost(prices: dict, prompt_tokens: int, completion_tokens: int, cached_tokens: int) -> float:
+    """Cost in USD given per-1M-token prices {"input", "cached_input", "output"}."""
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (
+        uncached * prices.get("input", 0.0)
+        + cached_tokens * prices.get("cached_input", prices.get("input", 0.0))
+        + completion_tokens * prices.get("output", 0.0)
+    ) / 1_000_000
+
+
+class UsageTracker:
+    """Usage for one request: own LLM calls plus usage reported by peers."""
+
+    def __init__(self, budget: int | None = None, prices: dict[str, dict] | None = None):
+        """
+        Args:
+            budget: Max total tokens (own + peers) for this request, or None
+            prices: {"model-name": {"input": ..., "cached_input": ..., "output": ...}}
+        """
+        self.budget = budget
+        self.prices = prices or {}
+        self.own = TokenUsage()
+        self.peers: dict[str, TokenUsage] = {}
+        self.model_tier: str | None = None  # which model tier answered (see shared/model_router.py)
+
+    @property
+    def total(self) -> TokenUsage:
+        total = TokenUsage()
+        total.add(self.own)
+        for usage in self.peers.values():
+            total.add(usage)
+        return total
+
+    @property
+    def remaining(self) -> int | None:
+        if self.budget is None:
+            return None
+        return max(self.budget - self.total.total_tokens, 0)
+
+    def record_llm(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0):
+        cost = llm_cost(self.prices.get(model, {}), prompt_tokens, completion_tokens, cached_tokens)
+        self.own.add(TokenUsage(prompt_tokens, completion_tokens, cached_tokens, 1, cost))
+
+    def record_peer(self, peer: str, usage: dict):
+        """Add the `total` usage a peer reported in its response metadata."""
+        self.peers.setdefault(peer, TokenUsage()).add(TokenUsage.from_dict(usage.get("total", usage)))
+
+    def check_budget(self):
+        """Raise TokenBudgetExceeded if the budget is used up."""
+        if self.budget is not None and self.total.total_tokens >= self.budget:
+            raise TokenBudgetExceeded(self.budget, self.total.total_tokens)
+
+    def to_dict(self) -> dict:
+        return {
+            "own": self.own.to_dict(),
+            "peers": {peer: usage.to_dict() for peer, usage in self.peers.items()},
+            "total": self.total.to_dict(),
+            "budget": self.budget,
+            "model_tier": self.model_tier,
+        }
+
+
+@contextmanager
+def usage_scope(tracker: UsageTracker):
+    """Make `tracker` the current request's tracker (read by outbound A2A calls)."""
+    token = _current_usage.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_usage.reset(token)
+
+
+def current_usage() -> UsageTracker | None:
+    return _current_usage.get()
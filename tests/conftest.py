@@ -0,0 +1,24 @@
+from datetime import date, time
+
+import pytest
+
+from shared.calendar_store import CalendarStore
+
+
+MONDAY = date(2026, 3, 2)
+TUESDAY = date(2026, 3, 3)
+
+
+@pytest.fixture
+def calendars(tmp_path):
+    """Factory for empty CSV-backed calendars under tmp_path, one per name."""
+    def make(*names: str) -> dict[str, CalendarStore]:
+        return {name: CalendarStore(str(tmp_path / f"{name}.csv")) for name in names}
+    return make
+
+
+def busy(store: CalendarStore, day: date, start: str, end: str, title: str = "Busy"):
+    """Book a seed event; fails the test if the slot is already taken."""
+    event = store.book_event(title, day, time.fromisoformat(start), time.fromisoformat(end))
+    assert event is not None
+    return event
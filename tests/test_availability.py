@@ -0,0 +1,172 @@
+import time as clock
+from datetime import time
+
+from shared.availability import AvailabilityPolicy, AvailabilityRequest, SlotQuery, answer_availability
+from shared.calendar_store import find_common_starts
+from shared.freebusy import FreeBusyBitmap, score_starts
+from tests.conftest import MONDAY, TUESDAY, busy
+
+
+POLICY = AvailabilityPolicy(trusted_senders={"person_a"}, max_meetings_per_day=3)
+
+
+def ask(*slots: tuple[str, str], hold: bool = False) -> AvailabilityRequest:
+    return AvailabilityRequest(
+        slots=[SlotQuery(date=MONDAY.isoformat(), start_time=s, end_time=e) for s, e in slots], hold=hold,
+    )
+
+
+def statuses(response) -> list[str]:
+    return [a.status for a in response.slots]
+
+
+# --- Free/busy bitmaps ---
+
+def test_free_slots_skip_busy_and_extra_busy_intervals():
+    bitmap = FreeBusyBitmap()
+    bitmap.set_day(MONDAY, [(600, 660)])
+
+    slots = bitmap.free_slots(MONDAY, 30, 540, 1020, extra_busy=[(720, 780)])
+
+    assert slots == [(540, 600), (660, 720), (780, 1020)]
+
+
+def test_coarse_resolution_rounds_busy_time_outwards():
+    bitmap = FreeBusyBitmap(resolution=15)
+    bitmap.mark_busy(MONDAY, 545, 550)
+
+    assert not bitmap.is_free(MONDAY, 540, 555)
+    assert bitmap.is_free(MONDAY, 555, 570)
+
+
+def test_score_starts_counts_free_people_per_start():
+    a, b = FreeBusyBitmap(), FreeBusyBitmap()
+    a.set_day(MONDAY, [(540, 600)])
+    b.set_day(MONDAY, [(600, 660)])
+
+    grid = score_starts([a, b], MONDAY, MONDAY, 60, step_minutes=60)
+
+    hours = {h: int(grid.scores[0, h * 60]) for h in (8, 9, 10, 11)}
+    assert hours == {8: -1, 9: 1, 10: 1, 11: 2}
+    assert grid.starts(limit=1) == [(MONDAY, "11:00")]
+    assert grid.starts(min_free=1, limit=1) == [(MONDAY, "09:00")]
+
+
+def test_score_starts_keeps_buffers_around_events():
+    bitmap = FreeBusyBitmap()
+    bitmap.set_day(MONDAY, [(600, 660)])
+
+    grid = score_starts([bitmap], MONDAY, MONDAY, 30, buffer_minutes=15, step_minutes=15)
+
+    free = {start for _, start in grid.starts()}
+    assert "09:15" in free and "09:30" not in free
+    assert "11:00" not in free and "11:15" in free
+
+
+def test_find_common_starts_reads_every_calendar(calendars):
+    stores = calendars("a", "b")
+    busy(stores["a"], MONDAY, "09:00", "17:00")
+    busy(stores["b"], TUESDAY, "09:00", "10:00")
+
+    grid = find_common_starts(list(stores.values()), MONDAY, TUESDAY, 60, step_minutes=60)
+
+    assert grid.starts(limit=1) == [(TUESDAY, "10:00")]
+    assert grid.starts(min_free=1, limit=1) == [(MONDAY, "09:00")]
+
+
+# --- Holds ---
+
+def test_hold_blocks_others_but_not_its_owner(calendars):
+    store = calendars("b")["b"]
+
+    assert store.place_hold(MONDAY, time(10), time(11), "mtg_1", ttl_seconds=60) is not None
+
+    assert store.slot_status(MONDAY, time(10, 30), time(11), owner="mtg_2") == "held"
+    assert store.slot_status(MONDAY, time(10, 30), time(11), owner="mtg_1") == "free"
+    assert store.place_hold(MONDAY, time(10), time(10, 30), "mtg_2", ttl_seconds=60) is None
+    assert store.book_event("Other", MONDAY, time(10), time(10, 30)) is None
+    assert {s["start_time"] for s in store.get_free_slots(MONDAY, 60)} == {"09:00", "11:00"}
+
+
+def test_holds_expire(calendars):
+    store = calendars("b")["b"]
+    store.place_hold(MONDAY, time(10), time(11), "mtg_1", ttl_seconds=0.05)
+
+    clock.sleep(0.06)
+
+    assert store.is_available(MONDAY, time(10), time(11), owner="mtg_2")
+
+
+def test_booking_for_the_owner_releases_its_other_holds(calendars):
+    store = calendars("b")["b"]
+    store.place_hold(MONDAY, time(10), time(11), "mtg_1", ttl_seconds=60)
+    store.place_hold(TUESDAY, time(10), time(11), "mtg_1", ttl_seconds=60)
+
+    assert store.book_event("Sync", MONDAY, time(10), time(11), owner="mtg_1") is not None
+
+    assert store.is_available(TUESDAY, time(10), time(11), owner="mtg_2")
+    assert not store.is_available(MONDAY, time(10), time(11), owner="mtg_1")
+
+
+def test_release_holds(calendars):
+    store = calendars("b")["b"]
+    store.place_hold(MONDAY, time(10), time(11), "mtg_1", ttl_seconds=60)
+
+    store.release_holds("mtg_1")
+
+    assert store.is_available(MONDAY, time(10), time(11))
+
+
+# --- Structured availability answers ---
+
+def test_answers_free_and_busy_from_the_calendar(calendars):
+    store = calendars("b")["b"]
+    busy(store, MONDAY, "10:00", "11:00")
+
+    response = answer_availability(store, ask(("09:00", "10:00"), ("10:30", "11:30")), "person_a", POLICY)
+
+    assert statuses(response) == ["free", "busy"]
+
+
+def test_probe_without_hold_leaves_slots_free(calendars):
+    store = calendars("b")["b"]
+
+    answer_availability(store, ask(("09:00", "10:00")), "person_a", POLICY, owner="ctx_1")
+
+    response = answer_availability(store, ask(("09:00", "10:00")), "person_a", POLICY, owner="ctx_2")
+    assert statuses(response) == ["free"]
+
+
+def test_hold_request_holds_free_slots_for_its_owner(calendars):
+    store = calendars("b")["b"]
+    busy(store, MONDAY, "10:00", "11:00")
+
+    answer_availability(store, ask(("09:00", "10:00"), ("10:00", "11:00"), hold=True), "person_a", POLICY, owner="mtg_1")
+
+    assert statuses(answer_availability(store, ask(("09:00", "10:00")), "person_a", POLICY, owner="mtg_2")) == ["held"]
+    assert statuses(answer_availability(store, ask(("09:00", "10:00")), "person_a", POLICY, owner="mtg_1")) == ["free"]
+
+
+def test_hold_needs_an_owner_and_a_policy_ttl(calendars):
+    store = calendars("b")["b"]
+    no_holds = POLICY.model_copy(update={"hold_ttl_seconds": None})
+
+    answer_availability(store, ask(("09:00", "10:00"), hold=True), "person_a", POLICY)
+    answer_availability(store, ask(("11:00", "12:00"), hold=True), "person_a", no_holds, owner="mtg_1")
+
+    assert store.is_available(MONDAY, time(9), time(10))
+    assert store.is_available(MONDAY, time(11), time(12))
+
+
+def test_requests_the_policy_cannot_decide_go_to_the_llm(calendars):
+    store = calendars("b")["b"]
+
+    assert answer_availability(store, ask(("09:00", "10:00")), "stranger", POLICY) is None
+    assert answer_availability(store, ask(("08:00", "09:00")), "person_a", POLICY) is None
+    assert answer_availability(store, ask(("10:00", "09:00")), "person_a", POLICY) is None
+
+    for start, end in [("09:00", "09:30"), ("10:00", "10:30"), ("11:00", "11:30")]:
+        busy(store, MONDAY, start, end)
+    assert answer_availability(store, ask(("14:00", "15:00")), "person_a", POLICY) is None
+    # A busy slot on a full day is still just busy
+    assert statuses(answer_availability(store, ask(("09:00", "09:30")), "person_a", POLICY)) == ["busy"]
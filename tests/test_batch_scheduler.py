@@ -0,0 +1,133 @@
+from datetime import time
+
+import pytest
+
+from shared.availability import AvailabilityPolicy
+from shared.batch_scheduler import BatchScheduler, MeetingRequest
+from shared.calendar_store import CalendarStore
+from tests.conftest import MONDAY, TUESDAY, busy
+
+
+def request(id: str, attendees: list[str], minutes: int = 30, **kwargs) -> MeetingRequest:
+    return MeetingRequest(
+        id=id, title=id, attendees=attendees, duration_minutes=minutes,
+        window_start=kwargs.pop("window_start", MONDAY), window_end=kwargs.pop("window_end", MONDAY),
+        **kwargs,
+    )
+
+
+def spans(result) -> dict[str, tuple]:
+    return {a.request_id: (a.date, a.start_time, a.end_time) for a in result.assignments}
+
+
+def test_places_meetings_around_existing_events_without_overlap(calendars):
+    stores = calendars("a", "b")
+    busy(stores["a"], MONDAY, "09:00", "10:00")
+    requests = [request("ab", ["a", "b"]), request("b", ["b"], minutes=60)]
+
+    result = BatchScheduler(stores).solve(requests)
+
+    assert not result.unscheduled
+    placed = spans(result)
+    assert placed["ab"] == (MONDAY, "10:00", "10:30")
+    assert placed["b"] == (MONDAY, "09:00", "10:00")
+
+
+def test_higher_priority_is_placed_first(calendars):
+    stores = calendars("a")
+    requests = [request("low", ["a"]), request("high", ["a"], priority=1)]
+
+    placed = spans(BatchScheduler(stores).solve(requests))
+
+    assert placed["high"][1] == "09:00"
+    assert placed["low"][1] == "09:30"
+
+
+def test_policy_working_hours_narrow_the_day(calendars):
+    stores = calendars("a", "c")
+    policies = {"c": AvailabilityPolicy(day_start=time(10, 0), day_end=time(17, 0))}
+
+    placed = spans(BatchScheduler(stores, policies).solve([request("ac", ["a", "c"])]))
+
+    assert placed["ac"] == (MONDAY, "10:00", "10:30")
+
+
+def test_no_shared_hours_leaves_request_unscheduled(calendars):
+    stores = calendars("a", "c")
+    policies = {"c": AvailabilityPolicy(day_start=time(16, 45), day_end=time(17, 0))}
+
+    result = BatchScheduler(stores, policies).solve([request("ac", ["a", "c"])])
+
+    assert result.assignments == []
+    assert [r.id for r in result.unscheduled] == ["ac"]
+
+
+def test_daily_meeting_limit_moves_meetings_to_another_day(calendars):
+    stores = calendars("a")
+    busy(stores["a"], MONDAY, "13:00", "14:00")
+    policies = {"a": AvailabilityPolicy(max_meetings_per_day=2)}
+    requests = [request(f"m{i}", ["a"], window_end=TUESDAY) for i in range(3)]
+
+    result = BatchScheduler(stores, policies).solve(requests)
+
+    days = sorted(day for day, _, _ in spans(result).values())
+    assert days == [MONDAY, TUESDAY, TUESDAY]
+
+
+def test_repair_moves_a_meeting_to_make_room(calendars):
+    stores = calendars("a")
+    # The longer meeting is placed first and takes 09:00, the only hour "early" may use
+    requests = [
+        request("long", ["a"], minutes=90),
+        request("early", ["a"], minutes=60, day_end=time(10, 0)),
+    ]
+
+    result = BatchScheduler(stores).solve(requests)
+
+    assert not result.unscheduled
+    placed = spans(result)
+    assert placed["early"] == (MONDAY, "09:00", "10:00")
+    assert placed["long"] == (MONDAY, "10:00", "11:30")
+    assert [a.request_id for a in result.assignments if a.moved] == ["long"]
+
+
+def test_repair_never_moves_a_higher_priority_meeting(calendars):
+    stores = calendars("a")
+    requests = [
+        request("long", ["a"], minutes=90, priority=1),
+        request("early", ["a"], minutes=60, day_end=time(10, 0)),
+    ]
+
+    result = BatchScheduler(stores).solve(requests)
+
+    assert [r.id for r in result.unscheduled] == ["early"]
+
+
+def test_book_writes_every_attendee_once(calendars, tmp_path):
+    stores = calendars("a", "b")
+    requests = [request("ab", ["a", "b"]), request("a", ["a"])]
+    scheduler = BatchScheduler(stores)
+
+    counts = scheduler.book(scheduler.solve(requests), requests)
+
+    assert counts == {"a": 2, "b": 1}
+    reread = CalendarStore(str(tmp_path / "a.csv"))
+    assert sorted(e.notes for e in reread.get_events(MONDAY)) == ["batch:a", "batch:ab"]
+
+
+def test_book_refuses_if_a_calendar_changed_since_solve(calendars, tmp_path):
+    stores = calendars("a", "b")
+    requests = [request("ab", ["a", "b"])]
+    scheduler = BatchScheduler(stores)
+    result = scheduler.solve(requests)
+    busy(stores["b"], MONDAY, "09:00", "09:30", title="Sneaked in")
+
+    with pytest.raises(RuntimeError, match="no longer free"):
+        scheduler.book(result, requests)
+
+    assert CalendarStore(str(tmp_path / "a.csv")).get_events(MONDAY) == []
+
+
+def test_missing_calendar_is_an_error(calendars):
+    with pytest.raises(ValueError, match="no calendar for b"):
+        BatchScheduler(calendars("a")).solve([request("ab", ["a", "b"])])
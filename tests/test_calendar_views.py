@@ -0,0 +1,94 @@
+from datetime import date, time
+
+from shared.calendar_event import CalendarEvent, epoch_minutes
+from shared.calendar_views import FOCUS_LABEL, PRIVATE_LABEL, approx_tokens, busy_blocks, busy_lines, paginate
+from tests.conftest import MONDAY, TUESDAY
+
+
+def event(day: date, start: str, end: str, category: str = "work") -> CalendarEvent:
+    return CalendarEvent(
+        f"evt_{day}_{start}",
+        epoch_minutes(day, time.fromisoformat(start)),
+        epoch_minutes(day, time.fromisoformat(end)),
+        title="Dentist", category=category,
+    )
+
+
+def lines(n: int) -> list[tuple[str, str]]:
+    return [(f"{i:03d}", f"line {i:03d} " + "x" * 30) for i in range(n)]
+
+
+def test_busy_blocks_merge_overlapping_and_adjacent_events():
+    events = [
+        event(MONDAY, "10:00", "11:00"),
+        event(MONDAY, "09:00", "09:30"),
+        event(MONDAY, "09:30", "10:15"),
+        event(MONDAY, "13:00", "14:00"),
+    ]
+
+    assert busy_blocks(events) == {MONDAY: [(540, 660, PRIVATE_LABEL), (780, 840, PRIVATE_LABEL)]}
+
+
+def test_busy_blocks_keep_focus_time_separate():
+    events = [event(MONDAY, "09:00", "10:00"), event(MONDAY, "10:00", "11:00", category="focus")]
+
+    assert busy_blocks(events)[MONDAY] == [(540, 600, PRIVATE_LABEL), (600, 660, FOCUS_LABEL)]
+
+
+def test_busy_lines_are_one_per_day_without_titles():
+    events = [
+        event(TUESDAY, "09:00", "10:00", category="focus"),
+        event(MONDAY, "09:00", "10:30"),
+        event(MONDAY, "13:00", "14:00"),
+    ]
+
+    assert busy_lines(events) == [
+        ("2026-03-02", "2026-03-02 Mon: 09:00-10:30, 13:00-14:00"),
+        ("2026-03-03", "2026-03-03 Tue: 09:00-10:00 (focus)"),
+    ]
+    assert not any("Dentist" in line for _, line in busy_lines(events))
+
+
+def test_paginate_returns_everything_that_fits():
+    assert paginate(lines(3), header="Busy:") == "\n".join(["Busy:"] + [line for _, line in lines(3)])
+
+
+def test_paginate_pages_stay_under_budget_and_cover_every_line():
+    items, cursor, seen = lines(100), "", []
+    while True:
+        page = paginate(items, cursor, max_tokens=200)
+        assert approx_tokens(page) <= 200
+        if page == "No more results.":
+            break
+        body = page.splitlines()
+        if body[-1].startswith("More:"):
+            cursor = body[-1].split('cursor="')[1].rstrip('".')
+            body = body[:-1]
+        else:
+            cursor = body[-1][len("line "):len("line ") + 3]
+        seen += body
+
+    assert seen == [line for _, line in items]
+
+
+def test_paginate_cursor_is_stable_when_items_are_added():
+    first = paginate(lines(20), max_tokens=100)
+    cursor = first.splitlines()[-1].split('cursor="')[1].rstrip('".')
+    shown = len(first.splitlines()) - 1
+
+    # A line added before the cursor doesn't shift the next page
+    items = sorted(lines(20) + [("000a", "inserted")])
+
+    assert paginate(items, cursor, max_tokens=100).splitlines()[0] == lines(20)[shown][1]
+
+
+def test_paginate_cuts_a_single_line_over_budget():
+    page = paginate([("a", "y" * 1000)], max_tokens=50)
+
+    assert page.endswith("...")
+    assert approx_tokens(page) <= 50
+
+
+def test_paginate_empty_and_exhausted():
+    assert paginate([], empty="No events.") == "No events."
+    assert paginate(lines(2), cursor="001") == "No more results."
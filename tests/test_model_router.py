@@ -0,0 +1,65 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from shared.model_router import ModelPolicy, carry_over, escalation_reason, route
+
+
+POLICY = ModelPolicy(skill_tiers={"availability": "small"})
+
+
+def tool_call(name: str = "check_availability") -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": {}, "id": "call_1"}])
+
+
+@pytest.mark.parametrize("message, skill, history, tier, reason", [
+    ("Tuesday 10am works, thanks", "default", 0, "small", "routine"),
+    ("Can we reschedule to Thursday instead?", "default", 0, "large", "ambiguous"),
+    ("yes " * 200, "default", 0, "large", "long_message"),
+    ("yes", "default", 20, "large", "long_history"),
+    ("Let's plan the offsite agenda", "default", 0, "large", "default"),
+    ("Can we reschedule?", "availability", 0, "small", "skill"),
+])
+def test_route(message, skill, history, tier, reason):
+    decision = route(POLICY, message, skill, history)
+
+    assert (decision.tier, decision.reason) == (tier, reason)
+
+
+def test_route_default_tier_is_configurable():
+    assert route(ModelPolicy(default_tier="small"), "Let's plan the offsite").tier == "small"
+
+
+def test_escalation_on_tool_error():
+    messages = [tool_call(), ToolMessage(content="boom", tool_call_id="call_1", status="error"), AIMessage("Done.")]
+
+    assert escalation_reason(POLICY, messages) == "tool_error"
+
+
+def test_escalation_on_invalid_tool_call():
+    bad = AIMessage(content="", invalid_tool_calls=[{"name": "book", "args": "{", "id": "call_1", "error": "bad json"}])
+
+    assert escalation_reason(POLICY, [bad, AIMessage("Booked.")]) == "tool_error"
+
+
+@pytest.mark.parametrize("reply, reason", [
+    ("", "empty_reply"),
+    ("   ", "empty_reply"),
+    ("I'm not sure which day you mean.", "hedge"),
+    ("Could you clarify the time zone?", "hedge"),
+    ("Booked Tuesday 10:00-10:30.", None),
+])
+def test_escalation_on_reply(reply, reason):
+    assert escalation_reason(POLICY, [AIMessage(reply)]) == reason
+
+
+def test_escalation_when_turn_ends_without_a_reply():
+    assert escalation_reason(POLICY, []) == "empty_reply"
+    assert escalation_reason(POLICY, [tool_call(), ToolMessage(content="ok", tool_call_id="call_1")]) == "empty_reply"
+
+
+def test_carry_over_keeps_the_turn_up_to_the_last_tool_result():
+    result = ToolMessage(content="free", tool_call_id="call_1")
+    messages = [HumanMessage("Is 10am free?"), tool_call(), result, AIMessage("I'm not sure.")]
+
+    assert carry_over(messages) == messages[:3]
+    assert carry_over([AIMessage("I'm not sure.")]) == []
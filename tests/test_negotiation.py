@@ -0,0 +1,178 @@
+import asyncio
+from datetime import date, time
+
+from agents.person_a.negotiation import NegotiationEngine, NegotiationStore
+from shared.async_calendar_store import AsyncCalendarStore
+from shared.availability import (
+    AvailabilityPolicy, AvailabilityRequest, SlotCommandResponse, SlotQuery, answer_slot_command, booking_marker,
+)
+from shared.calendar_store import CalendarStore
+from shared.conversation_memory import current_context_id
+from tests.conftest import MONDAY, TUESDAY
+
+
+POLICIES = {
+    "person_b": AvailabilityPolicy(trusted_senders={"person_a"}),
+    "person_c": AvailabilityPolicy(trusted_senders={"person_a"}, day_start=time(10, 0)),
+}
+
+
+class Peers:
+    """Person A's engine wired to in-process peers that answer from their own calendars,
+    the way their agents do without the LLM. Tests script misbehaviour with the flags.
+    """
+
+    def __init__(self, tmp_path):
+        self.calendars = {
+            person: AsyncCalendarStore(CalendarStore(str(tmp_path / f"{person}.csv")))
+            for person in ["person_a", *POLICIES]
+        }
+        self.engine = NegotiationEngine(
+            NegotiationStore(tmp_path / "negotiations"), self.ask, self.command, self.calendars["person_a"],
+            working_hours={p: (policy.day_start, policy.day_end) for p, policy in POLICIES.items()},
+        )
+        self.unreachable: set[str] = set()
+        self.text_only: set[str] = set()
+        self.taken_before_accept: str | None = None  # peer whose first proposed slot gets booked meanwhile
+        self.refuses_booking: str | None = None
+        self.commands: list[tuple[str, str]] = []
+
+    async def ask(self, agent, slots):
+        if agent in self.unreachable:
+            return f"Failed to contact {agent}: connection refused"
+        if agent in self.text_only:
+            return "Let me check with my person and get back to you."
+        request = AvailabilityRequest(slots=[SlotQuery(**s.model_dump()) for s in slots], hold=True)
+        answer = await self.calendars[agent].answer_availability(
+            request, "person_a", POLICIES[agent], owner=current_context_id(),
+        )
+        if agent == self.taken_before_accept:
+            self.taken_before_accept = None
+            slot = slots[0]
+            await self.calendars[agent].release_holds(current_context_id())
+            await self.calendars[agent].book_event(
+                "Dentist", date.fromisoformat(slot.date),
+                time.fromisoformat(slot.start_time), time.fromisoformat(slot.end_time),
+            )
+        return answer
+
+    async def command(self, agent, command):
+        self.commands.append((agent, command.action))
+        if agent == self.refuses_booking and command.action == "book":
+            self.refuses_booking = None
+            return SlotCommandResponse(action="book", ok=False, reason="no longer free")
+        return await answer_slot_command(
+            self.calendars[agent], command, "person_a", POLICIES[agent], current_context_id(),
+        )
+
+    async def negotiate(self):
+        state = self.engine.new("Sync", list(POLICIES), 30, MONDAY.isoformat(), TUESDAY.isoformat())
+        return await self.engine.run(state.meeting_id)
+
+    async def bookings(self) -> dict[str, list[str]]:
+        """Start times of the "Sync" meetings on each calendar."""
+        return {
+            person: [f"{e.date} {e.start_time:%H:%M}" for e in await calendar.get_events_range(MONDAY, TUESDAY)
+                     if e.title == "Sync"]
+            for person, calendar in self.calendars.items()
+        }
+
+    def holds(self) -> int:
+        return sum(len(h) for c in self.calendars.values() for h in c.store._holds.values())
+
+
+def run(tmp_path, scenario):
+    async def main():
+        peers = Peers(tmp_path)
+        try:
+            return await scenario(peers)
+        finally:
+            for calendar in peers.calendars.values():
+                await calendar.close()
+    return asyncio.run(main())
+
+
+def test_books_the_first_slot_everyone_shares(tmp_path):
+    async def scenario(peers):
+        state = await peers.negotiate()
+        assert state.step == "done"
+        # Person C starts at 10:00, so nothing earlier is proposed
+        assert (state.confirmed_slot.date, state.confirmed_slot.start_time) == (MONDAY.isoformat(), "10:00")
+        assert await peers.bookings() == {p: ["2026-03-02 10:00"] for p in peers.calendars}
+        event = (await peers.calendars["person_b"].get_events(MONDAY))[0]
+        assert event.notes == booking_marker(state.meeting_id)
+        assert peers.holds() == 0
+        # Nobody books before everyone accepted
+        actions = [action for _, action in peers.commands]
+        assert actions == ["accept", "accept", "book", "book"]
+
+    run(tmp_path, scenario)
+
+
+def test_decline_releases_the_slot_and_tries_another(tmp_path):
+    async def scenario(peers):
+        peers.taken_before_accept = "person_c"
+        state = await peers.negotiate()
+        assert state.step == "done"
+        assert state.round == 2
+        assert "2026-03-02 10:00-10:30" in state.rejected_slots
+        booked = await peers.bookings()
+        assert all(times == [booked["person_a"][0]] for times in booked.values())
+        assert booked["person_a"] != ["2026-03-02 10:00"]
+        assert ("person_b", "release") in peers.commands
+        assert peers.holds() == 0
+
+    run(tmp_path, scenario)
+
+
+def test_refused_booking_is_undone_everywhere(tmp_path):
+    async def scenario(peers):
+        peers.refuses_booking = "person_c"
+        state = await peers.negotiate()
+        assert state.step == "done"
+        assert state.round == 2
+        # The first slot's bookings on Person A and Person B were cancelled; one meeting each remains
+        booked = await peers.bookings()
+        assert all(len(times) == 1 and times == booked["person_a"] for times in booked.values())
+        assert peers.holds() == 0
+
+    run(tmp_path, scenario)
+
+
+def test_text_replies_are_never_taken_as_free(tmp_path):
+    async def scenario(peers):
+        peers.text_only.add("person_c")
+        state = await peers.negotiate()
+        assert state.step == "failed"
+        assert "no common slot" in state.error
+        assert state.responses["person_c"].startswith("Let me check")
+        assert await peers.bookings() == {p: [] for p in peers.calendars}
+
+    run(tmp_path, scenario)
+
+
+def test_unreachable_peer_stalls_and_resumes_where_it_left_off(tmp_path):
+    async def scenario(peers):
+        peers.unreachable.add("person_c")
+        state = await peers.negotiate()
+        assert state.step == "collect"
+        assert "person_c" in state.error
+        assert "person_b" in state.slot_status
+
+        peers.unreachable.clear()
+        state = await peers.engine.run(state.meeting_id)
+        assert state.step == "done"
+        assert state.round == 1
+
+    run(tmp_path, scenario)
+
+
+def test_fails_without_shared_working_hours(tmp_path):
+    async def scenario(peers):
+        peers.engine.working_hours["person_c"] = (time(16, 45), time(17, 0))
+        state = await peers.negotiate()
+        assert state.step == "failed"
+        assert "working hours" in state.error
+        assert peers.commands == []
+
+    run(tmp_path, scenario)
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+import pytest
+
+from shared.agent_registry import FleetMap, HashRing
+from shared.peer_health import CircuitBreaker, GiveUp, PeerHealth, PeerUnavailable, call_with_retries
+
+
+PEOPLE = [f"person_{i}" for i in range(2000)]
+WORKERS = ["http://w1", "http://w2", "http://w3", "http://w4"]
+
+
+# --- Hash ring ---
+
+def test_hash_ring_spreads_people_over_every_node():
+    ring = HashRing(WORKERS)
+
+    load = Counter(ring.lookup(p) for p in PEOPLE)
+
+    assert set(load) == set(WORKERS)
+    assert max(load.values()) < 2 * min(load.values())
+
+
+def test_hash_ring_adding_a_node_only_moves_people_to_it():
+    before = HashRing(WORKERS)
+    after = HashRing(WORKERS + ["http://w5"])
+
+    moved = [p for p in PEOPLE if before.lookup(p) != after.lookup(p)]
+
+    assert all(after.lookup(p) == "http://w5" for p in moved)
+    assert len(moved) < len(PEOPLE) / 3
+
+
+def test_hash_ring_needs_a_node():
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+def test_fleet_map_pins_agents_and_serves_others_under_their_name():
+    fleet = FleetMap({
+        "agents": {"person_a": "http://a"},
+        "shards": {"local": WORKERS},
+        "people": {"person_b": "local"},
+        "default_shard": "local",
+    })
+
+    assert fleet.route("person_a") == "http://a"
+    assert fleet.route("person_b").rsplit("/", 1) == [HashRing(WORKERS).lookup("person_b"), "person_b"]
+    assert fleet.route("person_z").endswith("/person_z")
+
+
+def test_fleet_map_rejects_unknown_shards():
+    with pytest.raises(ValueError, match="unknown shard"):
+        FleetMap({"shards": {}, "people": {"person_b": "missing"}})
+
+
+# --- Circuit breaker ---
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failures=3, cooldown=60)
+    breaker.failure()
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    breaker.failure()
+    assert breaker.state == "closed"
+
+    breaker.failure()
+
+    assert breaker.state == "open"
+    trial, retry_in = breaker.allow()
+    assert not trial and 0 < retry_in <= 60
+
+
+def test_breaker_lets_one_trial_through_when_half_open():
+    breaker = CircuitBreaker(failures=1, cooldown=0)
+    breaker.failure()
+    assert breaker.state == "half_open"
+
+    assert breaker.allow() == (True, None)
+    assert breaker.allow()[1] is not None  # a second caller waits for the trial
+
+    breaker.end_trial()
+    assert breaker.allow() == (True, None)
+    breaker.success()
+    assert breaker.state == "closed"
+
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failures=1, cooldown=0.05)
+    breaker.failure()
+    time.sleep(0.06)
+    assert breaker.allow() == (True, None)
+
+    breaker.failure()
+
+    assert breaker.state == "open"
+
+
+# --- Retries ---
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Attempts:
+    """Coroutine function that raises the queued errors, then returns "ok"."""
+
+    def __init__(self, *errors: BaseException, hang: bool = False):
+        self.errors = list(errors)
+        self.hang = hang
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        if self.hang:
+            await asyncio.sleep(60)
+        return "ok"
+
+
+def test_transport_errors_are_retried():
+    health = PeerHealth("peer")
+    attempt = Attempts(httpx.ConnectError("down"), httpx.ConnectError("down"))
+
+    assert run(call_with_retries(health, attempt, retries=2, base_delay=0)) == "ok"
+    assert attempt.calls == 3
+    assert health.breaker.consecutive_failures == 0
+
+
+def test_other_errors_are_not_retried_and_count_as_success():
+    health = PeerHealth("peer")
+    attempt = Attempts(ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        run(call_with_retries(health, attempt, base_delay=0))
+
+    assert attempt.calls == 1
+    assert len(health.latency[False]) == 1
+
+
+def test_give_up_is_a_failure_but_not_retried():
+    health = PeerHealth("peer")
+    attempt = Attempts(GiveUp("task timed out"))
+
+    with pytest.raises(GiveUp):
+        run(call_with_retries(health, attempt, retries=2, base_delay=0))
+
+    assert attempt.calls == 1
+    assert health.breaker.consecutive_failures == 1
+
+
+def test_budget_caps_time_across_attempts():
+    health = PeerHealth("peer")
+    attempt = Attempts(hang=True)
+
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        run(call_with_retries(health, attempt, retries=2, base_delay=0, budget=0.1))
+
+    assert time.perf_counter() - started < 1
+    assert attempt.calls == 1
+
+
+def test_open_breaker_skips_the_call():
+    health = PeerHealth("peer", breaker_failures=1, breaker_cooldown=60)
+    health.failure()
+    attempt = Attempts()
+
+    with pytest.raises(PeerUnavailable):
+        run(call_with_retries(health, attempt))
+
+    assert attempt.calls == 0
+
+
+def test_hedge_wins_when_the_first_attempt_is_slow():
+    health = PeerHealth("peer", min_samples=1)
+    health.success(0.01)
+    slow, fast = Attempts(hang=True), Attempts()
+
+    assert run(call_with_retries(health, slow, hedge=fast)) == "ok"
+    assert fast.calls == 1